@@ -0,0 +1,66 @@
+"""Shared fixtures for the backend benchmarks"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Tuple
+
+from models.game_models import GameStatus
+from services.game_service import GameService
+from services.room_service import RoomService
+
+
+# The benchmarks are plain scripts; game service coroutines run to completion on one shared loop
+_loop = asyncio.new_event_loop()
+
+
+def run(awaitable: Awaitable[Any]) -> Any:
+    """Run a coroutine on the benchmark event loop and return its result"""
+    return _loop.run_until_complete(awaitable)
+
+
+def quiet_logging() -> None:
+    """Silence service logging so it doesn't distort timings"""
+    logging.disable(logging.CRITICAL)
+
+
+def build_game(player_count: int = 8, flips: int = 60, seed: int = 42) -> Tuple[GameService, str]:
+    """Create a room with `player_count` players and play `flips` turns
+
+    Uses the fallback categories (no LLM). Faceoffs are resolved as they come
+    up so the game reaches a realistic mid-game state.
+    """
+    random.seed(seed)
+    room_service = RoomService()
+    game_service = GameService(room_service, llm_service=None)
+
+    room_code = start_room(game_service, player_count)
+    play_turns(game_service, room_code, flips)
+    return game_service, room_code
+
+
+def start_room(game_service: GameService, player_count: int) -> str:
+    """Create a room with `player_count` players, start its game and return the room code"""
+    room_service = game_service.room_service
+    room = room_service.create_room("Player 1")["room"]
+    room_code = room["roomCode"]
+    for i in range(2, player_count + 1):
+        room_service.join_room(room_code, f"socket-{i}", f"Player {i}")
+
+    run(game_service.start_game(room_code))
+    return room_code
+
+
+def play_turns(game_service: GameService, room_code: str, flips: int) -> None:
+    """Play `flips` turns, resolving faceoffs as they happen"""
+    run(play_turns_async(game_service, room_code, flips))
+
+
+async def play_turns_async(game_service: GameService, room_code: str, flips: int) -> None:
+    """Play `flips` turns, resolving faceoffs as they happen"""
+    game = game_service.active_games[room_code]
+    for _ in range(flips):
+        if game.status == GameStatus.FACEOFF and game.current_faceoff:
+            await game_service.resolve_faceoff(room_code, game.current_faceoff.player2_id)
+        else:
+            await game_service.flip_card(room_code, game.current_player_id)
@@ -0,0 +1,82 @@
+"""Draw pile cost: list.pop(0) vs the DrawPile cursor, and flips across many concurrent games
+
+Part one drains piles of increasing size with both structures. Part two starts
+`--games` games and plays `--flips` turns in each, round-robin across games the
+way concurrent rooms interleave on the event loop (reshuffles included).
+
+Usage (from the backend directory):
+    python -m benchmarks.draw_pile_benchmark [--games 200] [--flips 1000]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from benchmarks.common import quiet_logging, run, start_room
+from models.game_models import DrawPile, Game, GameStatus
+from services.game_service import GameService
+from services.room_service import RoomService
+
+
+def drain_list(cards: list) -> float:
+    """Seconds to draw every card with list.pop(0)"""
+    pile = list(cards)
+    start = time.perf_counter()
+    while pile:
+        pile.pop(0)
+    return time.perf_counter() - start
+
+
+def drain_draw_pile(cards: list) -> float:
+    """Seconds to draw every card from a DrawPile"""
+    pile = DrawPile(cards)
+    start = time.perf_counter()
+    while pile.draw() is not None:
+        pass
+    return time.perf_counter() - start
+
+
+async def play_round_robin(game_service: GameService, games: List[Game], flips: int) -> int:
+    """Play `flips` turns in every game, one turn per game at a time; returns the command count"""
+    commands = 0
+    for _ in range(flips):
+        for game in games:
+            if game.status == GameStatus.FACEOFF and game.current_faceoff:
+                await game_service.resolve_faceoff(game.room_code, game.current_faceoff.player2_id)
+            else:
+                await game_service.flip_card(game.room_code, game.current_player_id)
+            commands += 1
+    return commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--flips", type=int, default=1000)
+    args = parser.parse_args()
+
+    quiet_logging()
+    random.seed(42)
+
+    print(f"{'pile size':>10} {'list.pop(0) ns/draw':>20} {'DrawPile ns/draw':>18}")
+    for size in (96, 1_000, 10_000, 100_000):
+        cards = list(range(size))
+        list_ns = drain_list(cards) / size * 1e9
+        pile_ns = drain_draw_pile(cards) / size * 1e9
+        print(f"{size:>10} {list_ns:>20.1f} {pile_ns:>18.1f}")
+
+    room_service = RoomService()
+    game_service = GameService(room_service, llm_service=None)
+    games = [game_service.active_games[start_room(game_service, 8)] for _ in range(args.games)]
+
+    start = time.perf_counter()
+    commands = run(play_round_robin(game_service, games, args.flips))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{args.games} games x {args.flips} turns = {commands} commands in {elapsed:.2f}s")
+    print(f"  {elapsed / commands * 1e6:.1f} µs/command, {commands / elapsed:,.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Faceoff detection and player lookup cost as rooms grow
+
+Compares the shape index (Game.find_matching_players / get_player) with the
+previous linear scans over every player, for rooms of increasing size with a
+random top card on every stack. Both sides build a Faceoff per match, so
+the remaining growth with room size is the number of matches itself.
+
+Usage (from the backend directory):
+    python -m benchmarks.faceoff_benchmark [--iterations 2000]
+"""
+
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from benchmarks.common import quiet_logging
+from models.game_models import Card, CardShape, Faceoff, Game, Player, next_card_id
+
+SHAPES = [shape for shape in CardShape if shape != CardShape.WILD]
+
+
+def scan_matches(game: Game, player_id: str) -> List[Faceoff]:
+    """Before: compare the flipper's top card against every other player"""
+    player = next((p for p in game.players if p.id == player_id), None)
+    top_card = player.get_top_card() if player else None
+    if not top_card:
+        return []
+    return [
+        Faceoff(
+            player1_id=player_id,
+            player2_id=other.id,
+            shape=top_card.shape,
+            player1_card=top_card,
+            player2_card=other.get_top_card()
+        )
+        for other in game.players
+        if other.id != player_id and other.has_cards() and other.get_top_card().shape == top_card.shape
+    ]
+
+
+def scan_get_player(game: Game, player_id: str) -> Optional[Player]:
+    """Before: linear search for a player"""
+    return next((p for p in game.players if p.id == player_id), None)
+
+
+def build_room(player_count: int) -> Game:
+    game = Game(room_code="BENCH")
+    for i in range(player_count):
+        player = Player(id=f"player-{i}", name=f"Player {i}")
+        game.add_player(player)
+        player.add_card_to_deck(Card(id=next_card_id(), shape=random.choice(SHAPES), category="Category"))
+    return game
+
+
+def time_per_call(func, game: Game, player_ids: List[str], iterations: int) -> float:
+    """Return microseconds per call"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(game, player_ids[i % len(player_ids)])
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    quiet_logging()
+    random.seed(42)
+
+    print(f"{'players':>8} {'scan match µs':>14} {'index match µs':>15} {'scan lookup µs':>15} {'dict lookup µs':>15}")
+    for player_count in (8, 32, 128, 512):
+        game = build_room(player_count)
+        player_ids = [player.id for player in game.players]
+        scan_match = time_per_call(scan_matches, game, player_ids, args.iterations)
+        index_match = time_per_call(Game.find_matching_players, game, player_ids, args.iterations)
+        scan_lookup = time_per_call(scan_get_player, game, player_ids, args.iterations)
+        dict_lookup = time_per_call(Game.get_player, game, player_ids, args.iterations)
+        print(f"{player_count:>8} {scan_match:>14.1f} {index_match:>15.1f} {scan_lookup:>15.2f} {dict_lookup:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
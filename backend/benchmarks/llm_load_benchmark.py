@@ -0,0 +1,123 @@
+"""startGame and reshuffle latency at realistic LLM latency, healthy vs degraded provider
+
+For each stub profile, runs benchmarks.llm_stub in-process and points a real
+GameService/LLMService at it with the deck pool, category corpus and category
+cache turned off, so every deck is generated by the (stub) LLM (concurrent
+identical requests still share one call, as in production). `--games` games
+arrive at `--rate` per second; each starts, then flips through its deck once
+so the reshuffle (normally served by the prefetched next deck) is timed too.
+Flips are accelerated, so a slow LLM makes prefetches late more often than in
+real play.
+
+Usage (from the backend directory):
+    python -m benchmarks.llm_load_benchmark [--games 40] [--rate 4] [--players 6] [--flip-interval-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Tuple
+
+# Every deck must come from the LLM - set before the services read their configuration
+os.environ.update({
+    "DECK_POOL_SIZE": "0",
+    "CATEGORY_CORPUS_ENABLED": "false",
+    "CATEGORY_CACHE_MAX_ENTRIES": "0",
+    "SPECULATIVE_DECKS": "false"
+})
+
+import httpx
+
+from benchmarks.common import quiet_logging, run
+from benchmarks.llm_stub import StubProfile, start_stub
+from models.game_models import GameStatus
+from services.game_service import GameService
+from services.llm_service import LLMService
+from services.metrics import LatencyTracker
+from services.room_service import RoomService
+
+PROFILES: Dict[str, StubProfile] = {
+    "healthy": StubProfile(),
+    "slow tail": StubProfile(latency_sigma=1.0),
+    "degraded": StubProfile(latency_ms=2000, latency_sigma=0.8, error_rate=0.2, truncate_rate=0.2),
+}
+
+
+async def play_game(game_service: GameService, delay: float, players: int, flip_interval: float,
+                    start_latency: LatencyTracker, reshuffle_latency: LatencyTracker) -> None:
+    """Arrive after `delay`, start a game and flip until the first reshuffle"""
+    await asyncio.sleep(delay)
+    room_service = game_service.room_service
+    room_code = room_service.create_room("Player 1")["room"]["roomCode"]
+    for i in range(2, players + 1):
+        room_service.join_room(room_code, f"socket-{i}", f"Player {i}")
+
+    started = time.perf_counter()
+    await game_service.start_game(room_code)
+    start_latency.record(time.perf_counter() - started)
+
+    game = game_service.active_games[room_code]
+    for _ in range(2000):
+        if game.status == GameStatus.FACEOFF and game.current_faceoff:
+            await game_service.resolve_faceoff(room_code, game.current_faceoff.player2_id)
+            continue
+        reshuffle = len(game.deck) == 0
+        started = time.perf_counter()
+        await game_service.flip_card(room_code, game.current_player_id)
+        if reshuffle:
+            reshuffle_latency.record(time.perf_counter() - started)
+            break
+        await asyncio.sleep(flip_interval)
+
+
+async def run_profile(base_url: str, args: argparse.Namespace) -> Tuple[LatencyTracker, LatencyTracker]:
+    """Play every game against the stub at `base_url`"""
+    llm_service = LLMService(base_url=base_url)
+    game_service = GameService(RoomService(), llm_service)
+    start_latency = LatencyTracker(max_samples=args.games)
+    reshuffle_latency = LatencyTracker(max_samples=args.games)
+
+    await asyncio.gather(*(
+        play_game(game_service, i / args.rate, args.players, args.flip_interval_ms / 1000, start_latency, reshuffle_latency)
+        for i in range(args.games)
+    ))
+
+    for task in list(game_service.deck_prefetch_tasks.values()):
+        task.cancel()
+    await llm_service.close()
+    return start_latency, reshuffle_latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--rate", type=float, default=4.0, help="games started per second")
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--flip-interval-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=3911)
+    args = parser.parse_args()
+
+    quiet_logging()
+    random.seed(42)
+
+    header = f"{'profile':<10} {'':<10} {'n':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(f"{args.games} games at {args.rate}/s, {args.players} players\n\n{header}")
+    for name, profile in PROFILES.items():
+        server, thread = start_stub(profile, args.port)
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+        start_latency, reshuffle_latency = run(run_profile(base_url, args))
+        stub_stats = httpx.get(f"http://127.0.0.1:{args.port}/stats").json()
+        server.should_exit = True
+        thread.join()
+
+        for label, tracker in (("startGame", start_latency), ("reshuffle", reshuffle_latency)):
+            summary = tracker.summary()
+            print(f"{name:<10} {label:<10} {summary['count']:>4} {summary['p50Ms']:>8} {summary['p95Ms']:>8} {summary['p99Ms']:>8} {summary['maxMs']:>8}")
+        print(f"{'':<10} stub: {stub_stats['requests']} requests, {stub_stats['errors']} errors, "
+              f"{stub_stats['truncated']} truncated\n")
+
+
+if __name__ == "__main__":
+    main()
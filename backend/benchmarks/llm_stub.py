@@ -0,0 +1,213 @@
+"""Local OpenAI-compatible stand-in for the category LLM
+
+Serves `POST /v1/chat/completions` (plain and `stream=True`) with realistic
+category arrays, so deck generation can be load-tested offline at a chosen
+latency profile. Point the backend at it with LLM_BASE_URL.
+
+- Latency: time to first token is log-normal (`--latency-ms` median,
+  `--latency-sigma` spread) plus `--per-input-token-ms` of prefill per prompt
+  token, then `--per-item-ms` of decode time per category
+- `--error-rate`: fraction of requests answered with a 500 or 429
+- `--truncate-rate`: fraction of responses cut off mid-array (finish_reason "length")
+- `--duplicate-rate`: fraction of categories that repeat an earlier one
+- `--off-spec-rate`: fraction of categories that break the naming rules
+  ("Type of Cheese", "Things") for the local filter to catch
+
+The stub doesn't read the prompt beyond the requested count, so it models a
+prompt's cost (prefill), not how well a model follows it.
+
+`GET /stats` reports request, error and truncation counts.
+
+Usage (from the backend directory):
+    python -m benchmarks.llm_stub [--port 3902] [--latency-ms 800] [--error-rate 0.05]
+    LLM_BASE_URL=http://127.0.0.1:3902/v1 python start.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+if TYPE_CHECKING:
+    import uvicorn
+
+# Real-world subjects and qualifiers, combined into category names like "Italian Cheese"
+SUBJECTS = [
+    "Dog Breed", "Cheese", "Pizza Topping", "Breakfast Cereal", "Candy Bar", "Soda Brand", "Fast Food Chain",
+    "Ice Cream Flavor", "Fruit", "Vegetable", "Spice", "Pasta Shape", "Sandwich", "Soup", "Dessert", "Cocktail",
+    "Flower", "Tree", "Bird", "Fish", "Insect", "Reptile", "Ocean Animal", "Farm Animal", "Mammal", "Dinosaur",
+    "Movie", "TV Show", "Cartoon Character", "Superhero", "Villain", "Board Game", "Video Game", "Card Game",
+    "Musical Instrument", "Band", "Singer", "Song", "Dance Style", "Music Genre", "Painter", "Novel", "Author",
+    "Poet", "Car Brand", "Phone Brand", "App", "Website", "Social Media Platform", "Programming Language",
+    "City", "Country", "Capital City", "River", "Mountain", "Island", "Desert", "Lake", "Landmark", "Airport",
+    "Sport", "Olympic Event", "Team Sport", "Athlete", "Yoga Pose", "Martial Art", "Outdoor Activity", "Hobby",
+    "Element", "Planet", "Constellation", "Scientist", "Invention", "Body Part", "Bone", "Disease", "Medicine",
+    "Kitchen Appliance", "Tool", "Furniture", "Clothing Item", "Shoe Brand", "Hat", "Fabric", "Gemstone",
+    "Office Supply", "Vehicle", "Building", "Room in a House", "School Subject", "Job", "Holiday", "Language",
+    "Currency", "Font", "Color", "Shape", "Toy", "Game Show", "Magazine", "Newspaper", "Restaurant Chain",
+    "Coffee Drink", "Tea", "Bread", "Nut", "Berry", "Herb", "Mushroom", "Cloud Type", "Weather Event",
+]
+OFF_SPEC = ["Things", "Stuff", "Food", "Brand", "Board Game Accessory", "Genre", "Type of {}", "Kind of {}", "Brand of {}"]
+QUALIFIERS = [
+    "", "", "", "Famous", "Italian", "Japanese", "Mexican", "French", "Classic", "Vintage", "Popular",
+    "Tropical", "Winter", "Summer", "Children's", "Fictional", "British", "Spicy", "Tiny", "Giant",
+]
+
+
+@dataclass
+class StubProfile:
+    """How the stub behaves; every rate is a probability per request"""
+    latency_ms: float = 800.0    # Median time to first token
+    latency_sigma: float = 0.4   # Log-normal spread of the time to first token
+    per_input_token_ms: float = 0.2  # Prefill time per prompt token
+    per_item_ms: float = 15.0    # Decode time per category
+    error_rate: float = 0.0
+    truncate_rate: float = 0.0
+    duplicate_rate: float = 0.05
+    off_spec_rate: float = 0.0
+
+
+def make_categories(count: int, duplicate_rate: float, off_spec_rate: float = 0.0) -> List[str]:
+    """`count` category names, with roughly `duplicate_rate` of them repeating earlier ones
+    and `off_spec_rate` of them breaking the naming rules"""
+    names: List[str] = []
+    for _ in range(count):
+        if names and random.random() < duplicate_rate:
+            names.append(random.choice(names))
+        elif random.random() < off_spec_rate:
+            names.append(random.choice(OFF_SPEC).format(random.choice(SUBJECTS)))
+        else:
+            qualifier = random.choice(QUALIFIERS)
+            subject = random.choice(SUBJECTS)
+            names.append(f"{qualifier} {subject}" if qualifier else subject)
+    return names
+
+
+def create_app(profile: StubProfile) -> FastAPI:
+    """Build the stub app for a latency/error profile"""
+    app = FastAPI(title="LLM stub")
+    stats = {"requests": 0, "errors": 0, "truncated": 0, "streamed": 0}
+
+    def completion_chunk(model: str, content: Optional[str], finish_reason: Optional[str] = None) -> str:
+        chunk = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "stub")
+        messages = body.get("messages", [{}])
+        prompt = messages[-1].get("content", "")
+        match = re.search(r"Generate (\d+)", prompt)
+        count = int(match.group(1)) if match else 50
+        prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4
+
+        first_token = random.lognormvariate(0, profile.latency_sigma) * profile.latency_ms / 1000
+        first_token += profile.per_input_token_ms / 1000 * prompt_tokens
+        if random.random() < profile.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(first_token)
+            status = random.choice([429, 500])
+            return JSONResponse(status_code=status, content={"error": {"message": "stub error", "type": "server_error", "code": status}})
+
+        content = json.dumps(make_categories(count, profile.duplicate_rate, profile.off_spec_rate), indent=1)
+        finish_reason = "stop"
+        if random.random() < profile.truncate_rate:
+            stats["truncated"] += 1
+            content = content[:int(len(content) * random.uniform(0.3, 0.9))]
+            finish_reason = "length"
+        decode_per_char = profile.per_item_ms / 1000 * count / max(1, len(content))
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+
+            async def events() -> AsyncIterator[str]:
+                await asyncio.sleep(first_token)
+                for start in range(0, len(content), 16):
+                    piece = content[start:start + 16]
+                    await asyncio.sleep(decode_per_char * len(piece))
+                    yield completion_chunk(model, piece)
+                yield completion_chunk(model, None, finish_reason)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(first_token + decode_per_char * len(content))
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4}
+        }
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        return stats
+
+    return app
+
+
+def start_stub(profile: StubProfile, port: int) -> Tuple["uvicorn.Server", threading.Thread]:
+    """Serve the stub on a background thread (for benchmarks that run it in-process)"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(profile), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command-line flags for each StubProfile field"""
+    defaults = StubProfile()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--per-input-token-ms", type=float, default=defaults.per_input_token_ms)
+    parser.add_argument("--per-item-ms", type=float, default=defaults.per_item_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--truncate-rate", type=float, default=defaults.truncate_rate)
+    parser.add_argument("--duplicate-rate", type=float, default=defaults.duplicate_rate)
+    parser.add_argument("--off-spec-rate", type=float, default=defaults.off_spec_rate)
+
+
+def profile_from_args(args: argparse.Namespace) -> StubProfile:
+    return StubProfile(args.latency_ms, args.latency_sigma, args.per_input_token_ms, args.per_item_ms,
+                       args.error_rate, args.truncate_rate, args.duplicate_rate, args.off_spec_rate)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3902)
+    parser.add_argument("--seed", type=int, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    uvicorn.run(create_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
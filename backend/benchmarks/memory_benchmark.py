@@ -0,0 +1,85 @@
+"""Memory held per running game, for sizing how many rooms fit in a container
+
+Starts `--rooms` games (fallback categories, no LLM), plays `--flips` turns in
+each and measures the memory they retain with tracemalloc. Also reports the
+size of a single card and its draw-pile share.
+
+Usage (from the backend directory):
+    python -m benchmarks.memory_benchmark [--rooms 200] [--players 8] [--flips 30] [--container-mb 512]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from enum import Enum
+
+from benchmarks.common import play_turns, quiet_logging, start_room
+from services.game_service import GameService
+from services.room_service import RoomService
+
+
+def deep_size(obj, seen=None) -> int:
+    """Approximate retained size of an object graph (shared objects counted once)"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen or isinstance(obj, Enum):
+        return 0  # Enum members are process-wide singletons
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_size(obj.__dict__, seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--flips", type=int, default=30)
+    parser.add_argument("--container-mb", type=int, default=512)
+    args = parser.parse_args()
+
+    quiet_logging()
+    random.seed(42)
+    room_service = RoomService()
+    game_service = GameService(room_service, llm_service=None)
+
+    # Warm up module-level tables and caches so they aren't charged to the first room
+    warmup_room = start_room(game_service, args.players)
+    play_turns(game_service, warmup_room, args.flips)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(args.rooms):
+        room_code = start_room(game_service, args.players)
+        play_turns(game_service, room_code, args.flips)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_room = (after - before) / args.rooms
+    game = game_service.active_games[room_code]
+    card = game.deck.peek()[0]
+    draw_pile = deep_size(list(game.deck))
+
+    print(f"{args.rooms} rooms, {args.players} players, {args.flips} flips each")
+    print(f"  retained per room (room + game):  {per_room / 1024:8.1f} KiB")
+    print(f"  game object graph (deep size):    {deep_size(game) / 1024:8.1f} KiB")
+    print(f"  one card (deep size):             {deep_size(card):8d} B")
+    print(f"  draw pile ({len(game.deck)} cards):            {draw_pile / 1024:8.1f} KiB")
+    print(f"  rooms per {args.container_mb} MiB container:       {int(args.container_mb * 1024 * 1024 / per_room):8d}")
+
+
+if __name__ == "__main__":
+    main()
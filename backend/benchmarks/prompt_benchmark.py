@@ -0,0 +1,92 @@
+"""Input tokens, latency and post-filter yield per prompt template
+
+For each template in services.prompt_templates, sends `--requests` category
+requests of `--count` through LLMService._generate_with_openai and reports:
+
+- input tokens per request (tiktoken if installed, else ~4 characters/token)
+- request latency p50/p95 (time to the last category kept)
+- yield: categories per request left after clean_category_name and
+  _filter_duplicates, as a share of `--count`
+
+By default it runs against benchmarks.llm_stub in-process. The stub charges
+prefill per prompt token but doesn't follow the prompt, so the yield column
+measures the local filters there; pass `--base-url` (plus LLM_API_KEY and
+`--model`) to compare how a real model follows each template.
+
+Usage (from the backend directory):
+    python -m benchmarks.prompt_benchmark [--requests 20] [--count 60] [--off-spec-rate 0.05]
+    python -m benchmarks.prompt_benchmark --base-url https://api.openai.com/v1 --model gpt-4o-mini --requests 5
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Tuple
+
+# Categories must come straight from the LLM - set before the services read their configuration
+os.environ["CATEGORY_CORPUS_ENABLED"] = "false"
+
+from benchmarks.common import quiet_logging, run
+from benchmarks.llm_stub import StubProfile, start_stub
+from services.llm_service import LLMService
+from services.metrics import LatencyTracker
+from services.prompt_templates import PROMPT_TEMPLATES, PromptTemplate, tokenizer_name
+
+
+async def run_template(llm_service: LLMService, template: PromptTemplate,
+                       args: argparse.Namespace) -> Tuple[LatencyTracker, int, int, int]:
+    """Send every request with `template`; return (latency, categories received, categories kept, rejected)"""
+    llm_service.prompt_template = template
+    rejected_before = llm_service.prompt_stats["rejected"]
+    latency = LatencyTracker(max_samples=args.requests)
+    received = kept = 0
+
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        categories = await llm_service._generate_with_openai(args.count)
+        latency.record(time.perf_counter() - started)
+        received += len(categories)
+        kept += min(args.count, len(llm_service._filter_duplicates(categories, len(categories), 0)))
+
+    return latency, received, kept, llm_service.prompt_stats["rejected"] - rejected_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--count", type=int, default=60, help="categories per request")
+    parser.add_argument("--off-spec-rate", type=float, default=0.05, help="stub only: share of rule-breaking names")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint instead of the stub")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--port", type=int, default=3912)
+    args = parser.parse_args()
+
+    quiet_logging()
+    random.seed(42)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, thread = start_stub(StubProfile(duplicate_rate=0.05, off_spec_rate=args.off_spec_rate), args.port)
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+    llm_service = LLMService(base_url=base_url, model=args.model)
+    model = llm_service.openai_model
+
+    print(f"{args.requests} requests of {args.count} categories from {args.base_url or 'the stub'} ({model}), "
+          f"tokens by {tokenizer_name(model)}\n")
+    print(f"{'template':<12} {'input tok':>9} {'p50 ms':>8} {'p95 ms':>8} {'received':>9} {'rejected':>9} {'yield':>7}")
+    for template in PROMPT_TEMPLATES.values():
+        latency, received, kept, rejected = run(run_template(llm_service, template, args))
+        summary = latency.summary()
+        print(f"{template.id:<12} {template.token_count(args.count, model):>9} {summary['p50Ms']:>8} {summary['p95Ms']:>8} "
+              f"{received / args.requests:>9.1f} {rejected / args.requests:>9.1f} {kept / (args.requests * args.count):>7.1%}")
+
+    run(llm_service.close())
+    if server is not None:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
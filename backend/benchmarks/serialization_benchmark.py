@@ -0,0 +1,59 @@
+"""Serialization CPU per broadcast event: per-socket json.dumps vs encode-once
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization_benchmark [--players 8] [--events 200]
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import build_game, play_turns, quiet_logging
+from services.wire_codec import JsonFrameEncoder, OrjsonFrameEncoder, orjson
+
+
+def collect_events(players: int, events: int):
+    """Play a game and capture the broadcast messages it produces"""
+    game_service, room_code = build_game(player_count=players, flips=30)
+    game = game_service.active_games[room_code]
+    messages = []
+    while len(messages) < events:
+        play_turns(game_service, room_code, 1)
+        messages.append({"type": "cardFlipped", "data": {"success": True, "gameState": game.to_dict()}})
+    return messages
+
+
+def measure(label: str, messages, encode, encodes_per_event: int) -> float:
+    """Return CPU microseconds per event for the given encode strategy"""
+    start = time.process_time()
+    for message in messages:
+        for _ in range(encodes_per_event):
+            encode(message)
+    elapsed = time.process_time() - start
+    per_event_us = elapsed / len(messages) * 1_000_000
+    print(f"  {label:<40} {per_event_us:>10.1f} µs/event")
+    return per_event_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    quiet_logging()
+    messages = collect_events(args.players, args.events)
+    average_size = sum(len(json.dumps(m)) for m in messages) / len(messages)
+    print(f"{len(messages)} events, {args.players} sockets/room, avg payload {average_size / 1024:.1f} KB")
+
+    baseline = measure("before: json.dumps per socket", messages, json.dumps, args.players)
+    measure("after: json encode once", messages, JsonFrameEncoder().encode, 1)
+    if orjson is not None:
+        fastest = measure("after: orjson encode once", messages, OrjsonFrameEncoder().encode, 1)
+        print(f"  speedup (orjson once vs json per socket): {baseline / fastest:.1f}x")
+    else:
+        print("  orjson not installed - skipping orjson encoder")
+
+
+if __name__ == "__main__":
+    main()
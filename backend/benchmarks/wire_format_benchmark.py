@@ -0,0 +1,86 @@
+"""Message size and encode/decode time per wire format for the real message types
+
+Compares JSON (stdlib and orjson) with MessagePack (anomia.msgpack.v1) on
+cardFlipped, faceoffDetected, faceoffResolved and roomJoined messages taken
+from a simulated game.
+
+Usage (from the backend directory):
+    python -m benchmarks.wire_format_benchmark [--players 8] [--iterations 2000]
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import build_game, quiet_logging, run
+from models.game_models import GameStatus
+from services.wire_codec import FrameEncoder, JsonFrameEncoder, MsgpackFrameEncoder, OrjsonFrameEncoder, msgpack, orjson
+
+
+def collect_messages(players: int) -> Dict[str, Dict[str, Any]]:
+    """Play until a faceoff happens and capture one message of each type"""
+    game_service, room_code = build_game(player_count=players, flips=20)
+    room_service = game_service.room_service
+    game = game_service.active_games[room_code]
+
+    # Make sure the next flip starts from an active (non-faceoff) state
+    if game.status == GameStatus.FACEOFF:
+        run(game_service.resolve_faceoff(room_code, game.current_faceoff.player2_id))
+
+    messages: Dict[str, Dict[str, Any]] = {}
+    while "faceoffDetected" not in messages:
+        result = run(game_service.flip_card(room_code, game.current_player_id))
+        messages["cardFlipped"] = {"type": "cardFlipped", "data": result}
+        game_state = result["gameState"]
+        if game_state["status"] == "faceoff":
+            messages["faceoffDetected"] = {
+                "type": "faceoffDetected",
+                "data": {"faceoff": game_state["currentFaceoff"], "gameState": game_state}
+            }
+
+    result = run(game_service.resolve_faceoff(room_code, game.current_faceoff.player2_id))
+    messages["faceoffResolved"] = {"type": "faceoffResolved", "data": result}
+
+    host_token = room_service.get_room(room_code)["players"][0]["sessionToken"]
+    join_result = room_service.join_room(room_code, "socket-bench", "Player 1", session_token=host_token)
+    messages["roomJoined"] = {"type": "roomJoined", "data": join_result}
+    return messages
+
+
+def time_per_op(func, arg, iterations: int) -> float:
+    """Return microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    quiet_logging()
+    messages = collect_messages(args.players)
+
+    encoders: List[FrameEncoder] = [JsonFrameEncoder()]
+    if orjson is not None:
+        encoders.append(OrjsonFrameEncoder())
+    if msgpack is not None:
+        encoders.append(MsgpackFrameEncoder())
+    else:
+        print("msgpack not installed - skipping MessagePack")
+
+    print(f"{'message':<16} {'format':<8} {'bytes':>8} {'encode µs':>10} {'decode µs':>10}")
+    for message_type, message in messages.items():
+        for encoder in encoders:
+            frame = encoder.encode(message)
+            size = len(frame.encode("utf-8")) if isinstance(frame, str) else len(frame)
+            encode_us = time_per_op(encoder.encode, message, args.iterations)
+            decode_us = time_per_op(encoder.decode, frame, args.iterations)
+            print(f"{message_type:<16} {encoder.name:<8} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,19 @@ import uvicorn
 import json
 import logging
 import os
-from typing import Dict, List, Optional
+import re
+from typing import Dict, List, Optional, Set, Tuple, Any
 import uuid
+import asyncio
 from datetime import datetime
 
 from services.room_service import RoomService
 from services.game_service import GameService
 from services.llm_service import LLMService
+from services.state_sync_service import StateSyncService
+from services.wire_codec import Frame, get_frame_encoder, negotiate_encoder
+from services.connection_manager import ConnectionManager
+from services.event_log_service import EventLogService
 from models.game_models import GameStatus
 
 # Configure logging
@@ -54,10 +60,49 @@ app.add_middleware(
 room_service = RoomService()
 llm_service = LLMService()
 game_service = GameService(room_service, llm_service)
+state_sync_service = StateSyncService(game_service.projector)
 
-# Store active WebSocket connections
-active_connections: Dict[str, WebSocket] = {}
-room_connections: Dict[str, List[str]] = {}  # room_code -> [socket_ids]
+# Outbound frames are encoded once per message and shared across sockets
+frame_encoder = get_frame_encoder()
+logger.info(f"📦 Wire encoder: {frame_encoder.name}")
+
+# Active WebSocket connections, each with its own bounded send queue and writer task
+connection_manager = ConnectionManager()
+
+# Sequence-numbered log of room broadcasts so reconnecting clients can resume instead of resyncing
+event_log_service = EventLogService()
+
+# Lobby presence updates (joins/leaves) arriving within this window go out as one frame
+PRESENCE_DEBOUNCE_SECONDS = int(os.getenv("PRESENCE_DEBOUNCE_MS", 100)) / 1000
+pending_presence: Dict[str, Dict[str, Any]] = {}  # room_code -> pending presence update
+presence_tasks: Set[asyncio.Task] = set()  # Running flushes (kept so they aren't garbage-collected)
+
+# Largest page the history endpoint returns
+MAX_HISTORY_PAGE_SIZE = 200
+
+# /llm/test-categories inputs go into the prompt and the category cache key, so they're restricted
+MAX_TEST_CATEGORIES = 208  # Two decks
+TEST_DIFFICULTIES = ("easy", "medium", "hard")
+TEST_THEME_PATTERN = re.compile(r"[A-Za-z0-9 &',-]{1,40}")
+
+# The server's event loop; expired rooms are removed on RoomService's cleanup thread and released here
+event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+@app.on_event("startup")
+async def startup():
+    """Start warming the deck pool and watch for expired rooms"""
+    global event_loop
+    event_loop = asyncio.get_running_loop()
+    room_service.on_room_removed = lambda room_code: event_loop.call_soon_threadsafe(release_room, room_code)
+    game_service.deck_pool.ensure_filled()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop deck pool refills, delete game history spill files and release pooled LLM connections"""
+    await game_service.deck_pool.close()
+    for room_code in list(game_service.active_games):
+        game_service.remove_room(room_code)
+    await llm_service.close()
 
 # Health check endpoint
 @app.get("/health")
@@ -68,6 +113,20 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+# WebSocket connection status endpoint
+@app.get("/connections/status")
+async def connections_status():
+    """Get WebSocket send queue depth, slow-consumer drop counts and event log stats"""
+    return {
+        **connection_manager.get_stats(),
+        "eventLog": event_log_service.get_stats()
+    }
+
+@app.get("/games/status")
+async def games_status():
+    """Get active game counts, deck prefetch/pool stats, startGame latency and time-to-first-flip"""
+    return game_service.get_game_stats()
+
 # LLM service status endpoint
 @app.get("/llm/status")
 async def llm_status():
@@ -76,10 +135,20 @@ async def llm_status():
 
 # Test LLM category generation endpoint
 @app.get("/llm/test-categories")
-async def test_llm_categories(count: int = 5):
+async def test_llm_categories(count: int = 5, difficulty: Optional[str] = None, theme: Optional[str] = None):
     """Test LLM category generation"""
+    count = max(1, min(count, MAX_TEST_CATEGORIES))
+    if difficulty is not None:
+        difficulty = difficulty.strip().lower()
+        if difficulty not in TEST_DIFFICULTIES:
+            raise HTTPException(status_code=400, detail=f"difficulty must be one of {', '.join(TEST_DIFFICULTIES)}")
+    if theme is not None:
+        theme = " ".join(theme.split()).lower()
+        if not TEST_THEME_PATTERN.fullmatch(theme):
+            raise HTTPException(status_code=400, detail="theme must be 1-40 letters, digits, spaces or &',-")
+    
     try:
-        categories = llm_service.generate_categories_for_game(count)
+        categories = await llm_service.generate_categories_for_game(count, difficulty=difficulty, theme=theme, spare_decks=True)
         return {
             "success": True,
             "categories": categories,
@@ -140,6 +209,9 @@ async def create_room(request: dict):
         result = room_service.create_room(host_name)
         logger.info(f"Created room {result['room']['roomCode']} for host {host_name}")
         
+        # Use the lobby wait to generate the deck
+        game_service.prepare_deck(result["room"]["roomCode"], len(result["room"]["players"]))
+        
         return JSONResponse(content=result)
     except Exception as e:
         logger.error(f"Error creating room: {e}")
@@ -157,28 +229,44 @@ async def get_room(room_code: str):
         logger.error(f"Error getting room: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/rooms/{room_code}/history")
+async def get_game_history(room_code: str, cursor: int = 0, limit: int = 50):
+    """Page through a game's event history (oldest first); pass nextCursor to get the next page"""
+    if cursor < 0 or not 1 <= limit <= MAX_HISTORY_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"cursor must be >= 0 and limit between 1 and {MAX_HISTORY_PAGE_SIZE}")
+    
+    result = await game_service.get_game_history(room_code, cursor, limit)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
 # WebSocket endpoint
 @app.websocket("/ws/{room_code}")
 async def websocket_endpoint(websocket: WebSocket, room_code: str):
     """Handle WebSocket connections for real-time game communication"""
-    await websocket.accept()
+    # Negotiate the wire format: binary MessagePack if the client offers it, JSON text otherwise
+    encoder, subprotocol = negotiate_encoder(websocket.scope.get("subprotocols", []), frame_encoder)
+    
+    await websocket.accept(subprotocol=subprotocol)
     
     # Generate unique socket ID
     socket_id = str(uuid.uuid4())
-    active_connections[socket_id] = websocket
-    
-    # Initialize room connections if needed
-    if room_code not in room_connections:
-        room_connections[room_code] = []
-    room_connections[room_code].append(socket_id)
+    connection_manager.connect(socket_id, websocket, room_code, encoder)
     
-    logger.info(f"WebSocket connected: {socket_id} to room {room_code}")
+    logger.info(f"WebSocket connected: {socket_id} to room {room_code} ({encoder.name})")
     
     try:
         while True:
             # Wait for messages from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(event.get("code", 1000))
+            
+            # Binary frames use the negotiated format; text frames are always JSON
+            if event.get("bytes") is not None and encoder.binary:
+                message = encoder.decode(event["bytes"])
+            else:
+                message = json.loads(event.get("text") or event.get("bytes"))
             
             # Handle different message types
             await handle_websocket_message(socket_id, room_code, message)
@@ -207,6 +295,8 @@ async def handle_websocket_message(socket_id: str, room_code: str, message: dict
             await handle_resolve_faceoff(socket_id, room_code, message)
         elif message_type == "leaveRoom":
             await handle_leave_room(socket_id, room_code, message)
+        elif message_type == "requestSync":
+            await handle_request_sync(socket_id, room_code, message)
         else:
             logger.warning(f"Unknown message type: {message_type}")
             
@@ -223,6 +313,12 @@ async def handle_join_room(socket_id: str, room_code: str, message: dict):
             await send_error(socket_id, "playerName is required")
             return
         
+        # Clients opt into newer wire protocols (e.g. "delta" state sync) on join
+        capabilities = message.get("capabilities") or []
+        connection = connection_manager.get(socket_id)
+        if connection:
+            connection.capabilities = set(capabilities)
+        
         # Pass session_token for secure reconnection (industry standard)
         result = room_service.join_room(room_code, socket_id, player_name, session_token=session_token)
         
@@ -230,22 +326,27 @@ async def handle_join_room(socket_id: str, room_code: str, message: dict):
             logger.info(f"Player {player_name} joined/reconnected to room {room_code}")
             
             # Ensure socket is in room_connections
-            if room_code not in room_connections:
-                room_connections[room_code] = []
-            if socket_id not in room_connections[room_code]:
-                room_connections[room_code].append(socket_id)
+            connection_manager.add_to_room(room_code, socket_id)
+            
+            # A growing lobby may need a two-deck game
+            if result["room"]["status"] == "waiting":
+                game_service.prepare_deck(room_code, len(result["room"]["players"]))
             
-            # Send confirmation to the joining player
+            # Send confirmation to the joining player (seq is the room log position it reflects)
             await send_message(socket_id, {
                 "type": "roomJoined",
+                "seq": event_log_service.current_seq(room_code),
                 "data": result
             })
             
-            # Notify all players in the room
-            await broadcast_to_room(room_code, {
-                "type": "playerJoined",
-                "data": result
-            })
+            # Delta clients reconnecting with lastSeq get only what they missed; otherwise
+            # delta clients joining a running game get a full snapshot to apply deltas to
+            last_seq = message.get("lastSeq")
+            if not (isinstance(last_seq, int) and await send_resume(socket_id, room_code, last_seq)):
+                await send_state_snapshot(socket_id, room_code)
+            
+            # Notify the other players (the joiner already has the room from roomJoined)
+            schedule_presence_update(room_code, "playerJoined", joined_socket_id=socket_id)
         else:
             logger.warning(f"Failed to join room: {result['message']}")
             await send_error(socket_id, result["message"])
@@ -263,17 +364,14 @@ async def handle_leave_room(socket_id: str, room_code: str, message: dict):
         if success:
             logger.info(f"Player left room {room_code}")
             
-            # Get updated room data
+            # Broadcast player left message to all remaining players
+            schedule_presence_update(room_code, "playerLeft")
+            
             room = room_service.get_room(room_code)
-            if room:
-                # Broadcast player left message to all remaining players
-                await broadcast_to_room(room_code, {
-                    "type": "playerLeft",
-                    "data": {
-                        "room": room,
-                        "players": room["players"]
-                    }
-                })
+            if not room or room.get("status") == "abandoned":
+                game_service.cancel_speculative_deck(room_code)
+                if not connection_manager.room_connections.get(room_code):
+                    release_room(room_code)
         else:
             logger.warning(f"Failed to leave room {room_code} for socket {socket_id}")
             
@@ -293,13 +391,21 @@ async def handle_start_game(socket_id: str, room_code: str, message: dict):
             return
         
         # Start the game
-        result = game_service.start_game(room_code)
+        result = await game_service.start_game(room_code)
         
         if result["success"]:
+            # A new game starts a new version history; delta clients get the snapshot
+            game = game_service.active_games[room_code]
+            delta_data = {key: value for key, value in result.items() if key != "gameState"}
+            delta_data["stateSnapshot"] = state_sync_service.reset_room(room_code, game)
+            
             # Broadcast game started to all players in the room
             await broadcast_to_room(room_code, {
                 "type": "gameStarted",
                 "data": result
+            }, delta_message={
+                "type": "gameStarted",
+                "data": delta_data
             })
             logger.info(f"Game started for room {room_code}")
         else:
@@ -317,34 +423,27 @@ async def handle_flip_card(socket_id: str, room_code: str, message: dict):
             await send_error(socket_id, "playerId is required")
             return
         
-        result = game_service.flip_card(room_code, player_id)
+        result = await game_service.flip_card(room_code, player_id)
         
         if result["success"]:
             # Check if game ended (deck ran out)
             if result.get("gameEnded"):
                 logger.info(f"Game ended for room {room_code}")
-                await broadcast_to_room(room_code, {
-                    "type": "gameEnded",
-                    "data": result
-                })
+                await publish_game_events(room_code, [("gameEnded", result)])
                 return
             
-            # Check if a faceoff was detected and send separate message
+            # Check if a faceoff was detected and send separate event
+            events: List[Tuple[str, dict]] = []
             game_state = result.get("gameState", {})
             if game_state.get("status") == "faceoff" and game_state.get("currentFaceoff"):
-                await broadcast_to_room(room_code, {
-                    "type": "faceoffDetected",
-                    "data": {
-                        "faceoff": game_state["currentFaceoff"],
-                        "gameState": game_state
-                    }
-                })
+                events.append(("faceoffDetected", {
+                    "faceoff": game_state["currentFaceoff"],
+                    "gameState": game_state
+                }))
             
             # Always broadcast the updated game state
-            await broadcast_to_room(room_code, {
-                "type": "cardFlipped",
-                "data": result
-            })
+            events.append(("cardFlipped", result))
+            await publish_game_events(room_code, events)
         else:
             await send_error(socket_id, result["error"])
             
@@ -363,13 +462,10 @@ async def handle_submit_answer(socket_id: str, room_code: str, message: dict):
             await send_error(socket_id, "playerId, answer, and category are required")
             return
         
-        result = game_service.submit_answer(room_code, str(player_id), str(answer), str(category))
+        result = await game_service.submit_answer(room_code, str(player_id), str(answer), str(category))
         
         if result["success"]:
-            await broadcast_to_room(room_code, {
-                "type": "answerSubmitted",
-                "data": result
-            })
+            await publish_game_events(room_code, [("answerSubmitted", result)])
         else:
             await send_error(socket_id, result["error"])
             
@@ -385,14 +481,11 @@ async def handle_resolve_faceoff(socket_id: str, room_code: str, message: dict):
             await send_error(socket_id, "loserId is required")
             return
         
-        result = game_service.resolve_faceoff(room_code, loser_id)
+        result = await game_service.resolve_faceoff(room_code, loser_id)
         
         if result["success"]:
             # Broadcast faceoff resolved to all players
-            await broadcast_to_room(room_code, {
-                "type": "faceoffResolved",
-                "data": result
-            })
+            await publish_game_events(room_code, [("faceoffResolved", result)])
         else:
             await send_error(socket_id, result["error"])
             
@@ -400,58 +493,63 @@ async def handle_resolve_faceoff(socket_id: str, room_code: str, message: dict):
         logger.error(f"Error resolving faceoff: {e}")
         await send_error(socket_id, str(e))
 
+async def handle_request_sync(socket_id: str, room_code: str, message: dict):
+    """Handle a client asking for a full state snapshot (e.g. after a version gap)"""
+    try:
+        if room_code not in game_service.active_games:
+            await send_error(socket_id, "Game not found")
+            return
+        
+        await send_state_snapshot(socket_id, room_code, force=True)
+            
+    except Exception as e:
+        logger.error(f"Error handling sync request: {e}")
+        await send_error(socket_id, str(e))
+
 async def handle_disconnect(socket_id: str, room_code: str):
     """Handle WebSocket disconnection"""
     try:
         # Get room to check game status
         room = room_service.get_room(room_code)
         
-        # Remove from active connections
-        if socket_id in active_connections:
-            del active_connections[socket_id]
-        
-        # Remove from room connections (but keep player in room for reconnection)
-        if room_code in room_connections and socket_id in room_connections[room_code]:
-            room_connections[room_code].remove(socket_id)
+        # Remove from active and room connections (but keep player in room for reconnection)
+        connection_manager.disconnect(socket_id)
         
         # Only remove player from room if game is not active (allows reconnection during game)
         if room and room.get("status") == "waiting":
             # Remove player from room only if in lobby
             success = room_service.leave_room(room_code, socket_id)
-            if success and room_connections.get(room_code):
+            if success and connection_manager.room_connections.get(room_code):
                 # Broadcast player left message to all remaining players
-                updated_room = room_service.get_room(room_code)
-                if updated_room:
-                    await broadcast_to_room(room_code, {
-                        "type": "playerLeft",
-                        "data": {
-                            "room": updated_room,
-                            "players": updated_room["players"]
-                        }
-                    })
-        else:
+                schedule_presence_update(room_code, "playerLeft")
+        
+        # Nobody left to resume into an abandoned room - drop its per-room state
+        room = room_service.get_room(room_code)
+        if (not room or room.get("status") == "abandoned") and not connection_manager.room_connections.get(room_code):
+            release_room(room_code)
+        elif room and room.get("status") == "active":
             # During active game, just mark socket as disconnected (player can reconnect)
             logger.info(f"Player disconnected during active game in room {room_code}, allowing reconnection")
             
-        # Clean up empty rooms
-        if room_code in room_connections and not room_connections[room_code]:
-            del room_connections[room_code]
-            
     except Exception as e:
         logger.error(f"Error handling disconnect: {e}")
 
+def release_room(room_code: str):
+    """Drop per-room state once a room is abandoned with nobody connected, or has expired"""
+    state_sync_service.remove_room(room_code)
+    event_log_service.remove_room(room_code)
+    game_service.cancel_speculative_deck(room_code)
+    game_service.remove_room(room_code)
+
 async def send_message(socket_id: str, message: dict):
     """Send a message to a specific WebSocket connection"""
-    try:
-        if socket_id in active_connections:
-            await active_connections[socket_id].send_text(json.dumps(message))
-        else:
-            logger.debug(f"Socket {socket_id} not in active_connections, message not sent")
-    except Exception as e:
-        logger.warning(f"Error sending message to {socket_id}: {e}")
-        # Remove from active connections if send fails
-        if socket_id in active_connections:
-            del active_connections[socket_id]
+    connection = connection_manager.get(socket_id)
+    encoder = connection.encoder if connection else frame_encoder
+    await send_frame(socket_id, encoder.encode(message))
+
+async def send_frame(socket_id: str, frame: Frame):
+    """Queue an already-encoded frame for a specific WebSocket connection"""
+    connection_manager.send(socket_id, frame)
 
 async def send_error(socket_id: str, error_message: str):
     """Send an error message to a specific WebSocket connection"""
@@ -460,22 +558,176 @@ async def send_error(socket_id: str, error_message: str):
         "message": error_message
     })
 
-async def broadcast_to_room(room_code: str, message: dict):
-    """Broadcast a message to all players in a room"""
-    if room_code in room_connections:
-        disconnected_sockets = []
-        for socket_id in room_connections[room_code]:
-            try:
-                await send_message(socket_id, message)
-            except Exception as e:
-                logger.warning(f"Failed to send message to socket {socket_id}: {e}")
-                disconnected_sockets.append(socket_id)
+async def send_state_snapshot(socket_id: str, room_code: str, force: bool = False):
+    """Send a full versioned state snapshot to a delta client"""
+    game = game_service.active_games.get(room_code)
+    if not game:
+        return
+    if not force and not connection_manager.has_capability(socket_id, "delta"):
+        return
+    
+    # Only the requesting player gets their private view
+    room = room_service.get_room(room_code)
+    player_id = None
+    if room:
+        player_id = next((p["id"] for p in room["players"] if p.get("socketId") == socket_id), None)
+    
+    await send_message(socket_id, {
+        "type": "stateSnapshot",
+        "seq": event_log_service.current_seq(room_code),
+        "data": state_sync_service.snapshot(room_code, game, player_id=player_id)
+    })
+
+async def send_resume(socket_id: str, room_code: str, last_seq: int) -> bool:
+    """Replay the room messages a reconnecting delta client missed since `last_seq`
+    
+    Returns False if the client can't be caught up from the event log and needs a snapshot.
+    """
+    if not connection_manager.has_capability(socket_id, "delta"):
+        return False
+    
+    missed = event_log_service.messages_since(room_code, last_seq)
+    if missed is None:
+        logger.info(f"Socket {socket_id} resume from seq {last_seq} is outside the event log for room {room_code}")
+        return False
+    
+    data: Dict[str, Any] = {"fromSeq": last_seq, "messages": missed}
+    game = game_service.active_games.get(room_code)
+    room = room_service.get_room(room_code)
+    if game and room:
+        player_id = next((p["id"] for p in room["players"] if p.get("socketId") == socket_id), None)
+        private_view = game_service.projector.private_view(game, player_id) if player_id else None
+        if private_view:
+            data["self"] = private_view
+    
+    # One frame however many messages were missed
+    await send_message(socket_id, {
+        "type": "resumed",
+        "seq": event_log_service.current_seq(room_code),
+        "data": data
+    })
+    return True
+
+async def publish_game_events(room_code: str, events: List[Tuple[str, dict]]):
+    """Broadcast the ordered events produced by one game command
+    
+    - legacy clients get one frame per event, each with the full gameState
+    - "delta" clients get stateDelta instead of gameState (the first event carries the changes)
+    - "batch" clients get a single frame with the ordered event list and one state payload
+    """
+    delta = None
+    game = game_service.active_games.get(room_code)
+    if game:
+        delta = state_sync_service.build_delta(room_code, game)
+    game_state = events[-1][1].get("gameState") if events else None
+    
+    def strip_state(data: dict) -> dict:
+        return {key: value for key, value in data.items() if key != "gameState"}
+    
+    def build_messages(variant: Tuple[bool, bool]) -> List[dict]:
+        use_delta, use_batch = variant
+        if use_batch:
+            batch_message = {
+                "type": "batch",
+                "events": [{"type": event_type, "data": strip_state(data)} for event_type, data in events]
+            }
+            if use_delta:
+                batch_message["stateDelta"] = delta
+            else:
+                batch_message["gameState"] = game_state
+            return [batch_message]
+        
+        if use_delta:
+            messages = []
+            for index, (event_type, data) in enumerate(events):
+                event_delta = delta if index == 0 else {"version": delta["version"], "baseVersion": delta["version"], "changes": {}}
+                messages.append({"type": event_type, "data": {**strip_state(data), "stateDelta": event_delta}})
+            return messages
         
-        # Remove disconnected sockets from room_connections
-        for socket_id in disconnected_sockets:
-            if room_code in room_connections:
-                room_connections[room_code] = [s for s in room_connections[room_code] if s != socket_id]
-                logger.info(f"Removed disconnected socket {socket_id} from room {room_code}")
+        return [{"type": event_type, "data": data} for event_type, data in events]
+    
+    # The per-event delta form is what gets logged for resuming clients
+    logged_variant = (delta is not None, False)
+    logged_messages = build_messages(logged_variant)
+    seq = event_log_service.append(room_code, logged_messages)
+    
+    # Each (protocol variant, wire format) is built and encoded once for the whole room
+    frames: Dict[tuple, List[Frame]] = {}
+    for connection in connection_manager.get_room_connections(room_code):
+        variant = (delta is not None and "delta" in connection.capabilities, "batch" in connection.capabilities)
+        frame_key = (variant, connection.encoder.name)
+        if frame_key not in frames:
+            messages = logged_messages if variant == logged_variant else build_messages(variant)
+            for message in messages:
+                message["seq"] = seq
+            frames[frame_key] = [connection.encoder.encode(message) for message in messages]
+        for frame in frames[frame_key]:
+            connection_manager.send(connection.socket_id, frame)
+
+def schedule_presence_update(room_code: str, message_type: str, joined_socket_id: Optional[str] = None):
+    """Queue a lobby presence update; updates within the debounce window go out as one frame"""
+    pending = pending_presence.get(room_code)
+    if pending:
+        pending["type"] = message_type
+        pending["count"] += 1
+        return
+    
+    pending_presence[room_code] = {
+        "type": message_type,
+        "count": 1,
+        "joinedSocketId": joined_socket_id
+    }
+    task = asyncio.create_task(flush_presence_update(room_code))
+    presence_tasks.add(task)
+    task.add_done_callback(presence_tasks.discard)
+
+async def flush_presence_update(room_code: str):
+    """Broadcast the latest room state once the presence debounce window closes"""
+    await asyncio.sleep(PRESENCE_DEBOUNCE_SECONDS)
+    pending = pending_presence.pop(room_code, None)
+    room = room_service.get_room(room_code)
+    if not pending or not room:
+        return
+    
+    # A lone joiner already has this room state from roomJoined
+    exclude = pending["joinedSocketId"] if pending["count"] == 1 else None
+    
+    # Data works for both playerJoined and playerLeft handlers
+    await broadcast_to_room(room_code, {
+        "type": pending["type"],
+        "data": {
+            "room": room,
+            "players": room["players"]
+        }
+    }, exclude_socket_id=exclude)
+
+async def broadcast_to_room(room_code: str, message: dict, delta_message: Optional[dict] = None,
+                            exclude_socket_id: Optional[str] = None):
+    """Broadcast a message to all players in a room
+    
+    Clients that negotiated the "delta" capability get `delta_message` instead when one is given.
+    Each message variant is encoded once per wire format and the same frame is queued for
+    every socket; nothing here waits on a slow client. Every broadcast is stamped with the
+    room's next `seq` and logged so reconnecting clients can resume from it.
+    """
+    message = dict(message)
+    delta_message = dict(delta_message) if delta_message is not None else None
+    seq = event_log_service.append(room_code, [delta_message if delta_message is not None else message])
+    message["seq"] = seq
+    if delta_message is not None:
+        delta_message["seq"] = seq
+    
+    frames: Dict[tuple, Frame] = {}
+    for connection in connection_manager.get_room_connections(room_code):
+        if connection.socket_id == exclude_socket_id:
+            continue
+        variant = "legacy"
+        if delta_message is not None and "delta" in connection.capabilities:
+            variant = "delta"
+        frame_key = (variant, connection.encoder.name)
+        if frame_key not in frames:
+            frames[frame_key] = connection.encoder.encode(delta_message if variant == "delta" else message)
+        connection_manager.send(connection.socket_id, frames[frame_key])
 
 if __name__ == "__main__":
     uvicorn.run(
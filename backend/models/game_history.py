@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Spill writes running on worker threads (kept so they aren't garbage-collected mid-write)
+_io_tasks: Set[asyncio.Task] = set()
+
+
+class GameHistory:
+    """Game event history: recent events in memory, older ones spilled to disk
+
+    Keeps at least `buffer_size` of the newest events in memory. Once
+    `spill_batch` more have piled up, the oldest batch is appended as JSON lines
+    to a per-game file, so memory stays flat however long the game runs. The
+    file is only created once a game outgrows the buffer, and `close()` deletes it.
+
+    Inside an event loop the write runs on a worker thread, one batch at a
+    time; the batch stays in memory (and is paged from there) until it lands.
+    `page()` reads spilled events back on a worker thread too.
+
+    Events are addressed by their position in the whole history (0 = first
+    event), which is the cursor used by `page()`.
+    """
+    __slots__ = ("buffer_size", "spill_batch", "spill_dir", "_recent", "_spilled_count", "_spill_path", "_batch_offsets",
+                 "_spilling", "_closed")
+
+    def __init__(self, buffer_size: Optional[int] = None, spill_batch: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.buffer_size = buffer_size if buffer_size is not None else int(os.getenv("GAME_HISTORY_BUFFER_SIZE", 100))
+        self.spill_batch = max(1, spill_batch if spill_batch is not None else int(os.getenv("GAME_HISTORY_SPILL_BATCH", 50)))
+        self.spill_dir = spill_dir or os.getenv("GAME_HISTORY_DIR") or os.path.join(tempfile.gettempdir(), "anomia-history")
+
+        self._recent: List[Any] = []  # GameEvents newer than the spilled ones, oldest first
+        self._spilled_count = 0
+        self._spill_path: Optional[str] = None
+        self._batch_offsets: List[int] = []  # File offset of each spilled batch
+        self._spilling = False  # A batch is being written on a worker thread
+        self._closed = False
+
+    def __len__(self) -> int:
+        """Total number of events, including spilled ones"""
+        return self._spilled_count + len(self._recent)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the events still in memory"""
+        return iter(self._recent)
+
+    @property
+    def spilled_count(self) -> int:
+        """Number of events that live only in the spill file"""
+        return self._spilled_count
+
+    def append(self, event: Any) -> None:
+        """Add an event, spilling the oldest batch to disk when the buffer overflows"""
+        self._recent.append(event)
+        if len(self._recent) >= self.buffer_size + self.spill_batch and not self._spilling and not self._closed:
+            self._spill()
+
+    def recent(self, count: int) -> List[Any]:
+        """Get up to the last `count` events (from memory)"""
+        return self._recent[-count:] if count > 0 else []
+
+    async def page(self, cursor: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get serialized events starting at position `cursor`
+
+        Returns the events and the cursor for the next page (None at the end).
+        Spilled events are read back on a worker thread.
+        """
+        total = len(self)
+        start = max(0, min(cursor, total))
+        end = min(start + max(0, limit), total)
+
+        # Take everything needed from memory before awaiting - a spill may land meanwhile
+        spilled_count = self._spilled_count
+        memory_events: List[Dict[str, Any]] = []
+        if end > spilled_count:
+            memory_start = max(start, spilled_count) - spilled_count
+            memory_events = [event.to_dict() for event in self._recent[memory_start:end - spilled_count]]
+
+        events: List[Dict[str, Any]] = []
+        if start < spilled_count and self._spill_path:
+            batch_index = start // self.spill_batch
+            events = await asyncio.to_thread(self._read_spilled, self._spill_path, self._batch_offsets[batch_index],
+                                             start - batch_index * self.spill_batch, min(end, spilled_count) - start)
+        events.extend(memory_events)
+
+        return events, (end if end < total else None)
+
+    def close(self) -> None:
+        """Stop spilling and delete the spill file (the game's room is gone)"""
+        self._closed = True
+        if self._spill_path and not self._spilling:
+            self._run_io(self._delete_spill_file, self._spill_path)
+
+    def _spill(self) -> None:
+        """Append the oldest batch of in-memory events to the spill file"""
+        batch = self._recent[:self.spill_batch]
+        try:
+            if self._spill_path is None:
+                self._spill_path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.jsonl")
+            lines = "".join(json.dumps(event.to_dict()) + "\n" for event in batch)
+        except (TypeError, ValueError) as e:
+            # Keep the events in memory rather than lose them
+            logger.warning(f"Failed to spill game history to disk: {e}")
+            return
+
+        self._spilling = True
+        self._run_io(self._write_batch, self._spill_path, lines, done=lambda offset: self._spilled(len(batch), offset))
+
+    def _spilled(self, count: int, offset: Optional[int]) -> None:
+        """A batch write finished (offset None if it failed)"""
+        self._spilling = False
+        if self._closed:
+            self._run_io(self._delete_spill_file, self._spill_path)
+            return
+        if offset is None:
+            return
+
+        self._batch_offsets.append(offset)
+        self._spilled_count += count
+        del self._recent[:count]
+        if len(self._recent) >= self.buffer_size + self.spill_batch:
+            self._spill()
+
+    def _run_io(self, func, *args, done=None) -> None:
+        """Run blocking file I/O on a worker thread when inside an event loop, inline otherwise
+        `done` gets the result on the calling thread"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            result = func(*args)
+            if done:
+                done(result)
+            return
+
+        task = loop.create_task(asyncio.to_thread(func, *args))
+        _io_tasks.add(task)
+        task.add_done_callback(_io_tasks.discard)
+        if done:
+            task.add_done_callback(lambda finished: done(None if finished.cancelled() else finished.result()))
+
+    def _write_batch(self, path: str, lines: str) -> Optional[int]:
+        """Append serialized events to the spill file; return the batch's offset, None on failure"""
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as spill_file:
+                offset = spill_file.tell()
+                spill_file.write(lines)
+            return offset
+        except OSError as e:
+            # The events stay in memory rather than being lost
+            logger.warning(f"Failed to spill game history to disk: {e}")
+            return None
+
+    @staticmethod
+    def _delete_spill_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to delete game history spill file {path}: {e}")
+
+    @staticmethod
+    def _read_spilled(path: str, offset: int, skip: int, count: int) -> List[Dict[str, Any]]:
+        """Read `count` spilled events, `skip` lines past the batch at `offset` (blocking)"""
+        events: List[Dict[str, Any]] = []
+        try:
+            with open(path, "r", encoding="utf-8") as spill_file:
+                spill_file.seek(offset)
+                for _ in range(skip):
+                    spill_file.readline()
+                for _ in range(count):
+                    line = spill_file.readline()
+                    if not line:
+                        break
+                    events.append(json.loads(line))
+        except OSError as e:
+            # e.g. the room was removed and the file deleted mid-read
+            logger.warning(f"Failed to read game history spill file {path}: {e}")
+        return events
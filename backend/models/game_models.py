@@ -1,8 +1,13 @@
+import itertools
+import sys
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
 from enum import Enum
 
+from models.game_history import GameHistory
+
 
 class GameStatus(Enum):
     WAITING = "waiting"
@@ -23,33 +28,102 @@ class CardShape(Enum):
     WILD = "wild"
 
 
-@dataclass
+# Card ids only need to be unique within the process (games live in memory)
+_card_ids = itertools.count(1)
+
+# Wild cards share one tuple per shape pair instead of one per card
+_wild_shape_pairs: Dict[Tuple[CardShape, ...], Tuple[CardShape, ...]] = {}
+
+
+def next_card_id() -> int:
+    """Get a new small integer card id"""
+    return next(_card_ids)
+
+
+@dataclass(frozen=True, slots=True)
 class Card:
-    """Represents a single Anomia card"""
-    id: str
+    """Represents a single Anomia card (immutable once created)
+    
+    Cards are flyweights: category and difficulty strings are interned and wild
+    shape pairs are shared, so a card only holds references and a small int id.
+    """
+    id: int
     shape: CardShape
     category: str
     difficulty: str = "medium"
-    timestamp: datetime = field(default_factory=datetime.now)
     is_wild: bool = False
-    wild_shapes: Optional[List[CardShape]] = None  # For wild cards, contains the two shapes
+    wild_shapes: Optional[Tuple[CardShape, ...]] = None  # For wild cards, contains the two shapes
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "category", sys.intern(self.category))
+        object.__setattr__(self, "difficulty", sys.intern(self.difficulty))
+        if self.wild_shapes is not None:
+            shapes = tuple(self.wild_shapes)
+            object.__setattr__(self, "wild_shapes", _wild_shape_pairs.setdefault(shapes, shapes))
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        result: Dict[str, Any] = {
-            "id": self.id,
-            "shape": self.shape.value,
-            "category": self.category,
-            "difficulty": self.difficulty,
-            "timestamp": self.timestamp.isoformat(),
-            "is_wild": self.is_wild
-        }
-        if self.is_wild and self.wild_shapes:
-            result["wild_shapes"] = [shape.value for shape in self.wild_shapes]
-        return result
+        """Convert to dictionary for JSON serialization (built on first use, shared - do not mutate)"""
+        if self._dict is None:
+            result: Dict[str, Any] = {
+                "id": self.id,
+                "shape": self.shape.value,
+                "category": self.category,
+                "difficulty": self.difficulty,
+                "is_wild": self.is_wild
+            }
+            if self.is_wild and self.wild_shapes:
+                result["wild_shapes"] = [shape.value for shape in self.wild_shapes]
+            object.__setattr__(self, "_dict", result)
+        return self._dict
+
+
+class DrawPile(deque):
+    """The shared draw pile, drawn from the front
+    
+    A deque makes every draw O(1); a list's pop(0) shifts every remaining card.
+    """
+    __slots__ = ()
+    
+    def draw(self) -> Optional[Card]:
+        """Draw the next card (None if the pile is empty)"""
+        return self.popleft() if self else None
+    
+    def peek(self, count: int = 1) -> Tuple[Card, ...]:
+        """Look at the next `count` cards without drawing them"""
+        return tuple(itertools.islice(self, count))
 
 
-@dataclass
+class ShapeIndex:
+    """Which players currently show each shape on top of their stack
+    
+    Kept up to date as cards are added to and removed from player stacks, so
+    finding a player's matches is a dict lookup instead of a scan of the room.
+    """
+    __slots__ = ("_players_by_shape",)
+    
+    def __init__(self):
+        self._players_by_shape: Dict[CardShape, Set[str]] = {}
+    
+    def update(self, player_id: str, old_top: Optional[Card], new_top: Optional[Card]) -> None:
+        """Move a player from their old top card's shape to their new one"""
+        if old_top is not None:
+            players = self._players_by_shape.get(old_top.shape)
+            if players:
+                players.discard(player_id)
+        if new_top is not None:
+            self._players_by_shape.setdefault(new_top.shape, set()).add(player_id)
+    
+    def players_with(self, shape: CardShape) -> Set[str]:
+        """Get the ids of players whose top card has the given shape (do not mutate)"""
+        return self._players_by_shape.get(shape) or set()
+
+
+# Bookkeeping fields whose assignment does not count as a state change
+_UNTRACKED_FIELDS = {"revision", "view_cache", "_dict_cache", "shape_index", "players_by_id", "player_positions", "next_deck"}
+
+
+@dataclass(slots=True)
 class Player:
     """Represents a player in the game"""
     id: str
@@ -61,9 +135,25 @@ class Player:
     socket_id: Optional[str] = None
     has_flipped_this_turn: bool = False  # Track if player has flipped this turn
     
+    # Dirty tracking: bumped on every change so serialized sub-trees can be reused
+    revision: int = field(default=0, init=False, repr=False, compare=False)
+    view_cache: Optional[Tuple[int, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    _dict_cache: Optional[Tuple[int, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Index of the game this player is in, told about every top card change
+    shape_index: Optional[ShapeIndex] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in _UNTRACKED_FIELDS:
+            object.__setattr__(self, "revision", getattr(self, "revision", 0) + 1)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
+        """Convert to dictionary for JSON serialization (cached until the player changes)"""
+        if self._dict_cache and self._dict_cache[0] == self.revision:
+            return self._dict_cache[1]
+        
+        result = {
             "id": self.id,
             "name": self.name,
             "isHost": self.is_host,
@@ -73,10 +163,20 @@ class Player:
             "socketId": self.socket_id,
             "hasFlippedThisTurn": self.has_flipped_this_turn
         }
+        self._dict_cache = (self.revision, result)
+        return result
+    
+    def mark_dirty(self) -> None:
+        """Record an in-place change (e.g. to the deck list)"""
+        self.revision += 1
     
     def add_card_to_deck(self, card: Card) -> None:
         """Add a new card to the player's deck"""
+        old_top = self.get_top_card()
         self.deck.append(card)
+        self.mark_dirty()
+        if self.shape_index is not None:
+            self.shape_index.update(self.id, old_top, card)
     
     def get_top_card(self) -> Optional[Card]:
         """Get the top card from the player's deck"""
@@ -84,7 +184,13 @@ class Player:
     
     def remove_top_card(self) -> Optional[Card]:
         """Remove and return the top card from the player's deck"""
-        return self.deck.pop() if self.deck else None
+        if not self.deck:
+            return None
+        card = self.deck.pop()
+        self.mark_dirty()
+        if self.shape_index is not None:
+            self.shape_index.update(self.id, card, self.get_top_card())
+        return card
     
     def has_cards(self) -> bool:
         """Check if player has any cards in their deck"""
@@ -95,7 +201,7 @@ class Player:
         self.has_flipped_this_turn = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Faceoff:
     """Represents a faceoff between two players"""
     player1_id: str
@@ -104,59 +210,115 @@ class Faceoff:
     player1_card: Card
     player2_card: Card
     timestamp: datetime = field(default_factory=datetime.now)
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "player1": self.player1_id,
-            "player2": self.player2_id,
-            "shape": self.shape.value,
-            "player1Card": self.player1_card.to_dict(),
-            "player2Card": self.player2_card.to_dict(),
-            "timestamp": self.timestamp.isoformat()
-        }
+        """Convert to dictionary for JSON serialization (a faceoff never changes once created)"""
+        if self._dict is None:
+            self._dict = {
+                "player1": self.player1_id,
+                "player2": self.player2_id,
+                "shape": self.shape.value,
+                "player1Card": self.player1_card.to_dict(),
+                "player2Card": self.player2_card.to_dict(),
+                "timestamp": self.timestamp.isoformat()
+            }
+        return self._dict
 
 
-@dataclass
+@dataclass(slots=True)
 class GameEvent:
     """Represents a game event for history tracking"""
     event_type: str
     player_id: Optional[str] = None
     data: Optional[Dict[str, Any]] = None
     timestamp: datetime = field(default_factory=datetime.now)
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "type": self.event_type,
-            "playerId": self.player_id,
-            "data": self.data,
-            "timestamp": self.timestamp.isoformat()
-        }
+        """Convert to dictionary for JSON serialization (events are append-only history)"""
+        if self._dict is None:
+            self._dict = {
+                "type": self.event_type,
+                "playerId": self.player_id,
+                "data": self.data,
+                "timestamp": self.timestamp.isoformat()
+            }
+        return self._dict
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     """Main game state object"""
     room_code: str
     status: GameStatus = GameStatus.WAITING
     current_round: int = 1
     players: List[Player] = field(default_factory=list)
-    deck: List[Card] = field(default_factory=list)
+    deck: DrawPile = field(default_factory=DrawPile)  # Shared draw pile
+    next_deck: Optional[List[Card]] = field(default=None, repr=False, compare=False)  # Prefetched deck for the next reshuffle
     current_faceoff: Optional[Faceoff] = None
     current_player_id: Optional[str] = None  # Track whose turn it is
     current_player_index: int = 0  # Index in players list for turn order
     current_wild_card: Optional[Card] = None  # Active wild card in center
-    game_history: List[GameEvent] = field(default_factory=list)
+    game_history: GameHistory = field(default_factory=GameHistory)  # Recent events in memory, older ones on disk
     started_at: Optional[datetime] = None
+    first_flip_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
     last_activity: datetime = field(default_factory=datetime.now)
     final_scores: Optional[List[Dict[str, Any]]] = None
     winner: Optional[Dict[str, Any]] = None
     
+    # Dirty tracking: bumped on every attribute change so serialized state can be reused
+    revision: int = field(default=0, init=False, repr=False, compare=False)
+    view_cache: Optional[Tuple[Tuple, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    _dict_cache: Optional[Tuple[Tuple, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Lookup indexes over `players`, maintained by add_player/remove_player
+    players_by_id: Dict[str, Player] = field(default_factory=dict, init=False, repr=False, compare=False)
+    player_positions: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    shape_index: ShapeIndex = field(default_factory=ShapeIndex, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        for player in self.players:
+            self._index_player(player)
+        self._reindex_positions()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in _UNTRACKED_FIELDS:
+            object.__setattr__(self, "revision", getattr(self, "revision", 0) + 1)
+    
+    def _index_player(self, player: Player) -> None:
+        """Add a player to the id and shape indexes"""
+        self.players_by_id[player.id] = player
+        player.shape_index = self.shape_index
+        self.shape_index.update(player.id, None, player.get_top_card())
+    
+    def _reindex_positions(self) -> None:
+        """Rebuild player id -> turn order position (players join and leave rarely)"""
+        self.player_positions = {player.id: index for index, player in enumerate(self.players)}
+    
+    def state_fingerprint(self) -> Tuple:
+        """Cheap key that changes whenever the game or any player changes
+        
+        Covers attribute assignments (revision), in-place draws from the deck,
+        history appends and every player's own revision.
+        """
+        return (
+            self.revision,
+            id(self.deck),
+            len(self.deck),
+            len(self.game_history),
+            tuple((id(player), player.revision) for player in self.players)
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
+        """Convert to dictionary for JSON serialization (cached until the game changes)"""
+        fingerprint = self.state_fingerprint()
+        if self._dict_cache and self._dict_cache[0] == fingerprint:
+            return self._dict_cache[1]
+        
+        result = {
             "roomCode": self.room_code,
             "status": self.status.value,
             "currentRound": self.current_round,
@@ -166,17 +328,20 @@ class Game:
             "currentWildCard": self.current_wild_card.to_dict() if self.current_wild_card else None,
             "currentPlayerId": self.current_player_id,
             "currentPlayerIndex": self.current_player_index,
-            "gameHistory": [event.to_dict() for event in self.game_history],
+            "gameHistory": [event.to_dict() for event in self.game_history],  # In-memory window only
+            "historySize": len(self.game_history),
             "startedAt": self.started_at.isoformat() if self.started_at else None,
             "endedAt": self.ended_at.isoformat() if self.ended_at else None,
             "lastActivity": self.last_activity.isoformat(),
             "finalScores": self.final_scores,
             "winner": self.winner
         }
+        self._dict_cache = (fingerprint, result)
+        return result
     
     def get_player(self, player_id: str) -> Optional[Player]:
         """Get a player by ID"""
-        return next((p for p in self.players if p.id == player_id), None)
+        return self.players_by_id.get(player_id)
     
     def get_player_by_name(self, name: str) -> Optional[Player]:
         """Get a player by name"""
@@ -185,16 +350,22 @@ class Game:
     def add_player(self, player: Player) -> None:
         """Add a player to the game"""
         self.players.append(player)
+        self._index_player(player)
+        self._reindex_positions()
         self.last_activity = datetime.now()
     
     def remove_player(self, player_id: str) -> bool:
         """Remove a player from the game"""
-        for i, player in enumerate(self.players):
-            if player.id == player_id:
-                del self.players[i]
-                self.last_activity = datetime.now()
-                return True
-        return False
+        player = self.players_by_id.pop(player_id, None)
+        if not player:
+            return False
+        
+        del self.players[self.player_positions[player_id]]
+        self.shape_index.update(player_id, player.get_top_card(), None)
+        player.shape_index = None
+        self._reindex_positions()
+        self.last_activity = datetime.now()
+        return True
     
     def add_event(self, event: GameEvent) -> None:
         """Add an event to game history"""
@@ -202,51 +373,43 @@ class Game:
         self.last_activity = datetime.now()
     
     def find_matching_players(self, current_player_id: str) -> List[Faceoff]:
-        """Find players with matching shapes (including wild card rules)"""
+        """Find players with matching shapes (including wild card rules)
+        
+        Candidates come from the shape index: players showing the same shape, plus,
+        when the active wild card covers the flipper's shape, players showing
+        either of the wild card's shapes. Results are in turn order.
+        """
         current_player = self.get_player(current_player_id)
-        if not current_player or not current_player.has_cards():
+        if not current_player:
             return []
         
-        faceoffs = []
         current_top_card = current_player.get_top_card()
         if not current_top_card:
             return []
         
         current_shape = current_top_card.shape
         
-        for other_player in self.players:
-            if (other_player.id != current_player_id and 
-                other_player.has_cards()):
-                
-                other_top_card = other_player.get_top_card()
-                if not other_top_card:
-                    continue
-                
-                other_shape = other_top_card.shape
-                
-                # Check for matches: same shape OR wild card rules
-                shapes_match = False
-                faceoff_shape = current_shape
-                
-                if other_shape == current_shape:
-                    # Normal same-shape match
-                    shapes_match = True
-                elif self.current_wild_card and self.current_wild_card.is_wild:
-                    # Check wild card rules: both shapes must be on the wild card
-                    wild_shapes = self.current_wild_card.wild_shapes or []
-                    if (current_shape in wild_shapes and other_shape in wild_shapes):
-                        shapes_match = True
-                        # Use the wild card's shape for the faceoff
-                        faceoff_shape = self.current_wild_card.shape
-                
-                if shapes_match:
-                    faceoffs.append(Faceoff(
-                        player1_id=current_player_id,
-                        player2_id=other_player.id,
-                        shape=faceoff_shape,
-                        player1_card=current_top_card,
-                        player2_card=other_top_card
-                    ))
+        # player id -> faceoff shape; a normal same-shape match wins over a wild match
+        matches: Dict[str, CardShape] = dict.fromkeys(self.shape_index.players_with(current_shape), current_shape)
+        
+        wild_card = self.current_wild_card
+        if wild_card and wild_card.is_wild and wild_card.wild_shapes and current_shape in wild_card.wild_shapes:
+            # Both shapes must be on the wild card; the faceoff uses the wild card's shape
+            for wild_shape in wild_card.wild_shapes:
+                for player_id in self.shape_index.players_with(wild_shape):
+                    matches.setdefault(player_id, wild_card.shape)
+        
+        matches.pop(current_player_id, None)
+        
+        faceoffs = []
+        for other_id in sorted(matches, key=self.player_positions.__getitem__):
+            faceoffs.append(Faceoff(
+                player1_id=current_player_id,
+                player2_id=other_id,
+                shape=matches[other_id],
+                player1_card=current_top_card,
+                player2_card=self.players_by_id[other_id].get_top_card()
+            ))
         
         return faceoffs
     
@@ -310,7 +473,6 @@ class Game:
             "winner": winner.to_dict(),
             "loser": loser.to_dict(),
             "discardedCard": discarded_card.to_dict(),
-            "gameState": self.to_dict(),
             "wildCardInvolved": wild_card_involved,
             "pointsAwarded": points_awarded
         }
@@ -0,0 +1,106 @@
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    categories: List[Dict[str, Any]]  # Mutually distinct categories to sample games from
+    expires_at: float                 # time.monotonic() deadline
+    uses: int = 0
+    served: List[int] = field(default_factory=list)  # Games each category was dealt to, parallel to categories
+
+
+class CategoryCache:
+    """TTL-expiring, LRU-bounded cache of generated categories keyed by request parameters
+
+    Each entry holds a pool of mutually distinct categories, several decks'
+    worth. Every game is dealt the categories served least so far (random
+    among equals), so games don't repeat categories until the pool runs out,
+    and an entry is retired after `max_uses` games so the same pool doesn't
+    keep coming back.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None, max_uses: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("CATEGORY_CACHE_MAX_ENTRIES", 32))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("CACHE_TTL_HOURS", 24)) * 3600
+        self.max_uses = max_uses if max_uses is not None else int(os.getenv("CATEGORY_CACHE_MAX_USES", 3))
+
+        self.entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()  # Least recently used first
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def sample(self, key: Hashable, count: int) -> Optional[List[Dict[str, Any]]]:
+        """Get `count` of the least-served categories from the entry for `key`, or None on a miss"""
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None or len(entry.categories) < count:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.deal(key, count)
+
+    def deal(self, key: Hashable, count: int) -> Optional[List[Dict[str, Any]]]:
+        """Deal one game `count` of the entry's least-served categories, retiring it at `max_uses`
+        Returns None if there's no entry for `key` (no hit/miss is counted)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        order = sorted(range(len(entry.categories)), key=lambda index: (entry.served[index], random.random()))[:count]
+        for index in order:
+            entry.served[index] += 1
+        dealt = [entry.categories[index] for index in order]
+        random.shuffle(dealt)
+
+        entry.uses += 1
+        if entry.uses >= self.max_uses:
+            del self.entries[key]
+        else:
+            self.entries.move_to_end(key)
+        return dealt
+
+    def put(self, key: Hashable, categories: List[Dict[str, Any]], dealt: int = 0) -> None:
+        """Cache a pool of categories whose first `dealt` already went to one game, evicting the least recently used entry if full"""
+        uses = 1 if dealt else 0
+        if self.max_entries <= 0 or uses >= self.max_uses:
+            return
+        served = [1 if index < dealt else 0 for index in range(len(categories))]
+        self.entries[key] = _CacheEntry(list(categories), time.monotonic() + self.ttl_seconds, uses, served)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get size, hit ratio and eviction counts"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "maxUses": self.max_uses,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 3) if lookups else None,
+            "expirations": self.expirations,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Next to the app rather than in temp storage, which hosts wipe on every redeploy
+DEFAULT_CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "categories.db")
+
+
+def normalize_category_key(category: str) -> str:
+    """Normalized form used to recognize the same category across batches"""
+    return re.sub(r'\s+', ' ', category.strip().lower())
+
+
+class CategoryCorpus:
+    """On-disk store of every category the LLM has produced (SQLite, WAL mode)
+
+    Categories are keyed by their normalized name, so re-ingesting a category
+    is a no-op. `deal()` hands out the least-served categories so successive
+    games rotate through the corpus instead of repeating the same ones.
+
+    Calls are blocking; async callers run them via `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("CATEGORY_CORPUS_PATH") or DEFAULT_CORPUS_PATH
+        if self.path == DEFAULT_CORPUS_PATH and (os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("RENDER")):
+            logger.warning("CATEGORY_CORPUS_PATH is not set - the category corpus lives in the container and is "
+                           "lost on redeploy; point it at a mounted volume")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # One connection shared by the worker threads, serialized by the lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS categories (
+                key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                source TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                served INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_categories_served ON categories(served)")
+        self.connection.commit()
+
+        # Counted once; every insert goes through ingest(), which keeps it current
+        self._size = self.connection.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+
+        # Metrics
+        self.ingested = 0
+        self.served = 0
+
+    def size(self) -> int:
+        """Number of categories in the corpus (cached - doesn't touch the database)"""
+        return self._size
+
+    def ingest(self, categories: Iterable[Dict[str, Any]], source: str) -> int:
+        """Add categories (dicts with a 'category' key), skipping ones already stored; returns how many were new"""
+        now = datetime.now().isoformat()
+        rows = []
+        for cat in categories:
+            name = cat.get("category", "").strip()
+            if name:
+                rows.append((normalize_category_key(name), name, source, now))
+
+        with self.lock:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO categories (key, category, source, created_at) VALUES (?, ?, ?, ?)", rows)
+            self.connection.commit()
+            added = self.connection.total_changes - before
+            self._size += added
+
+        self.ingested += added
+        logger.info(f"Ingested {added} new categories into the corpus ({len(rows) - added} already known)")
+        return added
+
+    def sample(self, count: int) -> List[Dict[str, Any]]:
+        """Get up to `count` random categories, least-served first (read-only - use deal() to hand them out)"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT key, category, source, created_at FROM categories ORDER BY served, RANDOM() LIMIT ?",
+                (count,)).fetchall()
+        return [{"key": key, "category": category, "source": source, "createdAt": created_at}
+                for key, category, source, created_at in rows]
+
+    def deal(self, count: int) -> List[Dict[str, Any]]:
+        """Sample up to `count` categories like sample() and mark them served in the same transaction,
+        so concurrent deals (other threads or worker processes) get different categories"""
+        with self.lock:
+            try:
+                # IMMEDIATE takes the write lock before the read, so no other connection can deal in between
+                self.connection.execute("BEGIN IMMEDIATE")
+                rows = self.connection.execute(
+                    "SELECT key, category, source, created_at FROM categories ORDER BY served, RANDOM() LIMIT ?",
+                    (count,)).fetchall()
+                self.connection.executemany("UPDATE categories SET served = served + 1 WHERE key = ?",
+                                            [(row[0],) for row in rows])
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+        self.served += len(rows)
+        return [{"key": key, "category": category, "source": source, "createdAt": created_at}
+                for key, category, source, created_at in rows]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus size and ingest/serve counts"""
+        return {
+            "path": self.path,
+            "size": self.size(),
+            "ingested": self.ingested,
+            "served": self.served
+        }
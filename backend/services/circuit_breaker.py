@@ -0,0 +1,86 @@
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while
+
+    closed: calls go through; `failure_threshold` consecutive failures open it.
+    open: calls are refused until `reset_timeout` has passed, then one probe
+    call is let through (half-open). The probe's success closes the breaker;
+    its failure opens it again. A probe that never reports back (cancelled)
+    is replaced by another after `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold if failure_threshold is not None else int(os.getenv("LLM_BREAKER_FAILURES", 5))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0  # time.monotonic() when last opened or probed
+        self.last_opened: Optional[str] = None
+
+        # Metrics
+        self.times_opened = 0
+        self.rejected = 0
+
+    def is_open(self) -> bool:
+        """True while calls would be refused (open or probing, and not yet due for a probe)"""
+        return self.state != self.CLOSED and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; moves an expired open breaker to half-open for one probe"""
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            logger.info(f"Circuit breaker '{self.name}' half-open - sending a probe call")
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """A call succeeded"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """A call failed"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit breaker '{self.name}' opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.last_opened = datetime.now().isoformat()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.consecutive_failures,
+            "failureThreshold": self.failure_threshold,
+            "resetTimeoutSeconds": self.reset_timeout,
+            "timesOpened": self.times_opened,
+            "rejected": self.rejected,
+            "lastOpened": self.last_opened
+        }
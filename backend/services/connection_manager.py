@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Set
+
+from fastapi import WebSocket
+
+from services.wire_codec import Frame, FrameEncoder
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to evicted slow consumers ("Try Again Later") - the client reconnects and resyncs
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code sent when writing to a socket failed ("Internal Error")
+SEND_FAILED_CLOSE_CODE = 1011
+
+
+class ClientConnection:
+    """A WebSocket connection with its own bounded outbound queue and writer task"""
+
+    def __init__(self, socket_id: str, websocket: WebSocket, room_code: str, max_queue_size: int, encoder: FrameEncoder):
+        self.socket_id = socket_id
+        self.websocket = websocket
+        self.room_code = room_code
+        self.encoder = encoder  # Wire format negotiated for this connection (JSON text or MessagePack)
+        self.capabilities: Set[str] = set()  # Negotiated protocol capabilities (e.g. "delta")
+        self.queue: "asyncio.Queue[Frame]" = asyncio.Queue(maxsize=max_queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.connected_at = datetime.now()
+        self.closed = False
+
+        # Metrics
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.max_queue_depth = 0
+
+
+class ConnectionManager:
+    """Tracks WebSocket connections and fans out frames through per-connection send queues
+
+    Sending never awaits the network: frames are put on the connection's bounded
+    queue and a writer task drains it. A client whose queue overflows is a slow
+    consumer - it is disconnected so it can reconnect and resync instead of
+    holding up the rest of the room.
+    """
+
+    def __init__(self, max_queue_size: Optional[int] = None):
+        self.max_queue_size = max_queue_size or int(os.getenv("WS_SEND_QUEUE_SIZE", 64))
+
+        self.active_connections: Dict[str, ClientConnection] = {}
+        self.room_connections: Dict[str, List[str]] = {}  # room_code -> [socket_ids]
+
+        # Socket closes in progress (kept so they aren't garbage-collected before they run)
+        self.close_tasks: Set[asyncio.Task] = set()
+
+        # Lifetime metrics (survive individual connections)
+        self.total_frames_dropped = 0
+        self.total_evictions = 0
+        self.total_send_failures = 0
+
+    def connect(self, socket_id: str, websocket: WebSocket, room_code: str, encoder: FrameEncoder) -> ClientConnection:
+        """Register an accepted WebSocket and start its writer task"""
+        connection = ClientConnection(socket_id, websocket, room_code, self.max_queue_size, encoder)
+        connection.writer_task = asyncio.create_task(self._writer(connection))
+        self.active_connections[socket_id] = connection
+        self.add_to_room(room_code, socket_id)
+        return connection
+
+    def add_to_room(self, room_code: str, socket_id: str) -> None:
+        """Ensure a socket is registered in a room"""
+        sockets = self.room_connections.setdefault(room_code, [])
+        if socket_id not in sockets:
+            sockets.append(socket_id)
+
+    def disconnect(self, socket_id: str) -> None:
+        """Remove a connection and stop its writer task"""
+        connection = self.active_connections.pop(socket_id, None)
+        if connection:
+            connection.closed = True
+            if connection.writer_task and not connection.writer_task.done():
+                connection.writer_task.cancel()
+
+        # Remove from room connections and clean up empty rooms
+        for room_code in list(self.room_connections):
+            sockets = self.room_connections[room_code]
+            if socket_id in sockets:
+                sockets.remove(socket_id)
+            if not sockets:
+                del self.room_connections[room_code]
+
+    def get(self, socket_id: str) -> Optional[ClientConnection]:
+        """Get a connection by socket ID"""
+        return self.active_connections.get(socket_id)
+
+    def get_room_connections(self, room_code: str) -> List[ClientConnection]:
+        """Get the live connections in a room"""
+        return [
+            self.active_connections[socket_id]
+            for socket_id in self.room_connections.get(room_code, [])
+            if socket_id in self.active_connections
+        ]
+
+    def has_capability(self, socket_id: str, capability: str) -> bool:
+        """Check whether a connection negotiated a protocol capability"""
+        connection = self.active_connections.get(socket_id)
+        return bool(connection and capability in connection.capabilities)
+
+    def send(self, socket_id: str, frame: Frame) -> bool:
+        """Queue a frame for a connection without waiting on the network
+
+        Returns False if the connection is gone or was evicted as a slow consumer.
+        """
+        connection = self.active_connections.get(socket_id)
+        if not connection or connection.closed:
+            logger.debug(f"Socket {socket_id} not in active_connections, message not sent")
+            return False
+
+        try:
+            connection.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            connection.frames_dropped += 1
+            self.total_frames_dropped += 1
+            self._evict(connection)
+            return False
+
+        depth = connection.queue.qsize()
+        if depth > connection.max_queue_depth:
+            connection.max_queue_depth = depth
+        return True
+
+    def _evict(self, connection: ClientConnection) -> None:
+        """Disconnect a slow consumer whose send queue overflowed"""
+        if connection.closed:
+            return
+        self.total_evictions += 1
+        logger.warning(
+            f"Evicting slow consumer {connection.socket_id} in room {connection.room_code} "
+            f"(queue full at {self.max_queue_size} frames)"
+        )
+        self._drop(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    def _drop(self, connection: ClientConnection, code: int) -> None:
+        """Stop sending to a connection and close its socket
+        Closing makes the endpoint's receive loop exit and run the normal disconnect path"""
+        connection.closed = True
+        writer_task = connection.writer_task
+        if writer_task and not writer_task.done() and writer_task is not asyncio.current_task():
+            writer_task.cancel()
+
+        task = asyncio.create_task(self._close(connection, code))
+        self.close_tasks.add(task)
+        task.add_done_callback(self.close_tasks.discard)
+
+    async def _close(self, connection: ClientConnection, code: int) -> None:
+        """Close a WebSocket, ignoring errors from already-closed sockets"""
+        try:
+            await connection.websocket.close(code=code)
+        except Exception as e:
+            logger.debug(f"Error closing socket {connection.socket_id}: {e}")
+
+    async def _writer(self, connection: ClientConnection) -> None:
+        """Drain a connection's send queue onto the WebSocket"""
+        try:
+            while True:
+                frame = await connection.queue.get()
+                if connection.encoder.binary:
+                    await connection.websocket.send_bytes(frame)
+                else:
+                    await connection.websocket.send_text(frame)
+                connection.frames_sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error sending message to {connection.socket_id}: {e}")
+            if not connection.closed:
+                self.total_send_failures += 1
+                self._drop(connection, SEND_FAILED_CLOSE_CODE)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and drop statistics for monitoring"""
+        connections = list(self.active_connections.values())
+        by_encoding: Dict[str, int] = {}
+        by_capability: Dict[str, int] = {}
+        for connection in connections:
+            by_encoding[connection.encoder.name] = by_encoding.get(connection.encoder.name, 0) + 1
+            for capability in connection.capabilities:
+                by_capability[capability] = by_capability.get(capability, 0) + 1
+        # Aggregates only: the endpoint is public, so socket ids and room codes stay out of it
+        return {
+            "activeConnections": len(connections),
+            "activeRooms": len(self.room_connections),
+            "maxQueueSize": self.max_queue_size,
+            "totalQueuedFrames": sum(c.queue.qsize() for c in connections),
+            "maxQueueDepth": max((c.max_queue_depth for c in connections), default=0),
+            "totalFramesDropped": self.total_frames_dropped,
+            "totalEvictions": self.total_evictions,
+            "totalSendFailures": self.total_send_failures,
+            "connectionsByEncoding": by_encoding,
+            "connectionsByCapability": by_capability,
+            "timestamp": datetime.now().isoformat()
+        }
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Any, Tuple
+
+from models.game_models import Card
+from services.metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+class FallbackDeckError(Exception):
+    """Raised by a deck factory whose deck would be built from fallback categories - not worth pooling"""
+
+class DeckPoolService:
+    """Keeps ready-to-deal decks warm for each deck count (1 deck, 2 decks)
+
+    `take()` hands out a pooled deck instantly and kicks off a background
+    refill; games only generate a deck on demand when the pool is empty.
+    A factory raises FallbackDeckError rather than return a fallback deck, so
+    the pool never keeps serving fallback decks after the LLM recovers.
+    After a failed refill that pool isn't refilled again until an exponential
+    backoff has passed, so an outage doesn't cost a refill per game start.
+    """
+
+    def __init__(self, deck_factory: Callable[[int], Awaitable[List[Card]]],
+                 target_size: Optional[int] = None, deck_counts: Tuple[int, ...] = (1, 2),
+                 retry_base_delay: Optional[float] = None, retry_max_delay: Optional[float] = None):
+        # deck_factory(num_decks) builds a shuffled deck (LLM categories + cards)
+        self.deck_factory = deck_factory
+        self.target_size = target_size if target_size is not None else int(os.getenv("DECK_POOL_SIZE", 2))
+        self.retry_base_delay = retry_base_delay if retry_base_delay is not None else float(os.getenv("DECK_POOL_RETRY_SECONDS", 5))
+        self.retry_max_delay = retry_max_delay if retry_max_delay is not None else float(os.getenv("DECK_POOL_RETRY_MAX_SECONDS", 300))
+
+        self.pools: Dict[int, Deque[List[Card]]] = {count: deque() for count in deck_counts}
+        self.refill_tasks: Dict[int, asyncio.Task] = {}
+        self.failure_streaks: Dict[int, int] = {}  # num_decks -> consecutive failed refills
+        self.retry_at: Dict[int, float] = {}       # num_decks -> time.monotonic() before which no refill starts
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.refill_failures = 0
+        self.refill_latency = LatencyTracker()
+
+    def take(self, num_decks: int) -> Optional[List[Card]]:
+        """Take a warm deck if one is ready (None if the pool is empty) and schedule a refill"""
+        pool = self.pools.get(num_decks)
+        deck = pool.popleft() if pool else None
+        if deck is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.ensure_filled()
+        return deck
+
+    def available(self, num_decks: int) -> int:
+        """Number of warm decks ready for a deck count"""
+        return len(self.pools.get(num_decks, ()))
+
+    def ensure_filled(self) -> None:
+        """Start background refills for any pool below its target size"""
+        if self.target_size <= 0:
+            return
+        now = time.monotonic()
+        for num_decks, pool in self.pools.items():
+            if (len(pool) < self.target_size and num_decks not in self.refill_tasks
+                    and now >= self.retry_at.get(num_decks, 0.0)):
+                self.refill_tasks[num_decks] = asyncio.create_task(self._refill(num_decks))
+
+    async def _refill(self, num_decks: int) -> None:
+        """Generate decks one at a time until the pool is back at its target size"""
+        pool = self.pools[num_decks]
+        try:
+            while len(pool) < self.target_size:
+                started = time.perf_counter()
+                deck = await self.deck_factory(num_decks)
+                self.refill_latency.record(time.perf_counter() - started)
+                pool.append(deck)
+                self.failure_streaks.pop(num_decks, None)
+                self.retry_at.pop(num_decks, None)
+                logger.info(f"Deck pool ({num_decks} deck(s)) refilled to {len(pool)}/{self.target_size}")
+        except Exception as e:
+            self.refill_failures += 1
+            streak = self.failure_streaks[num_decks] = self.failure_streaks.get(num_decks, 0) + 1
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (streak - 1))
+            self.retry_at[num_decks] = time.monotonic() + delay
+            logger.warning(f"Deck pool refill failed for {num_decks} deck(s), retrying in {delay:.0f}s at the earliest: {e}")
+        finally:
+            self.refill_tasks.pop(num_decks, None)
+
+    async def close(self) -> None:
+        """Cancel running refills"""
+        for task in list(self.refill_tasks.values()):
+            task.cancel()
+        self.refill_tasks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool depth, hit/miss counts and refill latency"""
+        return {
+            "targetSize": self.target_size,
+            "depth": {str(num_decks): len(pool) for num_decks, pool in self.pools.items()},
+            "refilling": sorted(self.refill_tasks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refillFailures": self.refill_failures,
+            "retryInSeconds": {str(num_decks): round(max(0.0, retry_at - time.monotonic()), 1)
+                               for num_decks, retry_at in self.retry_at.items()},
+            "refillLatency": self.refill_latency.summary(),
+            "timestamp": datetime.now().isoformat()
+        }
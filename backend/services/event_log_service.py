@@ -0,0 +1,87 @@
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+class EventLogService:
+    """Bounded, sequence-numbered log of the events broadcast to each room
+
+    Every room broadcast gets the next sequence number. A reconnecting client
+    sends the last sequence it saw and gets only the messages it missed, as
+    long as they are still inside the log window.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("ROOM_EVENT_LOG_SIZE", 256))
+
+        # room_code -> deque of (seq, [messages]) and room_code -> last assigned seq
+        self.room_logs: Dict[str, Deque[Tuple[int, List[Dict[str, Any]]]]] = {}
+        self.room_sequences: Dict[str, int] = {}
+
+        # Metrics
+        self.resumes = 0
+        self.snapshot_fallbacks = 0
+
+    def append(self, room_code: str, messages: List[Dict[str, Any]]) -> int:
+        """Record the messages of one broadcast, stamping each with its sequence number"""
+        seq = self.room_sequences.get(room_code, 0) + 1
+        self.room_sequences[room_code] = seq
+        for message in messages:
+            message["seq"] = seq
+
+        room_log = self.room_logs.get(room_code)
+        if room_log is None:
+            room_log = deque(maxlen=self.max_entries)
+            self.room_logs[room_code] = room_log
+        room_log.append((seq, messages))
+        return seq
+
+    def current_seq(self, room_code: str) -> int:
+        """Get the last sequence number assigned in a room (0 if none)"""
+        return self.room_sequences.get(room_code, 0)
+
+    def messages_since(self, room_code: str, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Get the messages broadcast after `last_seq`, in order
+
+        Returns None if the client can't be caught up from the log (the gap is
+        older than the window, or the sequence is from a different log) and
+        needs a full snapshot instead.
+        """
+        current = self.current_seq(room_code)
+        room_log = self.room_logs.get(room_code)
+
+        if last_seq > current:
+            self.snapshot_fallbacks += 1
+            return None
+        if last_seq == current:
+            self.resumes += 1
+            return []
+        if not room_log or room_log[0][0] > last_seq + 1:
+            self.snapshot_fallbacks += 1
+            return None
+
+        self.resumes += 1
+        missed: List[Dict[str, Any]] = []
+        for seq, messages in room_log:
+            if seq > last_seq:
+                missed.extend(messages)
+        return missed
+
+    def remove_room(self, room_code: str) -> None:
+        """Drop the log for a room"""
+        self.room_logs.pop(room_code, None)
+        self.room_sequences.pop(room_code, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event log statistics for monitoring"""
+        return {
+            "rooms": len(self.room_logs),
+            "maxEntriesPerRoom": self.max_entries,
+            "totalEntries": sum(len(room_log) for room_log in self.room_logs.values()),
+            "resumes": self.resumes,
+            "snapshotFallbacks": self.snapshot_fallbacks,
+            "timestamp": datetime.now().isoformat()
+        }
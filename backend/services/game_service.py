@@ -1,28 +1,71 @@
-import uuid
+import asyncio
 import logging
+import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import random
 
-from models.game_models import Game, Player, Card, CardShape, GameStatus, GameEvent, Faceoff
+from models.game_models import Game, Player, Card, CardShape, DrawPile, GameStatus, GameEvent, Faceoff, next_card_id
 from services.room_service import RoomService
+from services.state_projection import GameStateProjector
+from services.deck_pool_service import DeckPoolService, FallbackDeckError
+from services.llm_service import FALLBACK_SOURCE
+from services.metrics import LatencyTracker
 
 logger = logging.getLogger(__name__)
 
 class GameService:
     """Service for managing game logic and state"""
     
-    def __init__(self, room_service, llm_service=None):
+    def __init__(self, room_service, llm_service=None, projector=None):
         # Reference to RoomService for getting room information
         self.room_service = room_service
         
         # Reference to LLMService for generating categories
         self.llm_service = llm_service
         
+        # Builds the compact per-audience views that go on the wire
+        self.projector = projector or GameStateProjector()
+        
         # In-memory storage for active games
         # In production, this would be Redis or a database
         self.active_games: Dict[str, Game] = {}
         
+        # Per-room command locks: starting a game or reshuffling awaits deck generation,
+        # and another command for the same room must not run in the middle of it
+        self.room_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Once the draw pile drops to the low-water mark the next deck is generated in the
+        # background, so the reshuffle is an instant swap instead of an LLM round-trip mid-turn
+        self.prefetch_low_water = int(os.getenv("DECK_PREFETCH_LOW_WATER", 20))
+        self.deck_prefetch_tasks: Dict[str, asyncio.Task] = {}  # room_code -> running prefetch
+        self.prefetch_stats = {
+            "hits": 0,    # Prefetched deck was ready at reshuffle
+            "late": 0,    # Prefetch still running at reshuffle - waited for it
+            "misses": 0   # No prefetch - generated inline
+        }
+        
+        # Warm decks for each deck count so startGame doesn't wait on the LLM
+        self.deck_pool = DeckPoolService(self._generate_pooled_decks)
+        
+        # Decks generated for a room while it sits in the lobby: room_code -> (num_decks, task)
+        # (rooms are created without auth, so at most max_speculative_decks generations run at once)
+        self.speculative_decks_enabled = os.getenv("SPECULATIVE_DECKS", "true").lower() == "true"
+        self.max_speculative_decks = int(os.getenv("SPECULATIVE_DECKS_MAX", 4))
+        self.speculative_decks: Dict[str, Tuple[int, asyncio.Task]] = {}
+        self.speculative_stats = {
+            "started": 0,    # Generation started at room creation
+            "upgraded": 0,   # Restarted as two decks when the lobby passed 8 players
+            "used": 0,       # Deck used at startGame
+            "cancelled": 0,  # Room abandoned, or a pooled deck was ready first
+            "skipped": 0     # Not started: a pooled deck was ready, or too many were already running
+        }
+        
+        # startGame latency and time from game start to the first card flip
+        self.start_latency = LatencyTracker()
+        self.first_flip_latency = LatencyTracker()
+        
         # Game configuration
         self.game_config = {
             "cards_per_player": 5,
@@ -102,8 +145,35 @@ class GameService:
 ]
 
     
-    def start_game(self, room_code: str) -> Dict[str, Any]:
+    def _room_lock(self, room_code: str) -> asyncio.Lock:
+        """Get the command lock for a room"""
+        lock = self.room_locks.get(room_code)
+        if lock is None:
+            lock = self.room_locks[room_code] = asyncio.Lock()
+        return lock
+    
+    def remove_room(self, room_code: str) -> None:
+        """Drop a room's per-room state once the room is gone: its game (and history spill file) and lock
+        A command still holding the room's lock keeps its own reference to it"""
+        self.room_locks.pop(room_code, None)
+        task = self.deck_prefetch_tasks.pop(room_code, None)
+        if task:
+            task.cancel()
+        game = self.active_games.pop(room_code, None)
+        if game:
+            game.game_history.close()
+    
+    async def start_game(self, room_code: str) -> Dict[str, Any]:
         """Start a new game in a room"""
+        async with self._room_lock(room_code):
+            started = time.perf_counter()
+            result = await self._start_game(room_code)
+            if result["success"]:
+                self.start_latency.record(time.perf_counter() - started)
+            return result
+    
+    async def _start_game(self, room_code: str) -> Dict[str, Any]:
+        """Start a new game in a room (caller holds the room lock)"""
         try:
             # Get room information from RoomService
             room = self.room_service.get_room(room_code)
@@ -142,8 +212,11 @@ class GameService:
                 )
                 game.add_player(player)
             
-            # Generate game deck
-            game.deck = self._generate_initial_deck(len(room["players"]))
+            # Generate game deck (or pick up the one generated during the lobby)
+            deck = await self._take_speculative_deck(room_code, len(room["players"]))
+            if deck is None:
+                deck = await self._generate_initial_deck(len(room["players"]), spare_decks=True)
+            game.deck = DrawPile(deck)
             
             # In Anomia, players start with empty decks and get cards by flipping
             # No initial card dealing - players flip cards during their turns
@@ -161,7 +234,7 @@ class GameService:
             
             return {
                 "success": True,
-                "gameState": game.to_dict(),
+                "gameState": self.projector.public_view(game),
                 "message": "Game started successfully"
             }
             
@@ -172,8 +245,13 @@ class GameService:
                 "error": str(e)
             }
     
-    def flip_card(self, room_code: str, player_id: str) -> Dict[str, Any]:
+    async def flip_card(self, room_code: str, player_id: str) -> Dict[str, Any]:
         """Handle card flipping - core game mechanic"""
+        async with self._room_lock(room_code):
+            return await self._flip_card(room_code, player_id)
+    
+    async def _flip_card(self, room_code: str, player_id: str) -> Dict[str, Any]:
+        """Handle card flipping (caller holds the room lock)"""
         try:
             game = self.active_games.get(room_code)
             if not game:
@@ -216,9 +294,14 @@ class GameService:
             # Draw a new card for the player
             if len(game.deck) == 0:
                 # Reshuffle deck if empty
-                game.deck = self._generate_initial_deck(len(game.players))
+                game.deck = DrawPile(await self._take_next_deck(room_code, game))
+            
+            new_card = game.deck.draw()
+            self._maybe_prefetch_deck(room_code, game)
             
-            new_card = game.deck.pop(0)
+            if game.first_flip_at is None:
+                game.first_flip_at = datetime.now()
+                self.first_flip_latency.record((game.first_flip_at - game.started_at).total_seconds())
             logger.info(f"🃏 Card drawn: {new_card.category} (is_wild: {new_card.is_wild}, shape: {new_card.shape})")
             
             # If it's a wild card, handle specially
@@ -250,7 +333,7 @@ class GameService:
                 logger.info(f"🌟 RETURNING WILD CARD RESPONSE: isWildCard=True")
                 return {
                     "success": True,
-                    "gameState": game.to_dict(),
+                    "gameState": self.projector.public_view(game),
                     "message": f"🌟 Wild Card! Draw another card to activate it.",
                     "isWildCard": True,
                     "wildCard": new_card.to_dict()
@@ -291,7 +374,7 @@ class GameService:
             
             return {
                 "success": True,
-                "gameState": game.to_dict(),
+                "gameState": self.projector.public_view(game),
                 "message": "Card flipped successfully"
             }
             
@@ -337,7 +420,7 @@ class GameService:
             
             return {
                 "success": True,
-                "gameState": game.to_dict(),
+                "gameState": self.projector.public_view(game),
                 "message": f"Turn passed to {next_player.name}"
             }
             
@@ -348,8 +431,13 @@ class GameService:
                 "error": str(e)
             }
     
-    def submit_answer(self, room_code: str, player_id: str, answer: str, category: str) -> Dict[str, Any]:
+    async def submit_answer(self, room_code: str, player_id: str, answer: str, category: str) -> Dict[str, Any]:
         """Handle answer submission during face-offs"""
+        async with self._room_lock(room_code):
+            return self._submit_answer(room_code, player_id, answer, category)
+    
+    def _submit_answer(self, room_code: str, player_id: str, answer: str, category: str) -> Dict[str, Any]:
+        """Handle answer submission (caller holds the room lock)"""
         try:
             game = self.active_games.get(room_code)
             if not game:
@@ -379,7 +467,7 @@ class GameService:
                 
                 return {
                     "success": True,
-                    "gameState": game.to_dict(),
+                    "gameState": self.projector.public_view(game),
                     "isValidAnswer": True,
                     "playerId": player_id,
                     "message": "Answer accepted! +1 point"
@@ -387,7 +475,7 @@ class GameService:
             else:
                 return {
                     "success": True,
-                    "gameState": game.to_dict(),
+                    "gameState": self.projector.public_view(game),
                     "isValidAnswer": False,
                     "playerId": player_id,
                     "message": "Answer not accepted"
@@ -401,9 +489,24 @@ class GameService:
             }
     
     def get_game_state(self, room_code: str) -> Optional[Dict[str, Any]]:
-        """Get current game state"""
+        """Get current game state (public view)"""
         game = self.active_games.get(room_code)
-        return game.to_dict() if game else None
+        return self.projector.public_view(game) if game else None
+    
+    async def get_game_history(self, room_code: str, cursor: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """Get a page of a game's event history, oldest first, starting at `cursor`"""
+        game = self.active_games.get(room_code)
+        if not game:
+            return {"success": False, "error": "Game not found"}
+        
+        events, next_cursor = await game.game_history.page(cursor, limit)
+        return {
+            "success": True,
+            "events": events,
+            "cursor": cursor,
+            "nextCursor": next_cursor,
+            "total": len(game.game_history)
+        }
     
     def end_game(self, room_code: str) -> bool:
         """End a game and clean up"""
@@ -429,6 +532,12 @@ class GameService:
                 game.final_scores = final_scores
                 game.winner = final_scores[0] if final_scores else None
                 
+                # No more reshuffles - drop any prefetched deck
+                task = self.deck_prefetch_tasks.pop(room_code, None)
+                if task:
+                    task.cancel()
+                game.next_deck = None
+                
                 logger.info(f"Game ended for room {room_code}. Winner: {game.winner['name'] if game.winner else 'None'}")
                 
                 return True
@@ -452,7 +561,7 @@ class GameService:
         
         for shape_name, category in zip(all_shapes, test_categories):
             card = Card(
-                id=str(uuid.uuid4()),
+                id=next_card_id(),
                 shape=CardShape[shape_name.upper()],
                 category=category,
                 is_wild=False
@@ -461,7 +570,7 @@ class GameService:
         
         # Add a wild card for testing
         wild_card = Card(
-            id=str(uuid.uuid4()),
+            id=next_card_id(),
             shape=CardShape.WILD,
             category="Wild Card",
             is_wild=True,
@@ -473,14 +582,153 @@ class GameService:
         
         return deck
     
-    def _generate_initial_deck(self, player_count: int) -> List[Card]:
-        """Generate initial deck of Anomia cards with LLM-generated categories
-        If more than 8 players, generate 2 decks to ensure enough cards"""
-        deck = []
+    def _maybe_prefetch_deck(self, room_code: str, game: Game) -> None:
+        """Start generating the next deck in the background once the draw pile runs low"""
+        if (len(game.deck) > self.prefetch_low_water
+                or game.next_deck is not None
+                or room_code in self.deck_prefetch_tasks
+                or game.status == GameStatus.COMPLETED):
+            return
+        
+        logger.info(f"Draw pile for room {room_code} down to {len(game.deck)} cards, prefetching next deck")
+        self.deck_prefetch_tasks[room_code] = asyncio.create_task(self._prefetch_deck(room_code, game))
+    
+    async def _prefetch_deck(self, room_code: str, game: Game) -> None:
+        """Generate the next deck and attach it to the game"""
+        try:
+            game.next_deck = await self._generate_initial_deck(len(game.players))
+        except Exception as e:
+            logger.warning(f"Deck prefetch failed for room {room_code}: {e}")
+        finally:
+            # A prefetch cancelled with its room can finish after the room's next game started its own
+            if self.deck_prefetch_tasks.get(room_code) is asyncio.current_task():
+                del self.deck_prefetch_tasks[room_code]
+    
+    async def _take_next_deck(self, room_code: str, game: Game) -> List[Card]:
+        """Get the deck for a reshuffle: the prefetched one if ready, otherwise wait for or generate it"""
+        if game.next_deck is None:
+            task = self.deck_prefetch_tasks.get(room_code)
+            if task:
+                self.prefetch_stats["late"] += 1
+                try:
+                    # Shielded so a cancelled flip doesn't throw away the prefetch
+                    await asyncio.shield(task)
+                except (asyncio.CancelledError, Exception) as e:
+                    # Only the prefetch being cancelled (room released, restart) falls back to generating inline
+                    if isinstance(e, asyncio.CancelledError) and not task.cancelled():
+                        raise
+                    logger.warning(f"Deck prefetch for room {room_code} did not finish ({type(e).__name__}) - generating inline")
+            else:
+                self.prefetch_stats["misses"] += 1
+                return await self._generate_initial_deck(len(game.players))
+        else:
+            self.prefetch_stats["hits"] += 1
+        
+        deck, game.next_deck = game.next_deck, None
+        if deck is None:
+            # The prefetch failed - generate inline
+            deck = await self._generate_initial_deck(len(game.players))
+        return deck
+    
+    def prepare_deck(self, room_code: str, player_count: int) -> None:
+        """Generate a room's deck in the background while its lobby fills up
+        Called on room creation and on every join; restarts as two decks once the lobby passes 8 players.
+        Skipped while the deck pool has a warm deck of that size or max_speculative_decks are running"""
+        if not self.speculative_decks_enabled:
+            return
+        self._prune_speculative_decks()
+        
+        num_decks = self._deck_count(player_count)
+        current = self.speculative_decks.get(room_code)
+        if current and current[0] >= num_decks:
+            return
+        
+        # A warm pooled deck will serve this room - don't spend an LLM call on it
+        if self.deck_pool.available(num_decks):
+            if current:
+                self.cancel_speculative_deck(room_code)
+            self.speculative_stats["skipped"] += 1
+            return
+        running = sum(1 for code, (_, task) in self.speculative_decks.items() if code != room_code and not task.done())
+        if running >= self.max_speculative_decks:
+            self.speculative_stats["skipped"] += 1
+            return
+        
+        if current:
+            current[1].cancel()
+            self.speculative_stats["upgraded"] += 1
+            logger.info(f"Room {room_code} passed 8 players - regenerating speculative deck as {num_decks} decks")
+        else:
+            self.speculative_stats["started"] += 1
         
-        # Use 2 decks if player count exceeds 8
-        num_decks = 2 if player_count > 8 else 1
-        logger.info(f"Generating {num_decks} deck(s) for {player_count} players")
+        self.speculative_decks[room_code] = (num_decks, asyncio.create_task(self._generate_decks(num_decks)))
+    
+    def cancel_speculative_deck(self, room_code: str) -> None:
+        """Drop a room's lobby-time deck generation (room abandoned or expired)"""
+        entry = self.speculative_decks.pop(room_code, None)
+        if entry:
+            entry[1].cancel()
+            self.speculative_stats["cancelled"] += 1
+            logger.info(f"Cancelled speculative deck for room {room_code}")
+    
+    def _prune_speculative_decks(self) -> None:
+        """Cancel speculative decks for rooms that were abandoned or cleaned up"""
+        for room_code in list(self.speculative_decks):
+            room = self.room_service.active_rooms.get(room_code)
+            if not room or room.get("status") == "abandoned":
+                self.cancel_speculative_deck(room_code)
+    
+    async def _take_speculative_deck(self, room_code: str, player_count: int) -> Optional[List[Card]]:
+        """Get the deck generated during the lobby, or None if there isn't a usable one"""
+        entry = self.speculative_decks.pop(room_code, None)
+        if not entry:
+            return None
+        
+        num_decks, task = entry
+        # Wrong size (players left after an upgrade), or still running while a pooled deck is ready
+        if num_decks != self._deck_count(player_count) or (not task.done() and self.deck_pool.available(num_decks)):
+            task.cancel()
+            self.speculative_stats["cancelled"] += 1
+            return None
+        
+        try:
+            # Shielded so a cancelled startGame doesn't cancel the generation itself
+            deck = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"Speculative deck for room {room_code} failed: {e}")
+            return None
+        
+        self.speculative_stats["used"] += 1
+        logger.info(f"Using speculative {num_decks} deck(s) generated during the lobby for room {room_code}")
+        return deck
+    
+    @staticmethod
+    def _deck_count(player_count: int) -> int:
+        """Number of decks for a game: 2 if more than 8 players, otherwise 1"""
+        return 2 if player_count > 8 else 1
+    
+    async def _generate_initial_deck(self, player_count: int, spare_decks: bool = False) -> List[Card]:
+        """Get a shuffled deck for a game: a warm one from the deck pool if available, otherwise generate it now
+        If more than 8 players, use 2 decks to ensure enough cards. `spare_decks` is passed on to the LLM service"""
+        num_decks = self._deck_count(player_count)
+        
+        deck = self.deck_pool.take(num_decks)
+        if deck is not None:
+            logger.info(f"Using pooled {num_decks} deck(s) for {player_count} players")
+            return deck
+        
+        logger.info(f"Deck pool empty - generating {num_decks} deck(s) for {player_count} players")
+        return await self._generate_decks(num_decks, spare_decks=spare_decks)
+    
+    async def _generate_pooled_decks(self, num_decks: int) -> List[Card]:
+        """Deck factory for the deck pool: only LLM (or corpus) decks are pooled"""
+        return await self._generate_decks(num_decks, allow_fallback=False)
+    
+    async def _generate_decks(self, num_decks: int, allow_fallback: bool = True, spare_decks: bool = False) -> List[Card]:
+        """Generate a shuffled deck of Anomia cards (num_decks decks' worth) with LLM-generated categories
+        Raises FallbackDeckError instead of using fallback categories if `allow_fallback` is False.
+        `spare_decks` lets a cache miss generate extra decks for later games (only for callers without a supply)"""
+        deck = []
         
         # Calculate total categories needed per deck (excluding wild cards)
         categories_per_deck = sum(count for shape_name, count in self.cards_per_shape.items() if shape_name != "wild")
@@ -489,13 +737,16 @@ class GameService:
         
         # Generate all categories in one LLM call
         all_categories = []
+        used_fallback = True
         if self.llm_service:
             try:
                 # Single LLM call for all categories
-                llm_categories = self.llm_service.generate_categories_for_game(
-                    count=total_categories_needed
+                llm_categories = await self.llm_service.generate_categories_for_game(
+                    count=total_categories_needed, spare_decks=spare_decks
                 )
                 all_categories = [cat["category"] for cat in llm_categories]
+                # The LLM service falls back itself when the provider fails or its breaker is open
+                used_fallback = any(cat.get("source") == FALLBACK_SOURCE for cat in llm_categories)
                 logger.info(f"Generated {len(all_categories)} LLM categories in single call")
             except Exception as e:
                 logger.warning(f"LLM category generation failed: {e}")
@@ -505,6 +756,10 @@ class GameService:
             # No LLM service available, use fallback
             all_categories = self._get_fallback_categories(total_categories_needed)
         
+        # (without a usable LLM client fallback decks are all there is, so they may be pooled)
+        if used_fallback and not allow_fallback and self.llm_service and self.llm_service.openai_client is not None:
+            raise FallbackDeckError(f"Only fallback categories available for {num_decks} deck(s)")
+        
         # Log the final categories that will be used in the deck (after deduplication)
         logger.info("=" * 80)
         logger.info(f"🎴 FINAL DECK CATEGORIES (after deduplication) - {len(all_categories)} categories:")
@@ -526,7 +781,7 @@ class GameService:
                         wild_shapes = random.sample(self.shapes, 2)  # Pick 2 different shapes
                         
                         card = Card(
-                            id=str(uuid.uuid4()),
+                            id=next_card_id(),
                             shape=CardShape.WILD,
                             category="Wild Card",
                             is_wild=True,
@@ -547,7 +802,7 @@ class GameService:
                             category = random.choice(self.fallback_categories)
                         
                         card = Card(
-                            id=str(uuid.uuid4()),
+                            id=next_card_id(),
                             shape=shape,
                             category=category,
                             is_wild=False
@@ -571,24 +826,26 @@ class GameService:
         # This function is kept for potential future use but not called
         for player in game.players:
             for i in range(self.game_config["cards_per_player"]):
-                if len(game.deck) > 0:
-                    card = game.deck.pop()
+                card = game.deck.draw()
+                if card:
                     player.add_card_to_deck(card)
     
     def _shuffle_deck(self, deck: List[Card]) -> List[Card]:
-        """Shuffle deck using Fisher-Yates algorithm"""
-        shuffled = deck.copy()
-        for i in range(len(shuffled) - 1, 0, -1):
-            j = random.randint(0, i)
-            shuffled[i], shuffled[j] = shuffled[j], shuffled[i]
-        return shuffled
+        """Shuffle a freshly generated deck in place (Fisher-Yates via random.shuffle)"""
+        random.shuffle(deck)
+        return deck
     
     def _find_matches(self, game: Game, current_player_id: str) -> List[Faceoff]:
         """Find matching shapes between players (Anomia faceoff trigger)"""
         return game.find_matching_players(current_player_id)
     
-    def resolve_faceoff(self, room_code: str, loser_id: str) -> Dict[str, Any]:
+    async def resolve_faceoff(self, room_code: str, loser_id: str) -> Dict[str, Any]:
         """Resolve a faceoff when loser swipes up on their card"""
+        async with self._room_lock(room_code):
+            return self._resolve_faceoff(room_code, loser_id)
+    
+    def _resolve_faceoff(self, room_code: str, loser_id: str) -> Dict[str, Any]:
+        """Resolve a faceoff (caller holds the room lock)"""
         try:
             game = self.active_games.get(room_code)
             if not game:
@@ -604,19 +861,21 @@ class GameService:
             loser = game.get_player(result['loser']['id'])
             if winner:
                 winner.reset_turn_flag()
+                result['winner'] = self.projector.player_view(winner)
             if loser:
                 loser.reset_turn_flag()
+                result['loser'] = self.projector.player_view(loser)
             
             # Advance turn after faceoff resolution (simple: just go to next player)
             next_player = game.next_turn()
             if next_player:
-                result['nextPlayer'] = next_player.to_dict()
+                result['nextPlayer'] = self.projector.player_view(next_player)
                 result['message'] = f"Faceoff resolved! {result['winner']['name']} won. Turn passed to {next_player.name}"
             else:
                 result['message'] = f"Faceoff resolved! {result['winner']['name']} won."
             
             # Update the game state with the new turn information
-            result['gameState'] = game.to_dict()
+            result['gameState'] = self.projector.public_view(game)
             
             logger.info(f"Faceoff resolved: {result['winner']['name']} won, {result['loser']['name']} lost")
             
@@ -652,5 +911,19 @@ class GameService:
             "activeGames": active_games,
             "totalPlayers": total_players,
             "completedGames": completed_games,
+            "deckPrefetch": {
+                **self.prefetch_stats,
+                "inFlight": len(self.deck_prefetch_tasks),
+                "lowWater": self.prefetch_low_water
+            },
+            "deckPool": self.deck_pool.get_stats(),
+            "speculativeDecks": {
+                **self.speculative_stats,
+                "pending": len(self.speculative_decks),
+                "maxConcurrent": self.max_speculative_decks,
+                "enabled": self.speculative_decks_enabled
+            },
+            "startLatency": self.start_latency.summary(),
+            "timeToFirstFlip": self.first_flip_latency.summary(),
             "timestamp": datetime.now().isoformat()
         } 
\ No newline at end of file
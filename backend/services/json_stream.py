@@ -0,0 +1,91 @@
+import json
+import logging
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStream:
+    """Incremental parser for a JSON array that arrives in chunks
+
+    `feed()` returns each top-level item as soon as it is complete, so items
+    can be used while the rest is still streaming and a truncated response
+    still yields every item before the cut. Text before the opening bracket
+    (a preamble or a ``` fence) is skipped; malformed items are dropped.
+    """
+    __slots__ = ("_buffer", "_pos", "_item_start", "_depth", "_in_string", "_escape", "finished", "malformed")
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0          # Next character of _buffer to scan
+        self._item_start = 0   # Where the item being scanned starts in _buffer
+        self._depth = 0        # Bracket/brace nesting; the array's items sit at depth 1
+        self._in_string = False
+        self._escape = False
+        self.finished = False  # Closing bracket seen
+        self.malformed = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return the items it completed"""
+        if self.finished:
+            return []
+
+        buffer = self._buffer + chunk
+        items: List[Any] = []
+        i = self._pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Still looking for the array
+                if ch == "[":
+                    self._depth = 1
+                    self._item_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer[self._item_start:i], items)
+                    self.finished = True
+                    break
+            elif ch == "," and self._depth == 1:
+                self._emit(buffer[self._item_start:i], items)
+                self._item_start = i + 1
+            i += 1
+
+        # Only keep the unfinished item
+        if self._depth == 0:
+            self._buffer, self._pos, self._item_start = "", 0, 0
+        else:
+            self._buffer = buffer[self._item_start:]
+            self._pos = i - self._item_start
+            self._item_start = 0
+        return items
+
+    def close(self) -> List[Any]:
+        """End of input: return the trailing item of an unterminated array if it is complete"""
+        items: List[Any] = []
+        if not self.finished and self._depth == 1 and not self._in_string:
+            self._emit(self._buffer, items)
+        self._buffer, self._pos, self._item_start = "", 0, 0
+        return items
+
+    def _emit(self, text: str, items: List[Any]) -> None:
+        """Decode one complete item"""
+        text = text.strip()
+        if not text:
+            return
+        try:
+            items.append(json.loads(text))
+        except ValueError:
+            self.malformed += 1
+            logger.debug(f"Skipping malformed array item: {text[:80]}")
@@ -1,33 +1,145 @@
+import asyncio
 import logging
+import math
 import os
-from typing import Dict, List, Optional, Any
-import json
+import random
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+from services.category_cache import CategoryCache
+from services.category_corpus import CategoryCorpus, normalize_category_key
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.json_stream import JsonArrayStream
+from services.metrics import LatencyHistogram
+from services.prompt_templates import (DEFAULT_PROMPT_TEMPLATE, PROMPT_TEMPLATES, clean_category_name,
+                                      count_message_tokens, tokenizer_name)
+
 logger = logging.getLogger(__name__)
 
+
+# "source" of categories from the built-in list rather than the LLM (or its corpus)
+FALLBACK_SOURCE = "anomia_fallback"
+
+
+class LLMQueueTimeout(TimeoutError):
+    """A call's deadline ran out because it queued for a local LLM concurrency slot (not a provider failure)"""
+
+# Domains the prompt spreads categories across; sharded generations give each shard its own slice
+CATEGORY_DOMAINS = [
+    "food & drink", "nature & animals", "entertainment", "technology", "geography",
+    "sports & activities", "science", "arts & culture", "daily life"
+]
+
 class LLMService:
     """Service for AI/LLM integration"""
     
-    def __init__(self):
-        # OpenAI API configuration
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, model: Optional[str] = None):
+        # OpenAI API configuration - any OpenAI-compatible server works (a self-hosted model,
+        # a proxy, or the local stub in benchmarks/llm_stub.py)
+        self.base_url = base_url or os.getenv("LLM_BASE_URL") or os.getenv("OPENAI_BASE_URL")
+        self.openai_api_key = api_key or os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY")
+        self.openai_model = model or os.getenv("LLM_MODEL") or os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
         
         # Cache for generated content (in production, use Redis)
-        self.category_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self.cache_ttl_hours = float(os.getenv("CACHE_TTL_HOURS", 24))
+        self.category_cache = CategoryCache(ttl_seconds=self.cache_ttl_hours * 3600)
+        # A cache miss from a caller without a supply of its own (spare_decks=True) generates this many games'
+        # worth, so later hits get categories no game has had yet; 1 generates just the game plus the duplicate buffer
+        self.cache_pool_decks = max(1, int(os.getenv("CATEGORY_CACHE_POOL_DECKS", 1)))
+        
+        # Generations in progress by cache key; identical concurrent requests await the same one
+        self.inflight_generations: Dict[Tuple[int, Optional[str], Optional[str]], asyncio.Task] = {}
+        self.coalesced_requests = 0
         
         # Configuration
-        self.cache_ttl_hours = 24
-        self.max_retries = 3
+        self.max_retries = int(os.getenv("MAX_RETRIES", 3))
+        self.request_timeout = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", 60))
+        
+        # Each LLM call gets `call_deadline` seconds in total, retries included; failed attempts are
+        # retried after a jittered exponential backoff, and a run of failures opens the breaker so
+        # games skip the LLM instead of waiting on a dead provider
+        self.call_deadline = float(os.getenv("LLM_DEADLINE_SECONDS", 45))
+        self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+        self.retry_max_delay = float(os.getenv("LLM_RETRY_MAX_SECONDS", 8))
+        self.circuit_breaker = CircuitBreaker("llm")
+        self.retries = 0
+        self.call_latency = {"ok": LatencyHistogram(), "error": LatencyHistogram()}
+        
+        # At most max_concurrency completions run at once across all rooms; the rest wait their turn
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+        self.llm_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.requests_in_flight = 0
+        self.requests_waiting = 0
+        self.queue_timeouts = 0  # Calls whose deadline ran out because they queued for a slot
+        
+        # Large requests are split into concurrent calls of about this many categories each,
+        # since one huge completion is slow and tends to hit max_tokens (0 disables sharding)
+        self.shard_size = int(os.getenv("LLM_SHARD_SIZE", 60))
+        self.sharded_generations = 0
+        self.failed_shards = 0
+        
+        # Versioned prompt template; input tokens are counted per call
+        template_id = os.getenv("LLM_PROMPT_TEMPLATE", DEFAULT_PROMPT_TEMPLATE)
+        if template_id not in PROMPT_TEMPLATES:
+            logger.warning(f"Unknown LLM_PROMPT_TEMPLATE '{template_id}', using {DEFAULT_PROMPT_TEMPLATE}")
+            template_id = DEFAULT_PROMPT_TEMPLATE
+        self.prompt_template = PROMPT_TEMPLATES[template_id]
+        self.prompt_stats = {
+            "calls": 0,
+            "inputTokens": 0,
+            "rejected": 0  # Categories dropped by clean_category_name
+        }
+        
+        # Stream completions and parse categories as they arrive
+        self.streaming = os.getenv("LLM_STREAMING", "true").lower() == "true"
+        self.stream_stats = {
+            "earlyStops": 0,  # Stopped reading once enough categories had arrived
+            "truncated": 0    # Response ended mid-array; kept the complete items
+        }
         
-        # Initialize OpenAI client if API key is available
+        # Local corpus of every category the LLM has produced; games are dealt from it and
+        # the LLM is only called to top it up
+        self.corpus: Optional[CategoryCorpus] = None
+        if os.getenv("CATEGORY_CORPUS_ENABLED", "true").lower() == "true":
+            try:
+                self.corpus = CategoryCorpus()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Category corpus unavailable, generating every deck with the LLM: {e}")
+        self.corpus_min_size = int(os.getenv("CATEGORY_CORPUS_MIN_SIZE", 300))  # Deal from the corpus once it has this many
+        self.corpus_target_size = int(os.getenv("CATEGORY_CORPUS_TARGET_SIZE", 1000))  # Keep topping up until this many
+        self.corpus_top_up_batch = int(os.getenv("CATEGORY_CORPUS_TOP_UP_BATCH", 120))
+        self.corpus_top_up_task: Optional[asyncio.Task] = None
+        self.corpus_stats = {
+            "hits": 0,    # Game dealt from the corpus
+            "misses": 0   # Corpus too small - generated with the LLM
+        }
+        
+        # Initialize the async OpenAI client if API key (or a keyless local backend) is available
+        self.http_client = None
         self.openai_client = None
-        if self.openai_api_key:
+        if self.openai_api_key or self.base_url:
             try:
-                from openai import OpenAI
-                self.openai_client = OpenAI(api_key=self.openai_api_key)
-                logger.info("OpenAI client initialized successfully")
+                import httpx
+                from openai import AsyncOpenAI
+                # One pooled HTTP client shared by every call, so connections are kept alive and reused
+                self.http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency
+                    ),
+                    timeout=self.request_timeout
+                )
+                self.openai_client = AsyncOpenAI(
+                    # Local OpenAI-compatible servers usually don't check the key, but the client requires one
+                    api_key=self.openai_api_key or "not-needed",
+                    base_url=self.base_url,
+                    http_client=self.http_client,
+                    max_retries=0  # Retries are ours (_generate_with_retries), under the deadline and breaker
+                )
+                logger.info(f"OpenAI client initialized successfully ({self.base_url or 'api.openai.com'})")
             except ImportError:
                 logger.warning("OpenAI package not installed. Install with: pip install openai")
             except Exception as e:
@@ -35,194 +147,336 @@ class LLMService:
         else:
             logger.warning("No OpenAI API key found. LLM features will be limited.")
     
-    def generate_categories_for_game(self, count: int) -> List[Dict[str, Any]]:
-        """Generate game categories using LLM with duplicate detection"""
+    @asynccontextmanager
+    async def _llm_slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one of the global LLM concurrency slots for the duration of a call
+        Raises LLMQueueTimeout if none comes free within `timeout` seconds"""
+        self.requests_waiting += 1
+        try:
+            await asyncio.wait_for(self.llm_semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            raise LLMQueueTimeout(f"No LLM slot came free within {timeout:.1f}s") from None
+        finally:
+            self.requests_waiting -= 1
+        
+        self.requests_in_flight += 1
         try:
-            # Check cache first
-            cache_key = f"{count}"
-            if cache_key in self.category_cache:
+            yield
+        finally:
+            self.requests_in_flight -= 1
+            self.llm_semaphore.release()
+    
+    async def close(self) -> None:
+        """Stop corpus top-ups, close the corpus and the pooled HTTP client"""
+        if self.corpus_top_up_task is not None:
+            self.corpus_top_up_task.cancel()
+        if self.corpus is not None:
+            self.corpus.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+    
+    async def generate_categories_for_game(self, count: int, difficulty: Optional[str] = None,
+                                           theme: Optional[str] = None, spare_decks: bool = False) -> List[Dict[str, Any]]:
+        """Generate game categories using LLM with duplicate detection
+        With `spare_decks`, a cache miss generates cache_pool_decks games' worth for later cache hits; callers
+        that keep their own supply of decks (deck pool, prefetch, lobby decks) leave it off"""
+        try:
+            # Deal from the local corpus when it's big enough - no LLM call on the game's path
+            # (the corpus isn't tagged by difficulty/theme, so only for unconstrained requests)
+            if self.corpus and difficulty is None and theme is None:
+                corpus_categories = await asyncio.to_thread(self._deal_from_corpus, count)
+                if corpus_categories is not None:
+                    self.corpus_stats["hits"] += 1
+                    self._maybe_top_up_corpus()
+                    return corpus_categories
+                self.corpus_stats["misses"] += 1
+            
+            # Check cache first - every hit gets the cached pool's least-served categories
+            cache_key = (count, difficulty, theme)
+            cached = self.category_cache.sample(cache_key, count)
+            if cached is not None:
                 logger.info(f"Using cached categories for {count} categories")
-                return self.category_cache[cache_key]
-            
-            # Generate extra categories (small buffer) to account for duplicates that will be filtered
-            # For large counts (208+), use a smaller percentage to avoid generating too many
-            if count >= 200:
-                extra_count = 15  # Just 15 extra for 2 decks
-            else:
-                extra_count = max(int(count * 0.15), 10)  # 15% buffer, at least 10 extra
-            total_to_generate = count + extra_count
-            logger.info(f"Generating {total_to_generate} categories (requested: {count}, buffer: {extra_count})")
-            
-            if self.openai_client:
-                # Use OpenAI to generate categories (with buffer)
-                all_categories = self._generate_with_openai(total_to_generate)
-            else:
-                # Fallback to predefined categories
-                all_categories = self._generate_fallback_categories(total_to_generate)
-            
-            # Filter duplicates and similar categories using hard-coded checks
-            unique_categories = self._filter_duplicates(all_categories, count)
-            
-            # Cache the results
-            self.category_cache[cache_key] = unique_categories
-            
-            logger.info(f"Generated {len(unique_categories)} unique categories (filtered from {len(all_categories)})")
-            return unique_categories
+                return cached
+            
+            # Provider keeps failing - deal from whatever the corpus has, or the fallback list
+            if self.openai_client and self.circuit_breaker.is_open():
+                if self.corpus and difficulty is None and theme is None:
+                    corpus_categories = await asyncio.to_thread(self._deal_from_corpus, count, count)
+                    if corpus_categories is not None:
+                        return corpus_categories
+                logger.warning("LLM circuit breaker is open - using fallback categories")
+                return self._generate_fallback_categories(count)
+            
+            # Single flight: if the same request is already generating, wait for it instead of
+            # sending an identical LLM call, then deal this game its own sample of the result
+            generation = self.inflight_generations.get(cache_key)
+            if generation is None:
+                pool_size = count * self.cache_pool_decks if spare_decks else count
+                generation = asyncio.create_task(self._generate_pool(cache_key, count, difficulty, theme, pool_size))
+                self.inflight_generations[cache_key] = generation
+                generation.add_done_callback(lambda _: self.inflight_generations.pop(cache_key, None))
+                # Shielded so a cancelled caller doesn't cancel the generation others are waiting on
+                share, _ = await asyncio.shield(generation)
+                return share
+            
+            self.coalesced_requests += 1
+            logger.info(f"Joining in-flight generation of {count} categories")
+            _, pool = await asyncio.shield(generation)
+            share = self.category_cache.deal(cache_key, count)
+            return share if share is not None else random.sample(pool, min(count, len(pool)))
             
         except Exception as e:
-            logger.error(f"Error generating categories: {e}")
+            logger.error(f"Error generating categories: {type(e).__name__}: {e}")
             # Return fallback categories on error
             return self._generate_fallback_categories(count)
     
+    async def _generate_pool(self, cache_key: Tuple[int, Optional[str], Optional[str]], count: int,
+                             difficulty: Optional[str], theme: Optional[str],
+                             pool_size: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Generate this game's `count` categories and the pool (`pool_size` plus spares) they came from, which is cached"""
+        # Generate extra categories (small buffer) to account for duplicates that will be filtered
+        total_to_generate = pool_size + self._buffer_size(pool_size)
+        logger.info(f"Generating {total_to_generate} categories (requested: {count})")
+        
+        if self.openai_client:
+            # Use OpenAI to generate categories (with buffer)
+            all_categories = await self._generate_sharded(total_to_generate, difficulty, theme)
+        else:
+            # Fallback to predefined categories
+            all_categories = self._generate_fallback_categories(total_to_generate)
+        
+        # Filter duplicates and similar categories using hard-coded checks
+        # (pairwise similarity checks take hundreds of ms for two decks - keep them off the event loop)
+        # Keep the whole distinct pool, not just `count`, so later games are dealt categories this one didn't get
+        pool = await asyncio.to_thread(self._filter_duplicates, all_categories, len(all_categories), count)
+        
+        # Keep the LLM's output for future games
+        if self.corpus and self.openai_client:
+            await asyncio.to_thread(self.corpus.ingest, pool, "openai")
+        
+        # Cache the pool; this game gets the first `count`. A pool short of one game (failed shards) isn't
+        # cached - every hit would get the short deck until it expired
+        if len(pool) >= count:
+            self.category_cache.put(cache_key, pool, dealt=count)
+        else:
+            logger.warning(f"Not caching a pool of {len(pool)} categories ({count} requested)")
+        logger.info(f"Generated {len(pool)} unique categories (filtered from {len(all_categories)})")
+        return pool[:count], pool
+    
+    def _buffer_size(self, count: int) -> int:
+        """Extra categories to request on top of `count` to make up for filtered duplicates"""
+        # For large counts (208+), use a smaller percentage to avoid generating too many
+        if count >= 200:
+            return 15  # Just 15 extra for 2 decks
+        return max(int(count * 0.15), 10)  # 15% buffer, at least 10 extra
+    
+    def _deal_from_corpus(self, count: int, min_size: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Pick `count` distinct categories from the corpus, or None if it can't supply them (blocking)
+        The corpus is only used once it holds `min_size` categories (default corpus_min_size)"""
+        min_size = self.corpus_min_size if min_size is None else min_size
+        if self.corpus.size() < max(min_size, count):
+            return None
+        
+        # Dealt (marked served) in one transaction so concurrent games don't get the same categories.
+        # Categories from different LLM batches can still be near-duplicates of each other - the ones
+        # filtered out here count as served too, and rotate back in with the rest
+        dealt = self.corpus.deal(count + self._buffer_size(count))
+        unique_categories = self._filter_duplicates(dealt, count)
+        if len(unique_categories) < count:
+            return None
+        
+        timestamp = datetime.now().isoformat()
+        logger.info(f"Dealt {count} categories from the corpus")
+        return [
+            {
+                "category": cat["category"],
+                "id": self._generate_id(),
+                "timestamp": timestamp,
+                "source": "corpus"
+            }
+            for cat in unique_categories
+        ]
+    
+    def _maybe_top_up_corpus(self) -> None:
+        """Grow the corpus with a background LLM batch while it's below its target size"""
+        if self.openai_client is None or self.corpus_top_up_task is not None or self.circuit_breaker.is_open():
+            return
+        self.corpus_top_up_task = asyncio.create_task(self._top_up_corpus())
+    
+    async def _top_up_corpus(self) -> None:
+        """Generate one batch of categories straight into the corpus"""
+        try:
+            if await asyncio.to_thread(self.corpus.size) >= self.corpus_target_size:
+                return
+            categories = await self._generate_sharded(self.corpus_top_up_batch)
+            unique_categories = await asyncio.to_thread(self._filter_duplicates, categories, len(categories), 0)
+            await asyncio.to_thread(self.corpus.ingest, unique_categories, "openai")
+        except Exception as e:
+            logger.warning(f"Corpus top-up failed: {e}")
+        finally:
+            self.corpus_top_up_task = None
+    
+    async def _generate_sharded(self, count: int, difficulty: Optional[str] = None,
+                                theme: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Generate `count` categories as concurrent smaller LLM calls, each over a different slice of domains
+        Shards overlap little but aren't de-duplicated here - callers run _filter_duplicates on the merge"""
+        num_shards = min(math.ceil(count / self.shard_size), len(CATEGORY_DOMAINS)) if self.shard_size > 0 else 1
+        if num_shards <= 1:
+            return await self._generate_with_retries(count, difficulty, theme)
+        
+        per_shard = math.ceil(count / num_shards)
+        logger.info(f"Generating {count} categories as {num_shards} shards of {per_shard}")
+        results = await asyncio.gather(
+            *(self._generate_with_retries(per_shard, difficulty, theme, CATEGORY_DOMAINS[i::num_shards])
+              for i in range(num_shards)),
+            return_exceptions=True
+        )
+        
+        merged: List[Dict[str, Any]] = []
+        failures = [result for result in results if isinstance(result, BaseException)]
+        for result in results:
+            if not isinstance(result, BaseException):
+                merged.extend(result)
+        self.sharded_generations += 1
+        self.failed_shards += len(failures)
+        if len(failures) == num_shards:
+            raise failures[0]
+        if failures:
+            logger.warning(f"{len(failures)}/{num_shards} shards failed, continuing with {len(merged)} categories")
+        return merged
+    
     # Note: Answer validation and example generation removed
     # This is an in-person game where players validate answers themselves
     
-    def _generate_with_openai(self, count: int) -> List[Dict[str, Any]]:
+    async def _generate_with_retries(self, count: int, difficulty: Optional[str] = None, theme: Optional[str] = None,
+                                     domains: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """One LLM call within the deadline budget: retried with jittered exponential backoff, guarded by the breaker"""
+        deadline = time.monotonic() + self.call_deadline
+        attempt = 0
+        while True:
+            # Waiting for a local slot sits outside the attempt's timeout: queueing behind our own calls
+            # says nothing about the provider, so a queue timeout neither trips the breaker nor uses a retry
+            queued_at = time.monotonic()
+            async with self._llm_slot(timeout=max(0.0, deadline - queued_at)):
+                if not self.circuit_breaker.allow():
+                    raise CircuitOpenError("LLM circuit breaker is open")
+                
+                started = time.perf_counter()
+                timeout = max(0.0, min(self.request_timeout, deadline - time.monotonic()))
+                error: Optional[Exception] = None
+                try:
+                    result = await asyncio.wait_for(self._generate_with_openai(count, difficulty, theme, domains), timeout)
+                except asyncio.TimeoutError as e:
+                    if timeout < min(self.request_timeout, deadline - queued_at) - 0.05:
+                        # The wait for a slot ate into this attempt's time - that's our load, not the provider
+                        self.queue_timeouts += 1
+                        raise LLMQueueTimeout("LLM call deadline passed after queueing for a slot") from e
+                    error = e
+                    self.call_latency["error"].record(time.perf_counter() - started)
+                    self.circuit_breaker.record_failure()
+                except Exception as e:
+                    error = e
+                    self.call_latency["error"].record(time.perf_counter() - started)
+                    # A bad request or key says nothing about the provider's health - only retryable errors count
+                    if self._is_retryable(e):
+                        self.circuit_breaker.record_failure()
+            
+            if error is None:
+                self.call_latency["ok"].record(time.perf_counter() - started)
+                self.circuit_breaker.record_success()
+                return result
+            
+            # Full jitter: anywhere up to the exponential delay, so failed rooms don't retry in lockstep
+            # (the slot is released first - nobody should queue behind a backoff)
+            backoff = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+            if (not self._is_retryable(error) or attempt >= self.max_retries
+                    or time.monotonic() + backoff >= deadline or self.circuit_breaker.is_open()):
+                raise error
+            attempt += 1
+            self.retries += 1
+            logger.warning(f"LLM call failed ({type(error).__name__}), retry {attempt}/{self.max_retries} in {backoff:.2f}s")
+            await asyncio.sleep(backoff)
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Timeouts, connection errors, 429s and 5xx are worth retrying; other 4xx (bad key, bad request) aren't"""
+        status = getattr(error, "status_code", None)
+        return status is None or status == 429 or status >= 500
+    
+    async def _generate_with_openai(self, count: int, difficulty: Optional[str] = None,
+                                    theme: Optional[str] = None, domains: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Generate categories using OpenAI API"""
         try:
-            prompt = f"""
-            Generate {count} UNIQUE game categories for Anomia, a fast-paced word association party game where players must quickly name examples from categories.
-            
-            CRITICAL REQUIREMENTS:
-            - ALL {count} categories must be COMPLETELY UNIQUE (no duplicates, no variations)
-            - Each category must be SPECIFIC and CONCRETE (players need to name actual examples, not abstract concepts)
-            - Universally accessible (most people know multiple examples)
-            - Challenging but fair (requires quick thinking, not specialized knowledge)
-            - Fun and engaging for all ages
-            - Family-friendly content
-            
-            ABSOLUTE DUPLICATE PROHIBITIONS (CRITICAL - DO NOT VIOLATE):
-            - Do NOT repeat any category name exactly
-            - Do NOT use variations like "Car Brand" and "Automobile Brand" 
-            - Do NOT use similar concepts like "Fruit" and "Citrus Fruit"
-            - Do NOT use same base word with different suffixes/prefixes: 
-              * "Board Game", "Board Game Accessory", "Board Game Cooperative Mode", "Board Game Publisher" - ONLY ONE allowed total
-              * "Video Game", "Video Game Console", "Video Game Character" - ONLY ONE allowed total
-              * "Card Game", "Card Game Type", "Card Game Variant" - ONLY ONE allowed total
-            - If you use "Board Game", you CANNOT use ANY other "Board Game X" variation in the same list
-            - Each category must be from a COMPLETELY DIFFERENT domain/subject area
-            - Maximum ONE category per base word/theme (e.g., only ONE board game related category TOTAL)
-            
-            GENRE DIVERSITY REQUIREMENTS:
-            - Spread categories across MANY different themes/genres
-            - Do NOT cluster similar themes (e.g., avoid multiple board game, food, or animal categories)
-            - MAXIMUM 1 category per theme/genre (e.g., only 1 board game category TOTAL, 1 food category TOTAL, etc.)
-            - Mix categories from: food, entertainment, nature, technology, sports, geography, science, arts, etc.
-            - Ensure variety in subject matter and difficulty level
-            - Each category must be from a DIFFERENT domain/subject area
-            
-            FORMAT REQUIREMENTS:
-            - Do NOT start categories with "Type of" (e.g., avoid "Type of Cheese", use "Cheese" instead)
-            - Do NOT start categories with "Kind of" (e.g., avoid "Kind of Bird", use "Bird" instead)
-            - Do NOT start categories with "Brand of" (e.g., avoid "Brand of Chocolate", use "Chocolate Brand" instead)
-            - Use direct, concise category names
-            
-            CRITICAL: Categories must be REAL THINGS that exist in the world, not abstract concepts or themes.
-            
-            EXCELLENT examples (real, concrete things people can name):
-            
-            FOOD & DRINK: "Shampoo Brand", "Fast Food Chain", "Soda Brand", "Candy Bar", "Ice Cream Flavor", "Spicy Food", "Cheese", "Pizza Topping", "Breakfast Cereal", "Coffee Brand"
-            
-            NATURE & ANIMALS: "Dog Breed", "Fruit", "Flower", "Bird", "Fish", "Tree", "Insect", "Mammal", "Reptile", "Ocean Animal"
-            
-            ENTERTAINMENT: "Movie Genre", "Musical Instrument", "Board Game", "Superhero", "Disney Princess", "TV Show", "Book Genre", "Song Title", "Actor", "Singer"
-            
-            TECHNOLOGY: "Car Brand", "Video Game Console", "Social Media Platform", "App", "Website", "Phone Brand", "Computer Brand", "Software", "Operating System"
-            
-            GEOGRAPHY: "City in California", "Country in Europe", "Famous Landmark", "Mountain", "River", "Ocean", "Desert", "Island", "Capital City", "State"
-            
-            SPORTS & ACTIVITIES: "Sport", "Outdoor Activity", "Exercise", "Hobby", "Olympic Sport", "Team Sport", "Individual Sport", "Water Sport", "Winter Sport"
-            
-            SCIENCE: "Element on Periodic Table", "Planet", "Chemical", "Disease", "Invention", "Scientist", "Medical Condition", "Body Part", "Organ", "Bone"
-            
-            ARTS & CULTURE: "Art Style", "Music Genre", "Dance Style", "Architecture Style", "Literary Genre", "Painter", "Composer", "Writer", "Artist", "Musician"
-            
-            DAILY LIFE: "Kitchen Appliance", "Clothing Item", "Tool", "Household Item", "Office Supply", "Furniture", "Vehicle", "Building", "Room in House", "School Subject"
-            
-            ABSOLUTELY FORBIDDEN - DO NOT USE THESE BAD CATEGORIES:
-            - "Board Game Accessory" (vague - what accessories? people can't name these quickly)
-            - "Board Game Cooperative Mode" (not a real thing people can name examples of)
-            - "Board Game Theme" (not a real thing people can name)
-            - "Board Game Token" (not a real thing people can name)
-            - "Board Game Publisher" (too niche - most people don't know these)
-            - "Board Game App" (too specific/narrow)
-            - "Game Piece" (too vague)
-            - "Brand" (too broad - could be anything)
-            - "Food" (too broad)
-            - "Colors" (too easy)
-            - "Things" (meaningless)
-            - "Stuff" (meaningless)
-            - "Items" (too vague)
-            - "Objects" (too vague)
-            - "Theme" (abstract concept)
-            - "Style" (too abstract)
-            - "Genre" (too abstract without context)
-            - "Category" (meta-category, not real)
-            - "Concept" (too abstract)
-            - "Idea" (too abstract)
-            - "Mode" (abstract - what mode?)
-            - "Accessory" (too vague - accessory to what?)
-            
-            CRITICAL: Categories must be things people can INSTANTLY name 3+ examples of without thinking.
-            
-            Return EXACTLY {count} UNIQUE categories in this exact JSON format:
-            [
-                "Specific Category Name",
-                "Another Unique Category",
-                "Third Unique Category",
-                ...
-            ]
-            
-            IMPORTANT: 
-            - Return ONLY the category names as strings
-            - Ensure all {count} categories are completely unique
-            - Response must be valid JSON array
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are a creative game designer specializing in Anomia, a fast-paced word association party game. You excel at creating specific, concrete categories that players can immediately name examples for. Your categories are universally accessible but challenging enough to create exciting gameplay."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.8
-            )
-            
-            # Parse the response
-            content = response.choices[0].message.content
-            logger.info(f"Raw OpenAI response: {content}")
-            
-            # Try to extract JSON from the response (in case there's extra text)
-            import re
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                json_content = json_match.group(0)
-            else:
-                json_content = content
-            
-            logger.info(f"Extracted JSON: {json_content}")
-            categories = json.loads(json_content)
-            
-            # Convert to expected format (now just strings)
-            result = []
-            for item in categories:
-                if isinstance(item, str):
-                    result.append({
-                        "category": item,
-                        "id": self._generate_id(),
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "openai"
-                    })
-                elif isinstance(item, dict) and "category" in item:
-                    # Fallback for old format
+            messages = self.prompt_template.render(count, difficulty, theme, domains)
+            self.prompt_stats["calls"] += 1
+            self.prompt_stats["inputTokens"] += count_message_tokens(messages, self.openai_model)
+            
+            # Items are parsed as they complete, so a truncated response still gives every complete category
+            parser = JsonArrayStream()
+            result: List[Dict[str, Any]] = []
+            seen = set()
+            
+            def collect(items: List[Any]) -> None:
+                for item in items:
+                    # Strings, or {"category": ...} in the old format
+                    name = item.get("category") if isinstance(item, dict) else item
+                    if not isinstance(name, str) or not name.strip():
+                        continue
+                    # The naming rules are checked here rather than spelled out in compact prompts
+                    name = clean_category_name(name)
+                    if name is None:
+                        self.prompt_stats["rejected"] += 1
+                        continue
+                    key = normalize_category_key(name)
+                    if key in seen:
+                        continue
+                    seen.add(key)
                     result.append({
-                        "category": item["category"],
+                        "category": name,
                         "id": self._generate_id(),
                         "timestamp": datetime.now().isoformat(),
                         "source": "openai"
                     })
             
+            if self.streaming:
+                stream = await self.openai_client.chat.completions.create(
+                    model=self.openai_model,
+                    messages=messages,
+                    max_tokens=max(2000, count * 12),  # ~12 tokens per category incl. JSON punctuation
+                    temperature=0.8,
+                    stream=True
+                )
+                try:
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            collect(parser.feed(delta))
+                        if len(result) >= count:
+                            # Enough distinct categories - don't wait for (or pay for) the rest
+                            if not parser.finished:
+                                self.stream_stats["earlyStops"] += 1
+                            break
+                finally:
+                    await stream.response.aclose()
+            else:
+                response = await self.openai_client.chat.completions.create(
+                    model=self.openai_model,
+                    messages=messages,
+                    max_tokens=max(2000, count * 12),
+                    temperature=0.8
+                )
+                content = response.choices[0].message.content or ""
+                logger.info(f"Raw OpenAI response: {content}")
+                collect(parser.feed(content))
+            
+            collect(parser.close())
+            if not parser.finished and len(result) < count:
+                self.stream_stats["truncated"] += 1
+                logger.warning(f"LLM response was cut off - keeping the {len(result)} complete categories")
+            if not result:
+                raise ValueError("LLM response contained no categories")
+            
             logger.info(f"Generated {len(result)} categories")
             return result
             
@@ -256,17 +510,19 @@ class LLMService:
                 "description": f"Real Anomia category: {category_name}",
                 "id": self._generate_id(),
                 "timestamp": datetime.now().isoformat(),
-                "source": "anomia_fallback"
+                "source": FALLBACK_SOURCE
             })
         
         return result
     
-    def _filter_duplicates(self, categories: List[Dict[str, Any]], target_count: int) -> List[Dict[str, Any]]:
+    def _filter_duplicates(self, categories: List[Dict[str, Any]], target_count: int,
+                           required_count: Optional[int] = None) -> List[Dict[str, Any]]:
         """Filter out duplicates and similar categories using hard-coded checks
         
         Args:
             categories: List of category dictionaries with 'category' key
             target_count: Number of unique categories needed
+            required_count: Warn if fewer than this many are left (defaults to target_count)
             
         Returns:
             List of unique categories, filtered to target_count
@@ -434,8 +690,9 @@ class LLMService:
         logger.info(f"Filtered duplicates: {duplicates_found} duplicates found, {len(unique_categories)} unique categories kept")
         
         # If we don't have enough unique categories, return what we have
-        if len(unique_categories) < target_count:
-            logger.warning(f"Only found {len(unique_categories)} unique categories (requested {target_count})")
+        required_count = target_count if required_count is None else required_count
+        if len(unique_categories) < required_count:
+            logger.warning(f"Only found {len(unique_categories)} unique categories (requested {required_count})")
         
         return unique_categories[:target_count]
     
@@ -455,8 +712,52 @@ class LLMService:
             "openai_available": self.openai_client is not None,
             "api_key_configured": bool(self.openai_api_key),
             "model": self.openai_model,
+            "base_url": self.base_url,
+            "concurrency": {
+                "limit": self.max_concurrency,
+                "inFlight": self.requests_in_flight,
+                "waiting": self.requests_waiting,
+                "queueTimeouts": self.queue_timeouts
+            },
             "cache_size": {
                 "categories": len(self.category_cache)
             },
+            "cache": {
+                **self.category_cache.get_stats(),
+                "poolDecks": self.cache_pool_decks
+            },
+            "retries": {
+                "maxRetries": self.max_retries,
+                "deadlineSeconds": self.call_deadline,
+                "retries": self.retries
+            },
+            "circuitBreaker": self.circuit_breaker.get_stats(),
+            "callLatency": {outcome: histogram.summary() for outcome, histogram in self.call_latency.items()},
+            "sharding": {
+                "shardSize": self.shard_size,
+                "shardedGenerations": self.sharded_generations,
+                "failedShards": self.failed_shards
+            },
+            "prompt": {
+                "template": self.prompt_template.id,
+                "templateTokens": self.prompt_template.token_count(model=self.openai_model),
+                "tokenizer": tokenizer_name(self.openai_model),
+                **self.prompt_stats
+            },
+            "streaming": {
+                "enabled": self.streaming,
+                **self.stream_stats
+            },
+            "singleFlight": {
+                "inFlight": len(self.inflight_generations),
+                "coalesced": self.coalesced_requests
+            },
+            "corpus": {
+                **self.corpus.get_stats(),
+                **self.corpus_stats,
+                "minSize": self.corpus_min_size,
+                "targetSize": self.corpus_target_size,
+                "toppingUp": self.corpus_top_up_task is not None
+            } if self.corpus else None,
             "timestamp": datetime.now().isoformat()
         } 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Keeps the most recent latency samples and summarizes them for status endpoints"""
+
+    def __init__(self, max_samples: Optional[int] = None):
+        self.samples: Deque[float] = deque(maxlen=max_samples or int(os.getenv("METRICS_MAX_SAMPLES", 200)))
+        self.count = 0  # Lifetime number of samples
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample"""
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, average, median, p95, p99 and max (ms) over the recent samples"""
+        if not self.samples:
+            return {"count": self.count, "avgMs": None, "p50Ms": None, "p95Ms": None, "p99Ms": None, "maxMs": None}
+
+        ordered = sorted(self.samples)
+        def percentile(fraction: float) -> float:
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+        return {
+            "count": self.count,
+            "avgMs": round(sum(ordered) / len(ordered) * 1000, 1),
+            "p50Ms": round(percentile(0.5), 1),
+            "p95Ms": round(percentile(0.95), 1),
+            "p99Ms": round(percentile(0.99), 1),
+            "maxMs": round(ordered[-1] * 1000, 1)
+        }
+
+
+class LatencyHistogram:
+    """Lifetime latency counts in fixed buckets (upper bounds in ms), for status endpoints"""
+
+    BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # Last bucket: slower than every bound
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Count one sample"""
+        self.counts[bisect_left(self.BUCKETS_MS, seconds * 1000)] += 1
+        self.total_seconds += seconds
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, average and per-bucket counts keyed like "<=500ms" / ">30000ms" """
+        count = sum(self.counts)
+        buckets = {f"<={bound}ms": n for bound, n in zip(self.BUCKETS_MS, self.counts)}
+        buckets[f">{self.BUCKETS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": count,
+            "avgMs": round(self.total_seconds / count * 1000, 1) if count else None,
+            "buckets": buckets
+        }
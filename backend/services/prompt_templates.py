@@ -0,0 +1,239 @@
+import logging
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# tiktoken is optional - without it token counts are estimated at ~4 characters per token
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+# Categories per call that template token counts are quoted at (a typical shard)
+TOKEN_COUNT_SIZE = 60
+
+
+@dataclass(frozen=True, slots=True)
+class PromptTemplate:
+    """A versioned category-generation prompt
+
+    `user` is a str.format template with {count} and {focus}; each
+    difficulty/theme/domain line in {focus} starts with `focus_prefix`.
+    Never edit a released template - add a new version so token counts and
+    benchmark results stay comparable.
+    """
+    name: str
+    version: int
+    system: str
+    user: str
+    focus_prefix: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}-v{self.version}"
+
+    def render(self, count: int, difficulty: Optional[str] = None, theme: Optional[str] = None,
+               domains: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """Chat messages asking for `count` categories"""
+        focus = ""
+        if difficulty:
+            focus += f"{self.focus_prefix}Pitch the categories at {difficulty} difficulty"
+        if theme:
+            focus += f"{self.focus_prefix}Draw the categories from the theme: {theme}"
+        if domains:
+            focus += f"{self.focus_prefix}Only use categories from these domains: {', '.join(domains)}"
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(count=count, focus=focus)}
+        ]
+
+    def token_count(self, count: int = TOKEN_COUNT_SIZE, model: str = "gpt-4o-mini") -> int:
+        """Input tokens of a plain request for `count` categories"""
+        return count_message_tokens(self.render(count), model)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for `model` (None if unavailable)"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Not an OpenAI model name (self-hosted, proxy) - the current OpenAI encoding is a fair proxy
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"Could not load a tokenizer for {model}, estimating token counts: {e}")
+        return None
+
+
+def tokenizer_name(model: str = "gpt-4o-mini") -> str:
+    """Which tokenizer count_message_tokens uses for `model`"""
+    encoding = _encoding(model)
+    return encoding.name if encoding is not None else "estimate"
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-4o-mini") -> int:
+    """Input tokens for a chat request: message contents plus the chat format's per-message overhead"""
+    encoding = _encoding(model)
+    if encoding is None:
+        content = sum(math.ceil(len(message["content"]) / 4) for message in messages)
+    else:
+        content = sum(len(encoding.encode(message["content"])) for message in messages)
+    return content + 3 * len(messages) + 3
+
+
+FULL_V1 = PromptTemplate(
+    name="full",
+    version=1,
+    system=(
+        "You are a creative game designer specializing in Anomia, a fast-paced word association party game. "
+        "You excel at creating specific, concrete categories that players can immediately name examples for. "
+        "Your categories are universally accessible but challenging enough to create exciting gameplay."
+    ),
+    user="""
+            Generate {count} UNIQUE game categories for Anomia, a fast-paced word association party game where players must quickly name examples from categories.
+            
+            CRITICAL REQUIREMENTS:
+            - ALL {count} categories must be COMPLETELY UNIQUE (no duplicates, no variations)
+            - Each category must be SPECIFIC and CONCRETE (players need to name actual examples, not abstract concepts)
+            - Universally accessible (most people know multiple examples)
+            - Challenging but fair (requires quick thinking, not specialized knowledge)
+            - Fun and engaging for all ages
+            - Family-friendly content{focus}
+            
+            ABSOLUTE DUPLICATE PROHIBITIONS (CRITICAL - DO NOT VIOLATE):
+            - Do NOT repeat any category name exactly
+            - Do NOT use variations like "Car Brand" and "Automobile Brand" 
+            - Do NOT use similar concepts like "Fruit" and "Citrus Fruit"
+            - Do NOT use same base word with different suffixes/prefixes: 
+              * "Board Game", "Board Game Accessory", "Board Game Cooperative Mode", "Board Game Publisher" - ONLY ONE allowed total
+              * "Video Game", "Video Game Console", "Video Game Character" - ONLY ONE allowed total
+              * "Card Game", "Card Game Type", "Card Game Variant" - ONLY ONE allowed total
+            - If you use "Board Game", you CANNOT use ANY other "Board Game X" variation in the same list
+            - Each category must be from a COMPLETELY DIFFERENT domain/subject area
+            - Maximum ONE category per base word/theme (e.g., only ONE board game related category TOTAL)
+            
+            GENRE DIVERSITY REQUIREMENTS:
+            - Spread categories across MANY different themes/genres
+            - Do NOT cluster similar themes (e.g., avoid multiple board game, food, or animal categories)
+            - MAXIMUM 1 category per theme/genre (e.g., only 1 board game category TOTAL, 1 food category TOTAL, etc.)
+            - Mix categories from: food, entertainment, nature, technology, sports, geography, science, arts, etc.
+            - Ensure variety in subject matter and difficulty level
+            - Each category must be from a DIFFERENT domain/subject area
+            
+            FORMAT REQUIREMENTS:
+            - Do NOT start categories with "Type of" (e.g., avoid "Type of Cheese", use "Cheese" instead)
+            - Do NOT start categories with "Kind of" (e.g., avoid "Kind of Bird", use "Bird" instead)
+            - Do NOT start categories with "Brand of" (e.g., avoid "Brand of Chocolate", use "Chocolate Brand" instead)
+            - Use direct, concise category names
+            
+            CRITICAL: Categories must be REAL THINGS that exist in the world, not abstract concepts or themes.
+            
+            EXCELLENT examples (real, concrete things people can name):
+            
+            FOOD & DRINK: "Shampoo Brand", "Fast Food Chain", "Soda Brand", "Candy Bar", "Ice Cream Flavor", "Spicy Food", "Cheese", "Pizza Topping", "Breakfast Cereal", "Coffee Brand"
+            
+            NATURE & ANIMALS: "Dog Breed", "Fruit", "Flower", "Bird", "Fish", "Tree", "Insect", "Mammal", "Reptile", "Ocean Animal"
+            
+            ENTERTAINMENT: "Movie Genre", "Musical Instrument", "Board Game", "Superhero", "Disney Princess", "TV Show", "Book Genre", "Song Title", "Actor", "Singer"
+            
+            TECHNOLOGY: "Car Brand", "Video Game Console", "Social Media Platform", "App", "Website", "Phone Brand", "Computer Brand", "Software", "Operating System"
+            
+            GEOGRAPHY: "City in California", "Country in Europe", "Famous Landmark", "Mountain", "River", "Ocean", "Desert", "Island", "Capital City", "State"
+            
+            SPORTS & ACTIVITIES: "Sport", "Outdoor Activity", "Exercise", "Hobby", "Olympic Sport", "Team Sport", "Individual Sport", "Water Sport", "Winter Sport"
+            
+            SCIENCE: "Element on Periodic Table", "Planet", "Chemical", "Disease", "Invention", "Scientist", "Medical Condition", "Body Part", "Organ", "Bone"
+            
+            ARTS & CULTURE: "Art Style", "Music Genre", "Dance Style", "Architecture Style", "Literary Genre", "Painter", "Composer", "Writer", "Artist", "Musician"
+            
+            DAILY LIFE: "Kitchen Appliance", "Clothing Item", "Tool", "Household Item", "Office Supply", "Furniture", "Vehicle", "Building", "Room in House", "School Subject"
+            
+            ABSOLUTELY FORBIDDEN - DO NOT USE THESE BAD CATEGORIES:
+            - "Board Game Accessory" (vague - what accessories? people can't name these quickly)
+            - "Board Game Cooperative Mode" (not a real thing people can name examples of)
+            - "Board Game Theme" (not a real thing people can name)
+            - "Board Game Token" (not a real thing people can name)
+            - "Board Game Publisher" (too niche - most people don't know these)
+            - "Board Game App" (too specific/narrow)
+            - "Game Piece" (too vague)
+            - "Brand" (too broad - could be anything)
+            - "Food" (too broad)
+            - "Colors" (too easy)
+            - "Things" (meaningless)
+            - "Stuff" (meaningless)
+            - "Items" (too vague)
+            - "Objects" (too vague)
+            - "Theme" (abstract concept)
+            - "Style" (too abstract)
+            - "Genre" (too abstract without context)
+            - "Category" (meta-category, not real)
+            - "Concept" (too abstract)
+            - "Idea" (too abstract)
+            - "Mode" (abstract - what mode?)
+            - "Accessory" (too vague - accessory to what?)
+            
+            CRITICAL: Categories must be things people can INSTANTLY name 3+ examples of without thinking.
+            
+            Return EXACTLY {count} UNIQUE categories in this exact JSON format:
+            [
+                "Specific Category Name",
+                "Another Unique Category",
+                "Third Unique Category",
+                ...
+            ]
+            
+            IMPORTANT: 
+            - Return ONLY the category names as strings
+            - Ensure all {count} categories are completely unique
+            - Response must be valid JSON array
+            """,
+    focus_prefix="\n            - "
+)
+
+# The negative rules (forbidden names, "Type of" prefixes, one category per base word) are
+# enforced locally by clean_category_name and LLMService._filter_duplicates instead of being sent
+COMPACT_V1 = PromptTemplate(
+    name="compact",
+    version=1,
+    system="You design categories for Anomia, a party game where players race to name an example of a category.",
+    user=(
+        "Generate {count} distinct Anomia categories. Each names a concrete, real kind of thing most people "
+        "can instantly give 3+ examples of, e.g. \"Dog Breed\", \"Pizza Topping\", \"Capital City\", "
+        "\"Board Game\". Family-friendly, short names, spread across many different subjects.{focus}\n"
+        "Reply with only a JSON array of {count} strings."
+    ),
+    focus_prefix="\n- "
+)
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {template.id: template for template in (FULL_V1, COMPACT_V1)}
+DEFAULT_PROMPT_TEMPLATE = FULL_V1.id
+
+# Names the full prompt forbids outright: too vague, abstract or niche to play
+FORBIDDEN_CATEGORIES = {
+    "board game accessory", "board game cooperative mode", "board game theme", "board game token",
+    "board game publisher", "board game app", "game piece", "brand", "food", "colors", "things", "stuff",
+    "items", "objects", "theme", "style", "genre", "category", "concept", "idea", "mode", "accessory"
+}
+_VAGUE_PREFIX = re.compile(r"^(?:a |an )?(type|kind|sort|brand)s? of\s+", re.IGNORECASE)
+
+
+def clean_category_name(name: str) -> Optional[str]:
+    """Apply the prompt's naming rules locally: "Type of Cheese" -> "Cheese", "Brand of Chocolate" ->
+    "Chocolate Brand"; None for forbidden names"""
+    name = re.sub(r"\s+", " ", name.strip().strip(".,;"))
+    match = _VAGUE_PREFIX.match(name)
+    if match:
+        rest = name[match.end():]
+        name = rest[:1].upper() + rest[1:]
+        if match.group(1).lower() == "brand":
+            name += " Brand"
+    if not name or name.lower() in FORBIDDEN_CATEGORIES:
+        return None
+    return name
@@ -1,7 +1,7 @@
 import uuid
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import json
 
 logger = logging.getLogger(__name__)
@@ -21,6 +21,9 @@ class RoomService:
             "cleanup_interval_minutes": 30
         }
         
+        # Called with the room code of each expired room after it's removed (from the cleanup thread)
+        self.on_room_removed: Optional[Callable[[str], None]] = None
+        
         # Start cleanup timer
         self._start_cleanup_timer()
     
@@ -261,6 +264,8 @@ class RoomService:
             for room_code in expired_rooms:
                 del self.active_rooms[room_code]
                 logger.info(f"Cleaned up expired room {room_code}")
+                if self.on_room_removed:
+                    self.on_room_removed(room_code)
             
             if expired_rooms:
                 logger.info(f"Cleaned up {len(expired_rooms)} expired rooms")
@@ -0,0 +1,77 @@
+import logging
+import os
+from typing import Dict, Optional, Any
+
+from models.game_models import Game, Player
+
+logger = logging.getLogger(__name__)
+
+class GameStateProjector:
+    """Builds compact per-audience views of a game for the wire
+
+    `Game.to_dict()` is the full internal state (draw pile, every card in every
+    stack, unbounded history). Clients only ever see top cards, so the public
+    view carries sizes instead of contents and only the last N history events.
+    A player's own stack is private and only sent to that player.
+    """
+
+    def __init__(self, history_limit: Optional[int] = None):
+        self.history_limit = history_limit if history_limit is not None else int(os.getenv("STATE_HISTORY_LIMIT", 10))
+
+    def public_view(self, game: Game) -> Dict[str, Any]:
+        """View of the game that every client in the room may see (reused until the game changes)"""
+        fingerprint = game.state_fingerprint()
+        if game.view_cache and game.view_cache[0] == fingerprint:
+            return game.view_cache[1]
+
+        recent_history = game.game_history.recent(self.history_limit)
+        view = {
+            "roomCode": game.room_code,
+            "status": game.status.value,
+            "currentRound": game.current_round,
+            "players": [self.player_view(player) for player in game.players],
+            "deckSize": len(game.deck),
+            "currentFaceoff": game.current_faceoff.to_dict() if game.current_faceoff else None,
+            "currentWildCard": game.current_wild_card.to_dict() if game.current_wild_card else None,
+            "currentPlayerId": game.current_player_id,
+            "currentPlayerIndex": game.current_player_index,
+            "gameHistory": [event.to_dict() for event in recent_history],
+            "historySize": len(game.game_history),
+            "startedAt": game.started_at.isoformat() if game.started_at else None,
+            "endedAt": game.ended_at.isoformat() if game.ended_at else None,
+            "lastActivity": game.last_activity.isoformat(),
+            "finalScores": game.final_scores,
+            "winner": game.winner
+        }
+        game.view_cache = (fingerprint, view)
+        return view
+
+    def player_view(self, player: Player) -> Dict[str, Any]:
+        """Public view of a player: top card and stack height instead of the whole stack"""
+        if player.view_cache and player.view_cache[0] == player.revision:
+            return player.view_cache[1]
+
+        top_card = player.get_top_card()
+        view = {
+            "id": player.id,
+            "name": player.name,
+            "isHost": player.is_host,
+            "score": player.score,
+            "topCard": top_card.to_dict() if top_card else None,
+            "deckSize": len(player.deck),
+            "isReady": player.is_ready,
+            "hasFlippedThisTurn": player.has_flipped_this_turn
+        }
+        player.view_cache = (player.revision, view)
+        return view
+
+    def private_view(self, game: Game, player_id: str) -> Optional[Dict[str, Any]]:
+        """Data only the given player may see (their own stack and socket)"""
+        player = game.get_player(player_id)
+        if not player:
+            return None
+        return {
+            "playerId": player.id,
+            "deck": [card.to_dict() for card in player.deck],
+            "socketId": player.socket_id
+        }
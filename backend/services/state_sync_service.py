@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, List, Optional, Any
+
+from models.game_models import Game
+from services.state_projection import GameStateProjector
+
+logger = logging.getLogger(__name__)
+
+class StateSyncService:
+    """Service for versioned game state synchronization (snapshots + deltas)
+
+    A snapshot's `gameState` with every later delta applied equals the
+    projector's public view. History is sent as `historyAppend` (the events
+    added since the base version); the client keeps the last `historyLimit`.
+    """
+
+    def __init__(self, projector: Optional[GameStateProjector] = None):
+        # Snapshots and deltas are built from the same compact public view clients see
+        self.projector = projector or GameStateProjector()
+
+        # Per-room sync state: room_code -> {"version": int, "summary": dict}
+        # The summary is the last state published to delta clients
+        self.room_states: Dict[str, Dict[str, Any]] = {}
+
+    def reset_room(self, room_code: str, game: Game) -> Dict[str, Any]:
+        """Start a fresh version history for a room (e.g. when a game starts)"""
+        self.room_states[room_code] = {
+            "version": 1,
+            "summary": self._summarize(game)
+        }
+        return self.snapshot(room_code, game)
+
+    def snapshot(self, room_code: str, game: Game, player_id: Optional[str] = None) -> Dict[str, Any]:
+        """Build a full state snapshot for a joining or resyncing client
+
+        If `player_id` is given, that player's private view is included as `self`.
+
+        The snapshot does not publish a new version: any changes that have not
+        been broadcast yet are still delivered by the next delta, and deltas
+        carry absolute values so re-applying them to a snapshot is harmless.
+        """
+        room_state = self.room_states.get(room_code)
+        if not room_state:
+            room_state = {"version": 1, "summary": self._summarize(game)}
+            self.room_states[room_code] = room_state
+
+        snapshot = {
+            "version": room_state["version"],
+            "historyLimit": self.projector.history_limit,
+            "gameState": self.projector.public_view(game)
+        }
+        if player_id:
+            private_view = self.projector.private_view(game, player_id)
+            if private_view:
+                snapshot["self"] = private_view
+        return snapshot
+
+    def build_delta(self, room_code: str, game: Game) -> Dict[str, Any]:
+        """Diff the game against the last published summary and bump the version
+
+        Returns a delta with only the changed fields. If nothing changed the
+        version is not bumped and `changes` is empty.
+        """
+        summary = self._summarize(game)
+        room_state = self.room_states.get(room_code)
+        if not room_state:
+            # No baseline yet - every field counts as changed
+            room_state = {"version": 0, "summary": {}}
+            self.room_states[room_code] = room_state
+
+        base_version = room_state["version"]
+        changes = self._diff(room_state["summary"], summary)
+
+        # New history events since the base version, not the whole recent list
+        added = summary["historySize"] - room_state["summary"].get("historySize", 0)
+        if added > 0 and self.projector.history_limit > 0:
+            recent_history = game.game_history.recent(min(added, self.projector.history_limit))
+            changes["historyAppend"] = [event.to_dict() for event in recent_history]
+
+        if changes:
+            room_state["version"] = base_version + 1
+            room_state["summary"] = summary
+
+        return {
+            "version": room_state["version"],
+            "baseVersion": base_version,
+            "changes": changes
+        }
+
+    def get_version(self, room_code: str) -> Optional[int]:
+        """Get the current state version for a room"""
+        room_state = self.room_states.get(room_code)
+        return room_state["version"] if room_state else None
+
+    def remove_room(self, room_code: str) -> None:
+        """Drop sync state for a room"""
+        self.room_states.pop(room_code, None)
+
+    def _summarize(self, game: Game) -> Dict[str, Any]:
+        """Extract the fields that change between events"""
+        players = {player.id: self.projector.player_view(player) for player in game.players}
+
+        return {
+            "status": game.status.value,
+            "currentRound": game.current_round,
+            "currentPlayerId": game.current_player_id,
+            "currentPlayerIndex": game.current_player_index,
+            "currentFaceoff": game.current_faceoff.to_dict() if game.current_faceoff else None,
+            "currentWildCard": game.current_wild_card.to_dict() if game.current_wild_card else None,
+            "deckSize": len(game.deck),
+            "playerOrder": [player.id for player in game.players],
+            "players": players,
+            "historySize": len(game.game_history),
+            "startedAt": game.started_at.isoformat() if game.started_at else None,
+            "lastActivity": game.last_activity.isoformat(),
+            "endedAt": game.ended_at.isoformat() if game.ended_at else None,
+            "finalScores": game.final_scores,
+            "winner": game.winner
+        }
+
+    def _diff(self, previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute the changed fields between two summaries"""
+        changes: Dict[str, Any] = {}
+
+        for key, value in current.items():
+            if key == "players":
+                continue
+            if key not in previous or previous[key] != value:
+                changes[key] = value
+
+        # Per-player changes only include the fields that changed
+        previous_players = previous.get("players", {})
+        player_changes: Dict[str, Dict[str, Any]] = {}
+        for player_id, player_summary in current["players"].items():
+            previous_player = previous_players.get(player_id, {})
+            changed_fields = {
+                field_name: field_value
+                for field_name, field_value in player_summary.items()
+                if field_name not in previous_player or previous_player[field_name] != field_value
+            }
+            if changed_fields:
+                player_changes[player_id] = changed_fields
+
+        if player_changes:
+            changes["players"] = player_changes
+
+        removed_players: List[str] = [player_id for player_id in previous_players if player_id not in current["players"]]
+        if removed_players:
+            changes["removedPlayers"] = removed_players
+
+        return changes
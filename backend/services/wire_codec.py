@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# orjson and msgpack are optional - fall back to the stdlib encoder when they aren't installed
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+Frame = Union[str, bytes]
+
+# WebSocket subprotocol that switches a connection to binary MessagePack frames
+MSGPACK_SUBPROTOCOL = "anomia.msgpack.v1"
+
+
+class FrameEncoder(ABC):
+    """Interface for encoding outbound WebSocket messages into frames (and decoding inbound ones)"""
+    name = "base"
+    binary = False  # True if frames must be sent as binary WebSocket frames
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        """Encode a message into a frame ready to send"""
+
+    @abstractmethod
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        """Decode a received frame into a message"""
+
+
+class JsonFrameEncoder(FrameEncoder):
+    """Stdlib json encoder (text frames)"""
+    name = "json"
+
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        return json.dumps(message)
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        return json.loads(frame)
+
+
+class OrjsonFrameEncoder(FrameEncoder):
+    """orjson encoder (text frames)"""
+    name = "orjson"
+
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        # orjson returns UTF-8 bytes; decode once so the frame can go out via send_text
+        return orjson.dumps(message).decode("utf-8")
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        return orjson.loads(frame)
+
+
+class MsgpackFrameEncoder(FrameEncoder):
+    """MessagePack encoder (binary frames) for the anomia.msgpack.v1 subprotocol"""
+    name = "msgpack"
+    binary = True
+
+    def encode(self, message: Dict[str, Any]) -> Frame:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, frame: Frame) -> Dict[str, Any]:
+        return msgpack.unpackb(frame, raw=False)
+
+
+def get_frame_encoder(name: Optional[str] = None) -> FrameEncoder:
+    """Get the JSON frame encoder to use for outbound messages
+
+    Uses WIRE_ENCODER (json|orjson) if set, otherwise the fastest available encoder.
+    """
+    name = (name or os.getenv("WIRE_ENCODER", "")).lower()
+
+    if name == "json":
+        return JsonFrameEncoder()
+
+    if orjson is not None:
+        return OrjsonFrameEncoder()
+
+    if name == "orjson":
+        logger.warning("orjson package not installed. Install with: pip install orjson")
+    return JsonFrameEncoder()
+
+
+def get_subprotocol_encoder(subprotocol: str) -> Optional[FrameEncoder]:
+    """Get the encoder for a negotiated WebSocket subprotocol, if supported"""
+    if subprotocol == MSGPACK_SUBPROTOCOL and msgpack is not None:
+        return MsgpackFrameEncoder()
+    return None
+
+
+def negotiate_encoder(offered: Iterable[str], default: FrameEncoder) -> Tuple[FrameEncoder, Optional[str]]:
+    """Pick the encoder for a new connection from the subprotocols the client offered, in its order of preference
+    Returns the encoder and the subprotocol to accept (None - plain JSON text with `default` - if none is supported)"""
+    for subprotocol in offered:
+        encoder = get_subprotocol_encoder(subprotocol)
+        if encoder:
+            return encoder, subprotocol
+    return default, None
@@ -0,0 +1,74 @@
+"""Shared fixtures for the backend tests"""
+
+import asyncio
+import logging
+import random
+import string
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from services.game_service import GameService
+from services.llm_service import LLMService
+from services.room_service import RoomService
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Keep service logging out of test output"""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def game_service() -> GameService:
+    """A game service dealing fallback categories (no LLM)"""
+    return GameService(RoomService(), llm_service=None)
+
+
+
+def make_vocabulary(size: int, seed: int = 7) -> List[str]:
+    """`size` distinct one-word category names that _filter_duplicates never treats as similar"""
+    rng = random.Random(seed)
+    words: Set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(8)).capitalize())
+    return sorted(words)
+
+
+class FakeCompletions:
+    """Stands in for the provider: each call returns `count` random names from a fixed vocabulary"""
+
+    def __init__(self, vocabulary: List[str]):
+        self.vocabulary = vocabulary
+        self.calls: List[int] = []
+        self.failures: List[Exception] = []  # Raised by the next calls, in order
+        self.delay = 0.0  # Seconds each call takes
+
+    async def generate(self, count: int, difficulty: Optional[str] = None, theme: Optional[str] = None,
+                       domains: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        self.calls.append(count)
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        names = random.sample(self.vocabulary, min(count, len(self.vocabulary)))
+        return [{"category": name, "id": name, "source": "openai"} for name in names]
+
+
+@pytest.fixture
+def make_llm_service(monkeypatch):
+    """Build an LLMService whose provider calls go to a FakeCompletions over `vocabulary_size` names"""
+    monkeypatch.setenv("CATEGORY_CORPUS_ENABLED", "false")
+    for name in ("LLM_API_KEY", "OPENAI_API_KEY", "LLM_BASE_URL", "OPENAI_BASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+
+    def build(vocabulary_size: int = 5000) -> Tuple[LLMService, FakeCompletions]:
+        llm_service = LLMService()
+        completions = FakeCompletions(make_vocabulary(vocabulary_size))
+        llm_service.openai_client = completions  # Only checked for presence; calls go through _generate_with_openai
+        llm_service._generate_with_openai = completions.generate
+        llm_service.retry_base_delay = 0.001
+        return llm_service, completions
+
+    return build
@@ -0,0 +1,57 @@
+from services.category_cache import CategoryCache
+
+
+def make_pool(size):
+    return [{"category": f"Category {index}"} for index in range(size)]
+
+
+def names(categories):
+    return {cat["category"] for cat in categories}
+
+
+def test_games_dealt_from_a_large_pool_never_repeat():
+    cache = CategoryCache(max_entries=4, ttl_seconds=60, max_uses=3)
+    pool = make_pool(3 * 104 + 15)
+    cache.put("key", pool, dealt=104)
+    first_game = names(pool[:104])
+
+    second_game = names(cache.sample("key", 104))
+    third_game = names(cache.sample("key", 104))
+    assert len(second_game) == len(third_game) == 104
+    assert not first_game & second_game
+    assert not first_game & third_game
+    assert not second_game & third_game
+
+    # Retired after max_uses games
+    assert cache.sample("key", 104) is None
+
+
+def test_short_pool_repeats_least_served_first():
+    cache = CategoryCache(max_entries=4, ttl_seconds=60, max_uses=5)
+    pool = make_pool(150)
+    cache.put("key", pool, dealt=100)
+
+    second_game = names(cache.sample("key", 100))
+    # All 50 never-served categories, then 50 of the first game's
+    assert names(pool[100:]) <= second_game
+
+
+def test_entries_expire_and_lru_evicts():
+    cache = CategoryCache(max_entries=2, ttl_seconds=0, max_uses=3)
+    cache.put("expired", make_pool(10))
+    assert cache.sample("expired", 5) is None
+    assert cache.expirations == 1
+
+    cache = CategoryCache(max_entries=2, ttl_seconds=60, max_uses=3)
+    cache.put("a", make_pool(10))
+    cache.put("b", make_pool(10))
+    cache.sample("a", 5)
+    cache.put("c", make_pool(10))
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evictions == 1
+
+
+def test_deal_without_entry_returns_none_and_counts_nothing():
+    cache = CategoryCache(max_entries=2, ttl_seconds=60, max_uses=3)
+    assert cache.deal("missing", 5) is None
+    assert cache.hits == cache.misses == 0
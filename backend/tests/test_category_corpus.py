@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.category_corpus import CategoryCorpus
+
+
+def categories(*names):
+    return [{"category": name} for name in names]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = CategoryCorpus(str(tmp_path / "categories.db"))
+    yield corpus
+    corpus.close()
+
+
+def test_ingest_skips_known_categories_and_persists(tmp_path, corpus):
+    assert corpus.ingest(categories("Dog Breed", "Fruit"), "openai") == 2
+    assert corpus.ingest(categories(" dog  breed ", "FRUIT", "Cheese", ""), "openai") == 1
+    assert corpus.size() == 3
+
+    reopened = CategoryCorpus(corpus.path)
+    assert reopened.size() == 3
+    assert {cat["category"] for cat in reopened.sample(10)} == {"Dog Breed", "Fruit", "Cheese"}
+    reopened.close()
+
+
+def test_deal_rotates_through_least_served(corpus):
+    corpus.ingest(categories(*(f"Category {i}" for i in range(10))), "openai")
+    first, second = corpus.deal(4), corpus.deal(4)
+    assert not {cat["key"] for cat in first} & {cat["key"] for cat in second}
+
+    # Only two never-served categories are left; they're dealt before any repeat
+    third = {cat["key"] for cat in corpus.deal(4)}
+    unserved = {f"category {i}" for i in range(10)} - {cat["key"] for cat in first + second}
+    assert unserved <= third
+    assert corpus.get_stats()["served"] == 12
+
+    # sample() only looks
+    before = corpus.sample(10)
+    assert len(before) == 10 and corpus.get_stats()["served"] == 12
+
+
+def test_concurrent_deals_never_hand_out_the_same_category(corpus):
+    corpus.ingest(categories(*(f"Category {i}" for i in range(200))), "openai")
+    dealt = []
+    barrier = threading.Barrier(10)
+
+    def deal():
+        barrier.wait()
+        dealt.append(corpus.deal(20))
+
+    threads = [threading.Thread(target=deal) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    keys = [cat["key"] for deck in dealt for cat in deck]
+    assert len(keys) == 200 and len(set(keys)) == 200
+
+
+def test_deals_from_two_connections_to_one_file_do_not_overlap(tmp_path, corpus):
+    corpus.ingest(categories(*(f"Category {i}" for i in range(40))), "openai")
+    other_worker = CategoryCorpus(corpus.path)
+    keys = [cat["key"] for _ in range(2) for deck in (corpus.deal(10), other_worker.deal(10)) for cat in deck]
+    other_worker.close()
+    assert len(set(keys)) == 40
+
+
+def test_concurrent_games_dealt_from_the_corpus_get_different_categories(make_llm_service, corpus):
+    async def scenario():
+        llm_service, completions = make_llm_service(vocabulary_size=600)
+        corpus.ingest(categories(*completions.vocabulary), "openai")
+        llm_service.corpus = corpus
+        decks = await asyncio.gather(*(asyncio.to_thread(llm_service._deal_from_corpus, 104, 300) for _ in range(5)))
+        names = [cat["category"] for deck in decks for cat in deck]
+        assert len(names) == 5 * 104 and len(set(names)) == 5 * 104
+        assert completions.calls == []
+
+    asyncio.run(scenario())
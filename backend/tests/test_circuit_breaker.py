@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from services import circuit_breaker as circuit_breaker_module
+from services.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module, "time", fake)
+    return fake
+
+
+def test_opens_after_consecutive_failures_and_refuses_calls(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow() and not breaker.allow()
+    assert breaker.get_stats()["rejected"] == 2
+    assert breaker.get_stats()["timesOpened"] == 1
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert not breaker.is_open()
+    assert breaker.allow()  # The probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.is_open() and not breaker.allow()  # Only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()  # A single failed probe reopens it, below the threshold
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.get_stats()["timesOpened"] == 2
+
+    # A probe that never reports back is replaced after another reset_timeout
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class ServiceUnavailable(Exception):
+    status_code = 503
+
+
+def test_open_breaker_skips_the_llm(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        llm_service.circuit_breaker = CircuitBreaker("llm", failure_threshold=1, reset_timeout=60)
+        llm_service.max_retries = 0
+        completions.failures = [ServiceUnavailable("overloaded")] * 10
+        first = await llm_service.generate_categories_for_game(40)
+        assert len(first) == 40  # Fallback categories
+        assert llm_service.circuit_breaker.state == CircuitBreaker.OPEN
+
+        calls = len(completions.calls)
+        second = await llm_service.generate_categories_for_game(40)
+        assert len(second) == 40
+        assert len(completions.calls) == calls
+
+    asyncio.run(scenario())
+
+
+def test_non_retryable_errors_do_not_trip_the_breaker(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        llm_service.circuit_breaker = CircuitBreaker("llm", failure_threshold=1, reset_timeout=60)
+        completions.failures = [BadRequest("bad request")] * 10
+        await llm_service.generate_categories_for_game(40)
+        assert len(completions.calls) > 0
+        assert llm_service.circuit_breaker.state == CircuitBreaker.CLOSED
+        assert llm_service.circuit_breaker.consecutive_failures == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+import asyncio
+from typing import List, Optional
+
+from services.connection_manager import SEND_FAILED_CLOSE_CODE, SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+from services.wire_codec import JsonFrameEncoder
+
+
+class FakeWebSocket:
+    """Records sent frames; `stalled` sockets block on send like a client that stopped reading"""
+
+    def __init__(self, stalled: bool = False, broken: bool = False):
+        self.stalled = stalled
+        self.broken = broken
+        self.sent: List[str] = []
+        self.close_code: Optional[int] = None
+        self._never = asyncio.Event()
+
+    async def send_text(self, frame: str) -> None:
+        if self.broken:
+            raise ConnectionResetError("peer went away")
+        if self.stalled:
+            await self._never.wait()
+        self.sent.append(frame)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_slow_consumer_is_evicted_and_others_keep_receiving():
+    async def scenario():
+        manager = ConnectionManager(max_queue_size=4)
+        fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+        manager.connect("fast", fast, "ROOM", JsonFrameEncoder())
+        manager.connect("slow", slow, "ROOM", JsonFrameEncoder())
+
+        # The slow writer holds one frame on the wire; its queue then fills and the next frame overflows it
+        results = []
+        for i in range(7):
+            results.append([manager.send(connection.socket_id, f"frame-{i}")
+                            for connection in manager.get_room_connections("ROOM")])
+            await settle()
+
+        assert all(sent for sent, _ in results)
+        assert [slow_ok for _, slow_ok in results] == [True] * 5 + [False] * 2
+        assert fast.sent == [f"frame-{i}" for i in range(7)]
+        assert slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+        assert slow.sent == []
+
+        connection = manager.get("slow")
+        assert connection.closed and connection.frames_dropped == 1
+        stats = manager.get_stats()
+        assert stats["totalEvictions"] == 1
+        assert stats["totalFramesDropped"] == 1
+        assert stats["maxQueueDepth"] == 4
+
+        # The endpoint's disconnect path removes it; the room keeps the fast socket
+        manager.disconnect("slow")
+        assert [c.socket_id for c in manager.get_room_connections("ROOM")] == ["fast"]
+        assert manager.send("slow", "late") is False
+
+    asyncio.run(scenario())
+
+
+def test_failed_send_closes_the_socket():
+    async def scenario():
+        manager = ConnectionManager(max_queue_size=4)
+        broken = FakeWebSocket(broken=True)
+        manager.connect("broken", broken, "ROOM", JsonFrameEncoder())
+        assert manager.send("broken", "frame")
+        await settle()
+
+        assert broken.close_code == SEND_FAILED_CLOSE_CODE
+        assert manager.get_stats()["totalSendFailures"] == 1
+        assert manager.send("broken", "frame") is False
+        assert manager.get_stats()["totalEvictions"] == 0
+
+    asyncio.run(scenario())
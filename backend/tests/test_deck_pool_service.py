@@ -0,0 +1,81 @@
+import asyncio
+
+from services.deck_pool_service import DeckPoolService, FallbackDeckError
+from services.game_service import GameService
+from services.llm_service import LLMService
+from services.room_service import RoomService
+
+
+async def wait_for_refills(pool):
+    while pool.refill_tasks:
+        await asyncio.gather(*pool.refill_tasks.values(), return_exceptions=True)
+
+
+def test_failed_refill_backs_off_instead_of_retrying_every_take():
+    calls = []
+
+    async def failing_factory(num_decks):
+        calls.append(num_decks)
+        raise FallbackDeckError("only fallback categories")
+
+    async def scenario():
+        pool = DeckPoolService(failing_factory, target_size=2, deck_counts=(1,), retry_base_delay=60)
+        pool.ensure_filled()
+        await wait_for_refills(pool)
+        for _ in range(7):
+            assert pool.take(1) is None
+            await wait_for_refills(pool)
+
+        assert calls == [1]
+        assert pool.refill_failures == 1
+        assert pool.get_stats()["retryInSeconds"]["1"] > 0
+
+    asyncio.run(scenario())
+
+
+def test_refill_retries_after_backoff_and_resets_on_success():
+    results = [FallbackDeckError("down"), FallbackDeckError("down"), ["deck"], ["deck"]]
+
+    async def flaky_factory(num_decks):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def scenario():
+        pool = DeckPoolService(flaky_factory, target_size=2, deck_counts=(1,), retry_base_delay=0.01, retry_max_delay=0.02)
+        pool.ensure_filled()
+        await wait_for_refills(pool)
+        assert pool.failure_streaks[1] == 1
+
+        # Second failure doubles the delay
+        await asyncio.sleep(0.015)
+        pool.ensure_filled()
+        await wait_for_refills(pool)
+        assert pool.failure_streaks[1] == 2
+
+        await asyncio.sleep(0.03)
+        pool.ensure_filled()
+        await wait_for_refills(pool)
+        assert pool.available(1) == 2
+        assert pool.failure_streaks == {} and pool.retry_at == {}
+
+    asyncio.run(scenario())
+
+
+def test_keyless_llm_service_still_pools_fallback_decks(monkeypatch):
+    for name in ("LLM_API_KEY", "OPENAI_API_KEY", "LLM_BASE_URL", "OPENAI_BASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("CATEGORY_CORPUS_ENABLED", "false")
+
+    async def scenario():
+        llm_service = LLMService()
+        assert llm_service.openai_client is None
+        game_service = GameService(RoomService(), llm_service=llm_service)
+        game_service.deck_pool.ensure_filled()
+        await wait_for_refills(game_service.deck_pool)
+
+        assert game_service.deck_pool.refill_failures == 0
+        assert game_service.deck_pool.available(1) == game_service.deck_pool.target_size
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+from services.event_log_service import EventLogService
+
+
+def broadcast(log, room_code, count):
+    for _ in range(count):
+        log.append(room_code, [{"type": "cardFlipped"}, {"type": "gameStateUpdated"}])
+
+
+def seqs(messages):
+    return [message["seq"] for message in messages]
+
+
+def test_resume_from_current_seq_misses_nothing():
+    log = EventLogService(max_entries=4)
+    broadcast(log, "ROOM", 3)
+    assert log.messages_since("ROOM", 3) == []
+    assert log.messages_since("NEW", 0) == []  # Nothing broadcast yet
+    assert log.resumes == 2 and log.snapshot_fallbacks == 0
+
+
+def test_resume_inside_the_window_gets_every_missed_message_in_order():
+    log = EventLogService(max_entries=4)
+    broadcast(log, "ROOM", 6)  # Seqs 3-6 retained
+    assert seqs(log.messages_since("ROOM", 4)) == [5, 5, 6, 6]
+    # The oldest resumable seq is the one just before the window
+    assert seqs(log.messages_since("ROOM", 2)) == [3, 3, 4, 4, 5, 5, 6, 6]
+    assert log.resumes == 2
+
+
+def test_seq_older_than_the_window_forces_a_snapshot():
+    log = EventLogService(max_entries=4)
+    broadcast(log, "ROOM", 6)
+    assert log.messages_since("ROOM", 1) is None
+    assert log.messages_since("ROOM", 0) is None
+    assert log.snapshot_fallbacks == 2 and log.resumes == 0
+
+
+def test_seq_ahead_of_the_log_forces_a_snapshot():
+    log = EventLogService(max_entries=4)
+    broadcast(log, "ROOM", 2)
+    assert log.messages_since("ROOM", 3) is None
+    # A log that was dropped (room removed, server restarted) doesn't know the client's seq either
+    log.remove_room("ROOM")
+    assert log.messages_since("ROOM", 2) is None
+    assert log.snapshot_fallbacks == 2
@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+from models.game_history import GameHistory, _io_tasks
+from models.game_models import GameEvent
+
+
+def make_event(index):
+    return GameEvent(event_type="card_flipped", player_id="p1", data={"index": index})
+
+
+async def drain_io():
+    """Wait for spill writes (and the spills they chain) on worker threads to land"""
+    while _io_tasks:
+        await asyncio.wait(list(_io_tasks))
+        await asyncio.sleep(0)
+
+
+def test_page_reads_across_spilled_and_in_memory_events(tmp_path):
+    async def scenario():
+        history = GameHistory(buffer_size=10, spill_batch=5, spill_dir=str(tmp_path))
+        for index in range(40):
+            history.append(make_event(index))
+            if index % 10 == 9:
+                await drain_io()
+        await drain_io()
+
+        assert len(history) == 40
+        assert history.spilled_count >= 25
+
+        # Walk the whole history a page at a time
+        indices = []
+        cursor = 0
+        while cursor is not None:
+            events, cursor = await history.page(cursor, 7)
+            indices.extend(event["data"]["index"] for event in events)
+        assert indices == list(range(40))
+
+        # A page starting mid-batch
+        events, next_cursor = await history.page(12, 3)
+        assert [event["data"]["index"] for event in events] == [12, 13, 14]
+        assert next_cursor == 15
+
+        history.close()
+        await drain_io()
+        assert os.listdir(tmp_path) == []
+
+    asyncio.run(scenario())
+
+
+def test_page_after_spill_file_is_gone_returns_memory_events(tmp_path):
+    async def scenario():
+        history = GameHistory(buffer_size=4, spill_batch=4, spill_dir=str(tmp_path))
+        for index in range(12):
+            history.append(make_event(index))
+            await drain_io()
+        assert history.spilled_count > 0
+
+        for name in os.listdir(tmp_path):
+            os.remove(tmp_path / name)
+        events, _ = await history.page(0, 12)
+        assert [event["data"]["index"] for event in events] == list(range(history.spilled_count, 12))
+
+    asyncio.run(scenario())
+
+
+def test_without_event_loop_spills_inline(tmp_path):
+    history = GameHistory(buffer_size=3, spill_batch=2, spill_dir=str(tmp_path))
+    for index in range(9):
+        history.append(make_event(index))
+    assert history.spilled_count == 6
+    assert [event.data["index"] for event in history] == [6, 7, 8]
+    history.close()
+    assert os.listdir(tmp_path) == []
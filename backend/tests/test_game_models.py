@@ -0,0 +1,59 @@
+import asyncio
+import random
+
+from models.game_models import GameStatus
+
+
+def linear_scan_matches(game, current_player_id):
+    """The scan the shape index replaced: every other player's top card against the flipper's"""
+    current_player = game.get_player(current_player_id)
+    current_top_card = current_player.get_top_card() if current_player else None
+    if not current_top_card:
+        return []
+
+    matches = []
+    for other_player in game.players:
+        other_top_card = other_player.get_top_card()
+        if other_player.id == current_player_id or not other_top_card:
+            continue
+        if other_top_card.shape == current_top_card.shape:
+            matches.append((other_player.id, current_top_card.shape))
+        elif game.current_wild_card and game.current_wild_card.is_wild:
+            wild_shapes = game.current_wild_card.wild_shapes or []
+            if current_top_card.shape in wild_shapes and other_top_card.shape in wild_shapes:
+                matches.append((other_player.id, game.current_wild_card.shape))
+    return matches
+
+
+def test_shape_index_matches_the_linear_scan_over_a_played_game(game_service):
+    async def scenario():
+        rng = random.Random(11)
+        room_code = game_service.room_service.create_room("Host")["room"]["roomCode"]
+        for index in range(5):
+            game_service.room_service.join_room(room_code, f"socket-{index}", f"Player {index}")
+        assert (await game_service.start_game(room_code))["success"]
+        game = game_service.active_games[room_code]
+        first_deck = len(game.deck)
+
+        faceoffs = wild_matches = 0
+        for _ in range(6 * first_deck):
+            for player in game.players:
+                expected = linear_scan_matches(game, player.id)
+                actual = [(faceoff.player2_id, faceoff.shape) for faceoff in game.find_matching_players(player.id)]
+                assert actual == expected
+                wild_matches += any(shape != player.get_top_card().shape for _, shape in expected)
+
+            if game.status == GameStatus.FACEOFF:
+                faceoff = game.current_faceoff
+                loser_id = rng.choice([faceoff.player1_id, faceoff.player2_id])
+                assert (await game_service.resolve_faceoff(room_code, loser_id))["success"]
+                faceoffs += 1
+            else:
+                assert (await game_service.flip_card(room_code, game.current_player_id))["success"]
+        return faceoffs, wild_matches
+
+    faceoffs, wild_matches = asyncio.run(scenario())
+    # The game went through reshuffles, faceoffs and wild card matches
+    assert sum(game_service.prefetch_stats[outcome] for outcome in ("hits", "late", "misses")) >= 2
+    assert faceoffs > 50
+    assert wild_matches > 0
@@ -0,0 +1,132 @@
+import asyncio
+
+from models.game_models import Game
+
+
+def test_reshuffle_generates_inline_when_prefetch_was_cancelled(game_service):
+    async def scenario():
+        game = Game(room_code="ROOM01")
+        never_finishes = asyncio.Event()
+        prefetch = asyncio.create_task(never_finishes.wait())
+        game_service.deck_prefetch_tasks["ROOM01"] = prefetch
+        await asyncio.sleep(0)
+        prefetch.cancel()
+
+        deck = await game_service._take_next_deck("ROOM01", game)
+        assert len(deck) > 0
+        assert game_service.prefetch_stats["late"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_reshuffle_uses_prefetch_cancelled_while_waiting(game_service):
+    async def scenario():
+        game = Game(room_code="ROOM01")
+        prefetch = asyncio.create_task(asyncio.sleep(10))
+        game_service.deck_prefetch_tasks["ROOM01"] = prefetch
+        asyncio.get_running_loop().call_later(0.01, prefetch.cancel)
+
+        deck = await game_service._take_next_deck("ROOM01", game)
+        assert len(deck) > 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_reshuffle_still_propagates(game_service):
+    async def scenario():
+        game = Game(room_code="ROOM01")
+        prefetch = asyncio.create_task(asyncio.sleep(10))
+        game_service.deck_prefetch_tasks["ROOM01"] = prefetch
+
+        reshuffle = asyncio.create_task(game_service._take_next_deck("ROOM01", game))
+        await asyncio.sleep(0.01)
+        reshuffle.cancel()
+        try:
+            await reshuffle
+        except asyncio.CancelledError:
+            pass
+        assert reshuffle.cancelled()
+        # The prefetch itself keeps running for the next reshuffle
+        assert not prefetch.done()
+        prefetch.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_prepare_deck_skips_rooms_a_pooled_deck_will_serve(game_service):
+    async def scenario():
+        game_service.deck_pool.pools[1].append(["pooled deck"])
+        game_service.room_service.active_rooms["ROOM01"] = {"status": "waiting", "players": []}
+
+        game_service.prepare_deck("ROOM01", 3)
+        assert "ROOM01" not in game_service.speculative_decks
+        assert game_service.speculative_stats["skipped"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_prepare_deck_caps_concurrent_generations(game_service):
+    async def scenario():
+        game_service.deck_pool.target_size = 0
+        game_service.max_speculative_decks = 2
+        for index in range(4):
+            room_code = f"ROOM0{index}"
+            game_service.room_service.active_rooms[room_code] = {"status": "waiting", "players": []}
+            game_service.prepare_deck(room_code, 3)
+
+        assert sorted(game_service.speculative_decks) == ["ROOM00", "ROOM01"]
+        assert game_service.speculative_stats["started"] == 2
+        assert game_service.speculative_stats["skipped"] == 2
+
+        # Once those finish, new rooms get one again
+        await asyncio.gather(*(task for _, task in game_service.speculative_decks.values()))
+        game_service.prepare_deck("ROOM02", 3)
+        assert "ROOM02" in game_service.speculative_decks
+
+    asyncio.run(scenario())
+
+
+def test_faceoff_and_answer_commands_wait_for_the_room_lock(game_service):
+    async def scenario():
+        room_code = game_service.room_service.create_room("Host")["room"]["roomCode"]
+        game_service.room_service.join_room(room_code, "socket-1", "Player 1")
+        await game_service.start_game(room_code)
+        player_id = game_service.active_games[room_code].players[0].id
+
+        # A command holding the lock across an await (e.g. a flip waiting for a reshuffle deck)
+        async with game_service._room_lock(room_code):
+            resolve = asyncio.create_task(game_service.resolve_faceoff(room_code, player_id))
+            answer = asyncio.create_task(game_service.submit_answer(room_code, player_id, "Apple", "Fruit"))
+            await asyncio.sleep(0.01)
+            assert not resolve.done() and not answer.done()
+
+        assert (await answer)["success"]
+        assert not (await resolve)["success"]  # No faceoff in progress
+
+    asyncio.run(scenario())
+
+
+def test_replaced_prefetch_does_not_unregister_its_successor(game_service):
+    async def scenario():
+        async def slow_deck(player_count):
+            await asyncio.sleep(0.01)
+            return ["deck"]
+
+        game_service._generate_initial_deck = slow_deck
+        old_game, new_game = Game(room_code="ROOM01"), Game(room_code="ROOM01")
+        game_service.deck_prefetch_tasks["ROOM01"] = old = asyncio.create_task(game_service._prefetch_deck("ROOM01", old_game))
+        await asyncio.sleep(0)
+
+        # The room is released and its next game starts prefetching before the old task has unwound
+        game_service.remove_room("ROOM01")
+        game_service.deck_prefetch_tasks["ROOM01"] = new = asyncio.create_task(game_service._prefetch_deck("ROOM01", new_game))
+        await asyncio.sleep(0)
+        assert old.done()
+        assert game_service.deck_prefetch_tasks.get("ROOM01") is new
+
+        # A reshuffle finds the running prefetch instead of generating a second deck
+        assert await game_service._take_next_deck("ROOM01", new_game) == ["deck"]
+        assert game_service.prefetch_stats["late"] == 1 and game_service.prefetch_stats["misses"] == 0
+        assert "ROOM01" not in game_service.deck_prefetch_tasks
+
+    asyncio.run(scenario())
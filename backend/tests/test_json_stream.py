@@ -0,0 +1,52 @@
+import json
+
+from services.json_stream import JsonArrayStream
+
+ITEMS = [
+    {"category": "Things in a kitchen", "id": "kitchen"},
+    {"category": "Words with \"quotes\", commas and ] brackets", "id": "tricky"},
+    {"category": "Back\\slashes \\\" and {braces}", "tags": ["a", "b"]},
+    "plain string",
+    42,
+]
+TEXT = "Here are your categories:\n```json\n" + json.dumps(ITEMS, indent=2) + "\n```"
+
+
+def test_any_chunking_yields_the_same_items():
+    for size in (1, 2, 3, 7, 64, len(TEXT)):
+        stream = JsonArrayStream()
+        items = []
+        for start in range(0, len(TEXT), size):
+            items.extend(stream.feed(TEXT[start:start + size]))
+        items.extend(stream.close())
+        assert items == ITEMS
+        assert stream.finished
+        assert stream.malformed == 0
+
+
+def test_items_are_returned_as_soon_as_they_complete():
+    stream = JsonArrayStream()
+    assert stream.feed('[{"category": "A"}, {"category": "B"') == [{"category": "A"}]
+    assert stream.feed("}, ") == [{"category": "B"}]
+    assert stream.feed('{"category": "C"}]') == [{"category": "C"}]
+    assert stream.feed(', {"category": "D"}]') == []
+
+
+def test_truncated_response_keeps_every_complete_item():
+    cut = TEXT.index('"plain string"') + len('"plain string"')
+    stream = JsonArrayStream()
+    items = stream.feed(TEXT[:cut]) + stream.close()
+    assert items == ITEMS[:4]
+    assert not stream.finished
+
+    # Cut inside a string: the partial item is dropped, not guessed at
+    stream = JsonArrayStream()
+    items = stream.feed('[{"category": "A"}, {"category": "Unfinish') + stream.close()
+    assert items == [{"category": "A"}]
+
+
+def test_malformed_items_are_dropped_and_counted():
+    stream = JsonArrayStream()
+    items = stream.feed('[{"category": "A"}, {category: B}, {"category": "C"},]') + stream.close()
+    assert items == [{"category": "A"}, {"category": "C"}]
+    assert stream.malformed == 1
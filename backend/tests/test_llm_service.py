@@ -0,0 +1,104 @@
+import asyncio
+
+
+def names(categories):
+    return {cat["category"] for cat in categories}
+
+
+def test_cache_hits_after_a_miss_get_categories_no_game_had(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        llm_service.cache_pool_decks = 3
+        games = [names(await llm_service.generate_categories_for_game(104, spare_decks=True)) for _ in range(3)]
+
+        assert len(completions.calls) > 0
+        calls = len(completions.calls)
+        assert llm_service.category_cache.hits == 2
+        assert all(len(game) == 104 for game in games)
+        assert not games[0] & games[1] and not games[0] & games[2] and not games[1] & games[2]
+
+        # The entry is retired after max_uses games; the next game generates again
+        await llm_service.generate_categories_for_game(104)
+        assert len(completions.calls) > calls
+
+    asyncio.run(scenario())
+
+
+def test_callers_with_their_own_supply_generate_one_deck(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        llm_service.cache_pool_decks = 3
+        await llm_service.generate_categories_for_game(104)
+        assert 104 + llm_service._buffer_size(104) <= sum(completions.calls) < 2 * 104
+
+        # The default pool is one deck even for callers that would take spares
+        llm_service, completions = make_llm_service()
+        await llm_service.generate_categories_for_game(104, spare_decks=True)
+        assert sum(completions.calls) < 2 * 104
+
+    asyncio.run(scenario())
+
+
+class BadRequest(Exception):
+    status_code = 400  # Not retryable
+
+
+def test_short_pool_from_failed_shards_is_not_cached(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        completions.failures = [BadRequest("bad request")]  # One of the two shards fails
+        short = await llm_service.generate_categories_for_game(104)
+        assert len(completions.calls) > 1
+        assert 0 < len(short) < 104
+        assert (104, None, None) not in llm_service.category_cache.entries
+
+        # The next game generates again and gets a full deck
+        full = await llm_service.generate_categories_for_game(104)
+        assert len(full) == 104
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_follower_leaves_the_shared_generation_running(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        llm_service.cache_pool_decks = 3  # Enough for the follower to get categories the leader didn't
+        completions.delay = 0.05
+        leader = asyncio.create_task(llm_service.generate_categories_for_game(60, spare_decks=True))
+        await asyncio.sleep(0.02)  # The leader is generating
+
+        cancelled_follower = asyncio.create_task(llm_service.generate_categories_for_game(60))
+        follower = asyncio.create_task(llm_service.generate_categories_for_game(60))
+        await asyncio.sleep(0)
+        cancelled_follower.cancel()
+
+        leader_share = await leader
+        follower_share = await follower
+        assert cancelled_follower.cancelled()
+        assert llm_service.coalesced_requests == 2
+        assert len(leader_share) == len(follower_share) == 60
+        assert not names(leader_share) & names(follower_share)
+        assert llm_service.inflight_generations == {}
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_still_serves_its_followers(make_llm_service):
+    async def scenario():
+        llm_service, completions = make_llm_service()
+        completions.delay = 0.05
+        leader = asyncio.create_task(llm_service.generate_categories_for_game(60))
+        await asyncio.sleep(0.02)
+        follower = asyncio.create_task(llm_service.generate_categories_for_game(60))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        follower_share = await follower
+        assert leader.cancelled()
+        assert len(follower_share) == 60
+        assert llm_service.coalesced_requests == 1
+        # The generation finished and was cached even though the game that started it went away
+        assert llm_service.category_cache.sample((60, None, None), 60) is not None
+        assert llm_service.inflight_generations == {}
+
+    asyncio.run(scenario())
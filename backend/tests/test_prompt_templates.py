@@ -0,0 +1,54 @@
+import pytest
+
+from services.prompt_templates import COMPACT_V1, FULL_V1, PROMPT_TEMPLATES, clean_category_name, count_message_tokens
+
+
+@pytest.mark.parametrize("name, cleaned", [
+    ("Type of Cheese", "Cheese"),
+    ("kind of bird", "Bird"),
+    ("A Sort of Pasta Shape", "Pasta Shape"),
+    ("Types of Tree", "Tree"),
+    ("Brand of Chocolate", "Chocolate Brand"),
+    ("  Dog   Breed. ", "Dog Breed"),
+    ("Pizza Topping,;", "Pizza Topping"),
+    ("Capital City", "Capital City"),
+])
+def test_clean_category_name_applies_the_naming_rules(name, cleaned):
+    assert clean_category_name(name) == cleaned
+
+
+@pytest.mark.parametrize("name", ["Things", "stuff", "Food.", "Brand", "Board Game Accessory", "Type of Genre", "", " . "])
+def test_clean_category_name_rejects_forbidden_and_empty_names(name):
+    assert clean_category_name(name) is None
+
+
+def test_clean_category_name_keeps_names_that_only_contain_a_forbidden_word():
+    assert clean_category_name("Board Game") == "Board Game"
+    assert clean_category_name("Music Genre") == "Music Genre"
+
+
+@pytest.mark.parametrize("template", [FULL_V1, COMPACT_V1], ids=lambda template: template.id)
+def test_render_asks_for_the_requested_count(template):
+    system, user = template.render(37)
+    assert system == {"role": "system", "content": template.system}
+    assert user["role"] == "user"
+    assert "37" in user["content"] and "{count}" not in user["content"]
+    assert "{focus}" not in user["content"]
+
+
+@pytest.mark.parametrize("template", [FULL_V1, COMPACT_V1], ids=lambda template: template.id)
+def test_render_adds_one_focus_line_per_constraint(template):
+    plain = template.render(60)[1]["content"]
+    assert "Pitch the categories" not in plain and "theme:" not in plain and "these domains" not in plain
+
+    focused = template.render(60, difficulty="hard", theme="Space", domains=["science", "geography"])[1]["content"]
+    assert f"{template.focus_prefix}Pitch the categories at hard difficulty" in focused
+    assert f"{template.focus_prefix}Draw the categories from the theme: Space" in focused
+    assert f"{template.focus_prefix}Only use categories from these domains: science, geography" in focused
+    assert len(focused) > len(plain)
+
+
+def test_templates_are_registered_by_id_and_compact_is_cheaper():
+    assert PROMPT_TEMPLATES == {"full-v1": FULL_V1, "compact-v1": COMPACT_V1}
+    assert COMPACT_V1.token_count() < FULL_V1.token_count()
+    assert count_message_tokens(FULL_V1.render(60)) == FULL_V1.token_count()
@@ -0,0 +1,102 @@
+import asyncio
+import copy
+
+from models.game_models import GameStatus
+from services.state_sync_service import StateSyncService
+
+# Keys in `changes` that aren't plain public view fields
+STRUCTURAL_CHANGES = ("players", "removedPlayers", "playerOrder", "historyAppend")
+
+
+def apply_delta(state, delta, history_limit):
+    """Apply a stateDelta the way a delta client does (frontend/src/context/GameContext.js)"""
+    changes = delta["changes"]
+    state = copy.deepcopy(state)
+    players = {player["id"]: player for player in state["players"]}
+    for player_id, fields in changes.get("players", {}).items():
+        players.setdefault(player_id, {}).update(fields)
+    for player_id in changes.get("removedPlayers", []):
+        players.pop(player_id, None)
+    order = changes.get("playerOrder", [player["id"] for player in state["players"]])
+
+    for key, value in changes.items():
+        if key not in STRUCTURAL_CHANGES:
+            state[key] = value
+    state["players"] = [players[player_id] for player_id in order]
+    if "historyAppend" in changes:
+        state["gameHistory"] = (state["gameHistory"] + changes["historyAppend"])[-history_limit:]
+    return state
+
+
+async def start_room(game_service, player_count):
+    """Create a room with `player_count` players, start its game and return the room code"""
+    room_service = game_service.room_service
+    room_code = room_service.create_room("Player 1")["room"]["roomCode"]
+    for i in range(2, player_count + 1):
+        room_service.join_room(room_code, f"socket-{i}", f"Player {i}")
+    await game_service.start_game(room_code)
+    return room_code
+
+
+async def play_turn(game_service, room_code):
+    """Flip for the current player, or resolve the faceoff in progress"""
+    game = game_service.active_games[room_code]
+    if game.status == GameStatus.FACEOFF and game.current_faceoff:
+        await game_service.resolve_faceoff(room_code, game.current_faceoff.player2_id)
+    else:
+        await game_service.flip_card(room_code, game.current_player_id)
+
+
+def test_deltas_applied_to_snapshot_match_public_view(game_service):
+    async def scenario():
+        room_code = await start_room(game_service, 4)
+        game = game_service.active_games[room_code]
+        sync = StateSyncService(game_service.projector)
+
+        snapshot = sync.reset_room(room_code, game)
+        client_state = snapshot["gameState"]
+        version = snapshot["version"]
+        for _ in range(60):
+            await play_turn(game_service, room_code)
+            delta = sync.build_delta(room_code, game)
+            assert delta["baseVersion"] == version
+            version = delta["version"]
+            client_state = apply_delta(client_state, delta, snapshot["historyLimit"])
+            assert client_state == game_service.projector.public_view(game)
+
+    asyncio.run(scenario())
+
+
+def test_unchanged_game_gives_empty_delta_without_version_bump(game_service):
+    async def scenario():
+        room_code = await start_room(game_service, 3)
+        game = game_service.active_games[room_code]
+        sync = StateSyncService(game_service.projector)
+        sync.reset_room(room_code, game)
+
+        delta = sync.build_delta(room_code, game)
+        assert delta == {"version": 1, "baseVersion": 1, "changes": {}}
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_mid_game_then_deltas_match_public_view(game_service):
+    async def scenario():
+        room_code = await start_room(game_service, 5)
+        game = game_service.active_games[room_code]
+        sync = StateSyncService(game_service.projector)
+        sync.reset_room(room_code, game)
+        for _ in range(15):
+            await play_turn(game_service, room_code)
+            sync.build_delta(room_code, game)
+
+        # A client joining now starts from a snapshot
+        snapshot = sync.snapshot(room_code, game, player_id=game.players[0].id)
+        assert snapshot["self"]["playerId"] == game.players[0].id
+        client_state = snapshot["gameState"]
+        for _ in range(15):
+            await play_turn(game_service, room_code)
+            client_state = apply_delta(client_state, sync.build_delta(room_code, game), snapshot["historyLimit"])
+        assert client_state == game_service.projector.public_view(game)
+
+    asyncio.run(scenario())
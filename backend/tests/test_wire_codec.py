@@ -0,0 +1,62 @@
+import pytest
+
+from services import wire_codec
+from services.wire_codec import (MSGPACK_SUBPROTOCOL, FrameEncoder, JsonFrameEncoder, MsgpackFrameEncoder,
+                                 get_frame_encoder, negotiate_encoder)
+
+
+def test_incomplete_encoder_fails_when_created():
+    class EncodeOnly(FrameEncoder):
+        name = "encode-only"
+
+        def encode(self, message):
+            return "{}"
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+    with pytest.raises(TypeError):
+        FrameEncoder()
+    assert JsonFrameEncoder().decode(JsonFrameEncoder().encode({"type": "ping"})) == {"type": "ping"}
+
+
+MESSAGE = {
+    "type": "stateDelta",
+    "seq": 42,
+    "data": {"version": 7, "changes": {"players": [{"id": "p1", "name": "Zoë", "score": 3, "faceoff": None}]},
+             "ratio": 0.5, "flags": [True, False]},
+}
+
+
+def test_msgpack_round_trip():
+    encoder = MsgpackFrameEncoder()
+    frame = encoder.encode(MESSAGE)
+    assert isinstance(frame, bytes) and encoder.binary
+    assert encoder.decode(frame) == MESSAGE
+    assert len(frame) < len(JsonFrameEncoder().encode(MESSAGE))
+
+
+def test_text_encoders_round_trip():
+    for encoder in (JsonFrameEncoder(), get_frame_encoder("orjson"), get_frame_encoder()):
+        frame = encoder.encode(MESSAGE)
+        assert isinstance(frame, str) and not encoder.binary
+        assert JsonFrameEncoder().decode(frame) == encoder.decode(frame) == MESSAGE
+    assert get_frame_encoder("json").name == "json"
+
+
+def test_client_offering_msgpack_gets_binary_frames():
+    default = JsonFrameEncoder()
+    encoder, subprotocol = negotiate_encoder(["something.else", MSGPACK_SUBPROTOCOL], default)
+    assert subprotocol == MSGPACK_SUBPROTOCOL
+    assert isinstance(encoder, MsgpackFrameEncoder)
+
+
+def test_client_not_offering_msgpack_falls_back_to_json():
+    default = JsonFrameEncoder()
+    assert negotiate_encoder([], default) == (default, None)
+    assert negotiate_encoder(["anomia.msgpack.v2", "json"], default) == (default, None)
+
+
+def test_msgpack_not_installed_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(wire_codec, "msgpack", None)
+    default = JsonFrameEncoder()
+    assert negotiate_encoder([MSGPACK_SUBPROTOCOL], default) == (default, None)
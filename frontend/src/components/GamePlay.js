@@ -219,13 +219,13 @@ const GamePlay = () => {
     const player = gameState.players.find(p => p.id === currentPlayer.id);
     console.log('🔍 Found player:', player);
     
-    if (!player || !player.deck || player.deck.length === 0) {
+    if (!player || !player.topCard) {
       console.log('❌ Player not found or no cards in deck, returning null');
       return null;
     }
     
-    // Return the top card (last card in deck)
-    const topCard = player.deck[player.deck.length - 1];
+    // The server only sends each player's top card (not the whole stack)
+    const topCard = player.topCard;
     console.log('✅ Found top card:', topCard);
     return topCard;
   };
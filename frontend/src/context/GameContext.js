@@ -4,7 +4,7 @@ import { useNavigate, useLocation } from 'react-router-dom';
 // LocalStorage helpers
 const STORAGE_KEY = 'anomia_game_state';
 
-const saveGameStateToStorage = (state) => {
+const saveGameStateToStorage = (state, sync = {}) => {
   try {
     const stateToSave = {
       roomCode: state.currentRoom?.roomCode,
@@ -14,6 +14,10 @@ const saveGameStateToStorage = (state) => {
       gameState: state.gameState,
       gameStatus: state.gameStatus,
       players: state.players,
+      // Lets a reload resume from the room's event log instead of a full snapshot
+      lastSeq: sync.lastSeq,
+      stateVersion: sync.version,
+      historyLimit: sync.historyLimit,
       timestamp: Date.now()
     };
     
@@ -112,6 +116,39 @@ const clearGameStateFromStorage = (setExitFlag = false, keepSessionToken = false
   }
 };
 
+// Wire protocols this client understands (see API.md "Delta State Sync" and "Batched Events")
+const CLIENT_CAPABILITIES = ['delta', 'batch'];
+
+// Messages that carry a game state: the full gameState, or a stateDelta/stateSnapshot for delta clients
+const GAME_STATE_EVENTS = new Set([
+  'gameStarted', 'cardFlipped', 'wild_card_drawn', 'answerSubmitted', 'gameEnded', 'faceoffDetected', 'faceoffResolved'
+]);
+
+// Keys in a delta's changes that aren't plain gameState fields
+const STRUCTURAL_CHANGES = new Set(['players', 'removedPlayers', 'playerOrder', 'historyAppend']);
+
+// Apply a stateDelta's changes to the last known gameState (values are absolute)
+const applyStateDelta = (gameState, changes, historyLimit) => {
+  const players = new Map(gameState.players.map(player => [player.id, player]));
+  Object.entries(changes.players || {}).forEach(([playerId, fields]) => {
+    players.set(playerId, { ...(players.get(playerId) || {}), ...fields });
+  });
+  (changes.removedPlayers || []).forEach(playerId => players.delete(playerId));
+  const order = changes.playerOrder || gameState.players.map(player => player.id);
+
+  const nextState = { ...gameState };
+  Object.entries(changes).forEach(([key, value]) => {
+    if (!STRUCTURAL_CHANGES.has(key)) {
+      nextState[key] = value;
+    }
+  });
+  nextState.players = order.filter(playerId => players.has(playerId)).map(playerId => players.get(playerId));
+  if (changes.historyAppend) {
+    nextState.gameHistory = [...(gameState.gameHistory || []), ...changes.historyAppend].slice(-historyLimit);
+  }
+  return nextState;
+};
+
 // Game state reducer
 const gameReducer = (state, action) => {
   switch (action.type) {
@@ -290,6 +327,9 @@ export const GameProvider = ({ children }) => {
   const isExitingRef = useRef(false);
   const currentPlayerRef = useRef(null);
   const currentRoomRef = useRef(null);
+  const gameStateRef = useRef(null);  // Latest game state, ahead of the reducer while a frame is handled
+  const syncRef = useRef({ version: null, historyLimit: 10 });  // Delta sync version
+  const lastSeqRef = useRef(0);  // Highest room seq seen, sent as lastSeq to resume after a reconnect
   const navigate = useNavigate();
   const location = useLocation();
 
@@ -340,6 +380,14 @@ export const GameProvider = ({ children }) => {
           }
         });
         
+        // Pick the delta sync back up where the saved state left off
+        gameStateRef.current = savedState.gameState || null;
+        syncRef.current = {
+          version: savedState.gameState ? (savedState.stateVersion ?? null) : null,
+          historyLimit: savedState.historyLimit || syncRef.current.historyLimit
+        };
+        lastSeqRef.current = savedState.lastSeq || 0;
+        
         // Don't navigate - we're already on the correct route
       } else {
         console.log('📍 No matching saved state for URL roomCode:', urlRoomCode);
@@ -369,7 +417,7 @@ export const GameProvider = ({ children }) => {
     
     // Only save if we have a room and player
     if (state.currentRoom?.roomCode && state.currentPlayer?.id) {
-      saveGameStateToStorage(state);
+      saveGameStateToStorage(state, { ...syncRef.current, lastSeq: lastSeqRef.current });
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [state.currentRoom?.roomCode, state.currentPlayer?.id, state.gameState, state.gameStatus, state.players]);
@@ -413,12 +461,18 @@ export const GameProvider = ({ children }) => {
         const currentRoom = currentRoomRef.current;
         if (currentPlayer?.name && currentRoom?.roomCode) {
           console.log('🔄 Reconnecting to room after restore using session token...');
-          socket.send(JSON.stringify({
+          const joinMessage = {
             type: 'joinRoom',
             playerName: currentPlayer.name,
             roomCode: currentRoom.roomCode,
-            sessionToken: currentPlayer.sessionToken  // Industry-standard session token for secure reconnection
-          }));
+            sessionToken: currentPlayer.sessionToken,  // Industry-standard session token for secure reconnection
+            capabilities: CLIENT_CAPABILITIES
+          };
+          // With a versioned state to build on, only ask for what was missed
+          if (gameStateRef.current && syncRef.current.version !== null && lastSeqRef.current > 0) {
+            joinMessage.lastSeq = lastSeqRef.current;
+          }
+          socket.send(JSON.stringify(joinMessage));
         }
       };
 
@@ -434,116 +488,191 @@ export const GameProvider = ({ children }) => {
         dispatch({ type: 'SET_ERROR', payload: 'Connection error' });
       };
 
+      // Start over from a full snapshot (game start, join into a running game, requestSync)
+      const applySnapshot = (snapshot) => {
+        syncRef.current = { version: snapshot.version, historyLimit: snapshot.historyLimit || syncRef.current.historyLimit };
+        gameStateRef.current = snapshot.gameState;
+        return snapshot.gameState;
+      };
+      
+      // The game state a message leaves us in: its gameState, or our state with its delta applied
+      const resolveGameState = (data) => {
+        if (data.gameState) {
+          gameStateRef.current = data.gameState;
+          return data.gameState;
+        }
+        if (data.stateSnapshot) {
+          return applySnapshot(data.stateSnapshot);
+        }
+        const delta = data.stateDelta;
+        const sync = syncRef.current;
+        if (!delta || (sync.version !== null && delta.version <= sync.version)) {
+          // Nothing new (or already applied on top of a snapshot)
+          return gameStateRef.current;
+        }
+        if (!gameStateRef.current || delta.baseVersion !== sync.version) {
+          console.log('🔁 State version gap, requesting sync:', sync.version, '->', delta.baseVersion);
+          socket.send(JSON.stringify({ type: 'requestSync' }));
+          return gameStateRef.current;
+        }
+        gameStateRef.current = applyStateDelta(gameStateRef.current, delta.changes, sync.historyLimit);
+        sync.version = delta.version;
+        return gameStateRef.current;
+      };
+      
+      // Handle one server message (a batch frame carries several)
+      const handleMessage = (message) => {
+        // Game events get their resulting gameState whichever way the server sent it
+        if (GAME_STATE_EVENTS.has(message.type) && message.data) {
+          message.data = { ...message.data, gameState: resolveGameState(message.data) };
+        }
+        
+        switch (message.type) {
+          case 'roomJoined':
+            console.log('🎯 roomJoined received:', message.data);
+            dispatch({ type: 'SET_ROOM', payload: message.data.room });
+            // Set the current player with the proper backend-assigned ID and session token
+            if (message.data.player) {
+              // Include session token if provided (for new joins and reconnections)
+              const playerWithToken = message.data.sessionToken 
+                ? { ...message.data.player, sessionToken: message.data.sessionToken }
+                : message.data.player;
+              console.log('✅ Setting current player from roomJoined:', playerWithToken);
+              dispatch({ type: 'SET_PLAYER', payload: playerWithToken });
+            }
+            break;
+            
+          case 'playerJoined':
+            console.log('🎯 playerJoined received:', message.data);
+            dispatch({ type: 'SET_PLAYERS', payload: message.data.room.players });
+            break;
+            
+          case 'playerLeft':
+            console.log('🎯 playerLeft received:', message.data);
+            dispatch({ type: 'SET_PLAYERS', payload: message.data.players });
+            dispatch({ type: 'SET_ROOM', payload: message.data.room });
+            
+            // Update current player if they became host
+            const updatedPlayers = message.data.players;
+            const currentPlayerId = state.currentPlayer?.id;
+            const newHostPlayer = updatedPlayers.find(p => p.isHost);
+            if (newHostPlayer && newHostPlayer.id === currentPlayerId) {
+              console.log('👑 Current player is now the host');
+              dispatch({ type: 'SET_PLAYER', payload: newHostPlayer });
+            }
+            break;
+            
+          case 'gameStarted':
+            console.log('🎯 gameStarted received:', message);
+            console.log('🎯 message.data:', message.data);
+            console.log('🎯 message.data.gameState:', message.data.gameState);
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            dispatch({ type: 'SET_GAME_STATUS', payload: 'active' });
+            
+            // Navigate to game screen for all players
+            const roomCode = message.data.gameState.roomCode;
+            console.log('🎮 Navigating to game screen for room:', roomCode);
+            navigate(`/game/${roomCode}`);
+            break;
+            
+          case 'cardFlipped':
+            console.log('🃏 Card flipped event:', message.data);
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            
+            // Check if this was a wild card
+            if (message.data.isWildCard) {
+              console.log('🌟 Wild card detected in cardFlipped event:', message.data.message);
+              dispatch({ type: 'SET_WILD_CARD_MESSAGE', payload: message.data.message });
+              // Clear the message after 3 seconds
+              setTimeout(() => {
+                dispatch({ type: 'CLEAR_WILD_CARD_MESSAGE' });
+              }, 3000);
+            }
+            break;
+            
+          case 'wild_card_drawn':
+            console.log('🌟 Wild card drawn:', message.data);
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            dispatch({ type: 'SET_WILD_CARD_MESSAGE', payload: message.data.message });
+            break;
+            
+          case 'answerSubmitted':
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            break;
+            
+          case 'gameEnded':
+            console.log('🏁 Game ended:', message.data);
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            dispatch({ type: 'SET_GAME_STATUS', payload: 'completed' });
+            break;
+            
+          case 'faceoffDetected':
+            console.log('⚡ Faceoff detected:', message.data);
+            dispatch({ type: 'SET_FACEOFF', payload: message.data.faceoff });
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            dispatch({ type: 'SET_GAME_STATUS', payload: 'faceoff' });
+            break;
+            
+          case 'faceoffResolved':
+            console.log('🏆 Faceoff resolved:', message.data);
+            dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
+            dispatch({ type: 'CLEAR_FACEOFF' });
+            if (message.data.gameState) {
+              dispatch({ type: 'SET_GAME_STATUS', payload: message.data.gameState.status });
+            }
+            
+            // Clear wild card message if wild card was involved in the faceoff
+            if (message.data.wildCardInvolved) {
+              dispatch({ type: 'CLEAR_WILD_CARD_MESSAGE' });
+            }
+            break;
+            
+          case 'stateSnapshot':
+            console.log('📸 State snapshot received:', message.data);
+            const snapshotState = applySnapshot(message.data);
+            dispatch({ type: 'SET_GAME_STATE', payload: snapshotState });
+            if (snapshotState.currentFaceoff) {
+              dispatch({ type: 'SET_FACEOFF', payload: snapshotState.currentFaceoff });
+            }
+            if (snapshotState.status !== 'waiting') {
+              dispatch({ type: 'SET_GAME_STATUS', payload: snapshotState.status });
+            }
+            // Joined (or rejoined) a game that is already running
+            if ((snapshotState.status === 'active' || snapshotState.status === 'faceoff') &&
+                !window.location.pathname.includes('/game/')) {
+              navigate(`/game/${snapshotState.roomCode}`);
+            }
+            break;
+            
+          case 'resumed':
+            // Everything broadcast since our lastSeq, in order; deltas we already have are skipped
+            console.log('⏩ Resumed from seq', message.data.fromSeq, 'with', message.data.messages.length, 'missed message(s)');
+            message.data.messages.forEach(missedMessage => handleMessage(missedMessage));
+            break;
+            
+          case 'batch':
+            // Every event of one command in one frame; the state payload applies to all of them
+            resolveGameState(message);
+            message.events.forEach(batchedEvent => handleMessage(batchedEvent));
+            break;
+            
+          case 'error':
+            dispatch({ type: 'SET_ERROR', payload: message.message });
+            break;
+            
+          default:
+            console.log('Unknown message type:', message.type);
+        }
+      };
+      
       socket.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data);
           console.log('📨 Received WebSocket message:', message);
-          
-          switch (message.type) {
-            case 'roomJoined':
-              console.log('🎯 roomJoined received:', message.data);
-              dispatch({ type: 'SET_ROOM', payload: message.data.room });
-              // Set the current player with the proper backend-assigned ID and session token
-              if (message.data.player) {
-                // Include session token if provided (for new joins and reconnections)
-                const playerWithToken = message.data.sessionToken 
-                  ? { ...message.data.player, sessionToken: message.data.sessionToken }
-                  : message.data.player;
-                console.log('✅ Setting current player from roomJoined:', playerWithToken);
-                dispatch({ type: 'SET_PLAYER', payload: playerWithToken });
-              }
-              break;
-              
-            case 'playerJoined':
-              console.log('🎯 playerJoined received:', message.data);
-              dispatch({ type: 'SET_PLAYERS', payload: message.data.room.players });
-              break;
-              
-            case 'playerLeft':
-              console.log('🎯 playerLeft received:', message.data);
-              dispatch({ type: 'SET_PLAYERS', payload: message.data.players });
-              dispatch({ type: 'SET_ROOM', payload: message.data.room });
-              
-              // Update current player if they became host
-              const updatedPlayers = message.data.players;
-              const currentPlayerId = state.currentPlayer?.id;
-              const newHostPlayer = updatedPlayers.find(p => p.isHost);
-              if (newHostPlayer && newHostPlayer.id === currentPlayerId) {
-                console.log('👑 Current player is now the host');
-                dispatch({ type: 'SET_PLAYER', payload: newHostPlayer });
-              }
-              break;
-              
-            case 'gameStarted':
-              console.log('🎯 gameStarted received:', message);
-              console.log('🎯 message.data:', message.data);
-              console.log('🎯 message.data.gameState:', message.data.gameState);
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              dispatch({ type: 'SET_GAME_STATUS', payload: 'active' });
-              
-              // Navigate to game screen for all players
-              const roomCode = message.data.gameState.roomCode;
-              console.log('🎮 Navigating to game screen for room:', roomCode);
-              navigate(`/game/${roomCode}`);
-              break;
-              
-            case 'cardFlipped':
-              console.log('🃏 Card flipped event:', message.data);
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              
-              // Check if this was a wild card
-              if (message.data.isWildCard) {
-                console.log('🌟 Wild card detected in cardFlipped event:', message.data.message);
-                dispatch({ type: 'SET_WILD_CARD_MESSAGE', payload: message.data.message });
-                // Clear the message after 3 seconds
-                setTimeout(() => {
-                  dispatch({ type: 'CLEAR_WILD_CARD_MESSAGE' });
-                }, 3000);
-              }
-              break;
-              
-            case 'wild_card_drawn':
-              console.log('🌟 Wild card drawn:', message.data);
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              dispatch({ type: 'SET_WILD_CARD_MESSAGE', payload: message.data.message });
-              break;
-              
-            case 'answerSubmitted':
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              break;
-              
-            case 'gameEnded':
-              console.log('🏁 Game ended:', message.data);
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              dispatch({ type: 'SET_GAME_STATUS', payload: 'completed' });
-              break;
-              
-            case 'faceoffDetected':
-              console.log('⚡ Faceoff detected:', message.data);
-              dispatch({ type: 'SET_FACEOFF', payload: message.data.faceoff });
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              dispatch({ type: 'SET_GAME_STATUS', payload: 'faceoff' });
-              break;
-              
-            case 'faceoffResolved':
-              console.log('🏆 Faceoff resolved:', message.data);
-              dispatch({ type: 'SET_GAME_STATE', payload: message.data.gameState });
-              dispatch({ type: 'CLEAR_FACEOFF' });
-              dispatch({ type: 'SET_GAME_STATUS', payload: message.data.gameState.status });
-              
-              // Clear wild card message if wild card was involved in the faceoff
-              if (message.data.wildCardInvolved) {
-                dispatch({ type: 'CLEAR_WILD_CARD_MESSAGE' });
-              }
-              break;
-              
-            case 'error':
-              dispatch({ type: 'SET_ERROR', payload: message.message });
-              break;
-              
-            default:
-              console.log('Unknown message type:', message.type);
+          if (typeof message.seq === 'number') {
+            lastSeqRef.current = Math.max(lastSeqRef.current, message.seq);
           }
+          handleMessage(message);
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -593,6 +722,9 @@ export const GameProvider = ({ children }) => {
         }
         
         // Clear any existing state when creating new room
+        gameStateRef.current = null;
+        syncRef.current = { version: null, historyLimit: syncRef.current.historyLimit };
+        lastSeqRef.current = 0;
         dispatch({ type: 'SET_ROOM', payload: null });
         dispatch({ type: 'SET_PLAYER', payload: null });
         dispatch({ type: 'RESET_GAME' });
@@ -666,6 +798,9 @@ export const GameProvider = ({ children }) => {
           dispatch({ type: 'SET_SOCKET', payload: null });
         }
         
+        gameStateRef.current = null;
+        syncRef.current = { version: null, historyLimit: syncRef.current.historyLimit };
+        lastSeqRef.current = 0;
         dispatch({ type: 'SET_LOADING', payload: true });
         
         const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:3001';
@@ -718,7 +853,8 @@ export const GameProvider = ({ children }) => {
             currentSocket.send(JSON.stringify({
               type: 'joinRoom',
               playerName: playerName,
-              roomCode: roomCode
+              roomCode: roomCode,
+              capabilities: CLIENT_CAPABILITIES
             }));
           } else {
             console.log('⏳ WebSocket not ready yet, waiting...');
@@ -862,6 +998,9 @@ export const GameProvider = ({ children }) => {
       hasCreatedSocketRef.current = false;
       currentPlayerRef.current = null;
       currentRoomRef.current = null;
+      gameStateRef.current = null;
+      syncRef.current = { version: null, historyLimit: syncRef.current.historyLimit };
+      lastSeqRef.current = 0;
       
       // Reset all state - do this after clearing refs and localStorage
       dispatch({ type: 'RESET_GAME' });
@@ -942,6 +1081,9 @@ export const GameProvider = ({ children }) => {
         // Set refs so socket creation logic can find them
         currentPlayerRef.current = restoredPlayer;
         currentRoomRef.current = restoredRoom;
+        gameStateRef.current = null;
+        syncRef.current = { version: null, historyLimit: syncRef.current.historyLimit };
+        lastSeqRef.current = 0;
         
         // The existing socket creation logic will handle the connection
         // when it detects currentRoom and currentPlayer